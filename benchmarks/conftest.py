@@ -0,0 +1,193 @@
+"""
+Local stand-ins for the validation service, serving listings of synthetic records (:class:`StandInHandler`)
+or a complete synthetic catalog (:class:`fakeapi.FakeAPIHandler`), and clients connected to them,
+for benchmarks which do not need EBRAINS credentials.
+
+The measurements recorded with the `benchmark_results` fixture are written, with a description of the
+environment, to a JSON file given by the ``--benchmark-results`` option or the environment variable
+VF_BENCHMARK_OUTPUT (default "benchmark-results.json"), so that they can be compared between releases.
+"""
+
+import base64
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import ebrains_validation_framework
+from ebrains_validation_framework import ModelCatalog, TestLibrary
+from ebrains_validation_framework.vocabulary import Vocabulary
+
+from fakeapi import FakeAPIHandler, SyntheticCatalog
+
+
+CATALOG_SIZE = {
+    "n_models": int(os.environ.get("VF_BENCHMARK_MODELS", 200)),
+    "n_tests": int(os.environ.get("VF_BENCHMARK_TESTS", 100)),
+    "n_results": int(os.environ.get("VF_BENCHMARK_CATALOG_RESULTS", 5000)),
+}
+API_LATENCY = float(os.environ.get("VF_BENCHMARK_API_LATENCY", 0.002))
+
+
+def unsigned_token(username="benchmark", lifetime=3600):
+    """A token which the client accepts without contacting the EBRAINS IAM service."""
+
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+
+    claims = {"exp": time.time() + lifetime, "preferred_username": username}
+    return ".".join([encode({"alg": "none"}), encode(claims), ""])
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves `records` for any listing, honouring the `size` and `from_index` parameters."""
+
+    protocol_version = "HTTP/1.1"
+    records = []
+    latency = 0.0
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        size = int(query.get("size", ["1000000"])[0])
+        from_index = int(query.get("from_index", ["0"])[0])
+        time.sleep(self.latency)
+        body = json.dumps(self.records[from_index : from_index + size]).encode("utf-8")
+        type(self).requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="session")
+def stand_in_server():
+    """URL of the stand-in server; set `StandInHandler.records` and `.latency` to configure it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def token_file(tmp_path, monkeypatch):
+    """Keep the tokens of the benchmark clients out of the user's token file."""
+    path = str(tmp_path / "token")
+    monkeypatch.setattr(ebrains_validation_framework, "TOKENFILE", path)
+    return path
+
+
+@pytest.fixture
+def test_library(stand_in_server, token_file):
+    """A :class:`TestLibrary` connected to the stand-in server."""
+    client = TestLibrary(token=unsigned_token(), environment="dev", pool_maxsize=16)
+    client.url = stand_in_server
+    return client
+
+
+@pytest.fixture(scope="session")
+def fake_api():
+    """
+    A fake of the validation service, serving a synthetic catalog (of the size given by the
+    environment variables VF_BENCHMARK_MODELS, VF_BENCHMARK_TESTS and VF_BENCHMARK_CATALOG_RESULTS),
+    with a latency of VF_BENCHMARK_API_LATENCY seconds (default 0.002) per request.
+    Returns the :class:`fakeapi.SyntheticCatalog`, whose `base_url` is the URL of the service.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPIHandler)
+    server.daemon_threads = True
+    catalog = SyntheticCatalog(f"http://127.0.0.1:{server.server_port}", **CATALOG_SIZE)
+    FakeAPIHandler.catalog = catalog
+    FakeAPIHandler.latency = API_LATENCY
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield catalog
+    server.shutdown()
+
+
+def fake_api_client(cls, catalog, **kwargs):
+    """
+    A client of class `cls` connected to the fake validation service, without HTTP cache by default,
+    and keeping the vocabulary in memory rather than in the user's cache directory.
+    """
+    kwargs.setdefault("http_cache", False)
+    kwargs.setdefault("vocabulary", Vocabulary(path=None))
+    client = cls(token=unsigned_token(), environment="dev", pool_maxsize=16, **kwargs)
+    client.url = catalog.base_url
+    return client
+
+
+@pytest.fixture
+def fake_test_library(fake_api, token_file):
+    """A :class:`TestLibrary` connected to the fake validation service, without HTTP cache."""
+    return fake_api_client(TestLibrary, fake_api)
+
+
+@pytest.fixture
+def fake_model_catalog(fake_api, token_file):
+    """A :class:`ModelCatalog` connected to the fake validation service, without HTTP cache."""
+    return fake_api_client(ModelCatalog, fake_api)
+
+
+class BenchmarkResults(object):
+    """Collects measurements, written to a JSON file at the end of the session."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+
+    def record(self, name, elapsed, count=1, latencies=None, **details):
+        """
+        Record that `count` operations named `name` took `elapsed` seconds in total.
+        `latencies` is a list of the durations of individual operations, summarized by percentiles.
+        """
+        entry = {"name": name, "count": count, "elapsed": elapsed, "throughput": count / elapsed if elapsed else None}
+        if latencies:
+            latencies = sorted(latencies)
+            entry["latency"] = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max": latencies[-1],
+            }
+        entry.update(details)
+        self.records.append(entry)
+        return entry
+
+    def write(self):
+        data = {
+            "client_version": ebrains_validation_framework.__version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "configuration": dict(CATALOG_SIZE, api_latency=API_LATENCY),
+            "benchmarks": self.records,
+        }
+        with open(self.path, "w") as results_file:
+            json.dump(data, results_file, indent=2)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-results",
+        default=os.environ.get("VF_BENCHMARK_OUTPUT", "benchmark-results.json"),
+        help="JSON file to which benchmark measurements are written",
+    )
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """Collects measurements with `benchmark_results.record(...)`, written to a JSON file at the end of the session."""
+    results = BenchmarkResults(request.config.getoption("--benchmark-results"))
+    yield results
+    if results.records:
+        results.write()
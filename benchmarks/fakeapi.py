@@ -0,0 +1,307 @@
+"""
+An in-process fake of the REST endpoints of the validation service used by the client,
+serving a synthetic catalog of models, tests, their instances and results, held in memory.
+
+:class:`SyntheticCatalog` generates the catalog; :class:`FakeAPIHandler` serves it,
+with a fixed latency added to each request, and counts the requests to each endpoint.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote, urlparse
+
+from ebrains_validation_framework.instrumentation import endpoint_template
+
+
+# the valid values of the attributes of models and tests, including all those used in the synthetic catalog
+VOCABULARY = {
+    "species": ["Rattus norvegicus", "Mus musculus", "Homo sapiens"],
+    "brain_region": ["hippocampus", "cerebellum", "neocortex", "striatum"],
+    "cell_type": ["pyramidal cell", "interneuron", "Purkinje cell"],
+    "model_scope": ["single cell", "network"],
+    "abstraction_level": ["spiking neurons: biophysical", "spiking neurons: point neuron", "rate neurons"],
+    "test_type": ["single cell activity", "network activity"],
+    "score_type": ["z-score", "p-value"],
+    "recording_modality": ["electrophysiology", "imaging"],
+    "implementation_status": ["published", "in development", "proposal"],
+}
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _timestamp(rng):
+    return "2024-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}.000250+00:00".format(
+        rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)
+    )
+
+
+class SyntheticCatalog(object):
+    """
+    A catalog of `n_models` models and `n_tests` tests, each with `n_instances` instances,
+    and `n_results` results of randomly chosen model instances and test instances.
+
+    The source of each model instance and the observation of each test are files of
+    `file_size` bytes, served by the fake API under `base_url` + "/files/".
+    """
+
+    def __init__(self, base_url, n_models=200, n_tests=100, n_results=5000, n_instances=2, file_size=100000, seed=0):
+        rng = random.Random(seed)
+        self.base_url = base_url
+        self.file_size = file_size
+        self.lock = threading.Lock()
+        self.models = {}
+        self.model_instances = {}
+        self.tests = {}
+        self.test_instances = {}
+        self.results = {}
+        for i in range(n_models):
+            model_id = _uuid(rng)
+            instances = [
+                {
+                    "id": _uuid(rng),
+                    "uri": None,
+                    "model_id": model_id,
+                    "version": f"{j + 1}.0",
+                    "description": "Synthetic model instance",
+                    "parameters": None,
+                    "code_format": "application/zip",
+                    "source": f"{base_url}/files/model-{i}-{j}.zip",
+                    "license": "BSD 3-Clause",
+                    "hash": None,
+                    "timestamp": _timestamp(rng),
+                    "morphology": None,
+                }
+                for j in range(n_instances)
+            ]
+            self.models[model_id] = {
+                "id": model_id,
+                "uri": None,
+                "name": f"Synthetic model {i}",
+                "alias": f"model-{i}",
+                "author": [{"given_name": "Ada", "family_name": "Lovelace"}],
+                "owner": [{"given_name": "Ada", "family_name": "Lovelace"}],
+                "project_id": "model-validation",
+                "organization": "HBP-SP6",
+                "private": False,
+                "cell_type": rng.choice(["pyramidal cell", "interneuron", None]),
+                "model_scope": "single cell",
+                "abstraction_level": "spiking neurons: biophysical",
+                "brain_region": rng.choice(["hippocampus", "cerebellum", "neocortex"]),
+                "species": rng.choice(["Rattus norvegicus", "Mus musculus"]),
+                "description": "A synthetic model. " * 20,
+                "date_created": _timestamp(rng),
+                "images": [],
+                "instances": instances,
+            }
+            for instance in instances:
+                self.model_instances[instance["id"]] = instance
+        for i in range(n_tests):
+            test_id = _uuid(rng)
+            instances = [
+                {
+                    "id": _uuid(rng),
+                    "uri": None,
+                    "test_id": test_id,
+                    "version": f"{j + 1}.0",
+                    "description": "Synthetic test instance",
+                    "parameters": None,
+                    "path": "sciunit.Test",
+                    "repository": "https://github.com/example/tests.git",
+                    "timestamp": _timestamp(rng),
+                }
+                for j in range(n_instances)
+            ]
+            self.tests[test_id] = {
+                "id": test_id,
+                "uri": None,
+                "name": f"Synthetic test {i}",
+                "alias": f"test-{i}",
+                "author": [{"given_name": "Alan", "family_name": "Turing"}],
+                "implementation_status": "published",
+                "brain_region": rng.choice(["hippocampus", "cerebellum", "neocortex"]),
+                "species": rng.choice(["Rattus norvegicus", "Mus musculus"]),
+                "cell_type": None,
+                "data_location": [f"{base_url}/files/observation-{i}.json"],
+                "data_type": "Mean, SD",
+                "recording_modality": "electrophysiology",
+                "test_type": "single cell activity",
+                "score_type": "z-score",
+                "description": "A synthetic test. " * 20,
+                "date_created": _timestamp(rng),
+                "instances": instances,
+            }
+            for instance in instances:
+                self.test_instances[instance["id"]] = instance
+        model_instance_ids = list(self.model_instances)
+        test_instance_ids = list(self.test_instances)
+        for i in range(n_results):
+            result = self.new_result(
+                {
+                    "model_instance_id": rng.choice(model_instance_ids),
+                    "test_instance_id": rng.choice(test_instance_ids),
+                    "score": rng.uniform(-3, 3),
+                    "passed": None,
+                    "timestamp": _timestamp(rng),
+                    "project_id": "model-validation",
+                    "results_storage": [],
+                    "normalized_score": None,
+                },
+                _uuid(rng),
+            )
+            self.results[result["id"]] = result
+
+    @staticmethod
+    def new_result(data, result_id=None):
+        return dict(data, id=result_id or str(uuid.uuid4()), uri=None, comment="")
+
+    def find(self, collection, key):
+        # look up a model or test by ID or alias
+        entities = self.models if collection == "models" else self.tests
+        if key in entities:
+            return entities[key]
+        for entity in entities.values():
+            if entity["alias"] == key:
+                return entity
+        return None
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    """
+    Serves `catalog` (a :class:`SyntheticCatalog`), adding `latency` seconds to each request.
+    `requests` counts the requests to each endpoint, e.g. "GET /models/{id}".
+    """
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = 65536  # send headers and body together, rather than waiting for the delayed ACK of the headers
+    catalog = None
+    latency = 0.0
+    requests = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _count(self, path):
+        key = f"{self.command} {endpoint_template(path)}"
+        with self.catalog.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def _reply(self, status, body=None, content_type="application/json"):
+        if body is None:
+            data = b""
+        elif isinstance(body, bytes):
+            data = body
+        else:
+            data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _listing(self, records, query):
+        for name, values in query.items():
+            if name in ("size", "from_index", "format"):
+                continue
+            records = [record for record in records if str(record.get(name)) in values]
+        size = int(query.get("size", ["1000000"])[0])
+        from_index = int(query.get("from_index", ["0"])[0])
+        return records[from_index : from_index + size]
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        self._count(url.path)
+        time.sleep(self.latency)
+        catalog = self.catalog
+        if parts == [""]:
+            return self._reply(200, {"name": "Fake validation service", "version": "3.0"})
+        collection = parts[0]
+        if collection == "files":
+            return self._reply(200, b"x" * catalog.file_size, "application/octet-stream")
+        if collection == "vocab":
+            if len(parts) == 1:
+                return self._reply(200, VOCABULARY)
+            values = VOCABULARY.get(parts[1].replace("-", "_"))
+            return self._reply(200, values) if values else self._reply(404, {"detail": "Not found"})
+        if collection == "results":
+            if len(parts) == 1:
+                # as by the service, results are listed newest first
+                results = sorted(catalog.results.values(), key=lambda result: result["timestamp"], reverse=True)
+                return self._reply(200, self._listing(results, query))
+            result = catalog.results.get(parts[1])
+            return self._reply(200, result) if result else self._reply(404, {"detail": "Result not found"})
+        if collection not in ("models", "tests"):
+            return self._reply(404, {"detail": "Not found"})
+        entities, instances = (
+            (catalog.models, catalog.model_instances)
+            if collection == "models"
+            else (catalog.tests, catalog.test_instances)
+        )
+        if len(parts) == 1:
+            return self._reply(200, self._listing(list(entities.values()), query))
+        if parts[1] == "query" and len(parts) == 4:
+            instance = instances.get(parts[3])
+            return self._reply(200, instance) if instance else self._reply(404, {"detail": "Instance not found"})
+        entity = catalog.find(collection, parts[1])
+        if entity is None:
+            return self._reply(404, {"detail": "Not found"})
+        if len(parts) == 2:
+            return self._reply(200, entity)
+        if parts[2:] == ["instances", "latest"]:
+            return self._reply(200, max(entity["instances"], key=lambda instance: instance["timestamp"]))
+        if parts[2] == "instances":
+            return self._reply(200, self._listing(entity["instances"], query))
+        return self._reply(404, {"detail": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self._count(url.path)
+        time.sleep(self.latency)
+        catalog = self.catalog
+        with catalog.lock:
+            if parts == ["results"]:
+                # the service records the time of registration, in UTC
+                result = catalog.new_result(dict(data, timestamp=datetime.now(timezone.utc).isoformat()))
+                catalog.results[result["id"]] = result
+                return self._reply(201, result)
+            if len(parts) == 3 and parts[0] == "models" and parts[2] == "instances":
+                model = catalog.find("models", parts[1])
+                if model is None:
+                    return self._reply(404, {"detail": "Model not found"})
+                instance = dict(data, id=str(uuid.uuid4()), model_id=model["id"])
+                model["instances"].append(instance)
+                catalog.model_instances[instance["id"]] = instance
+                return self._reply(201, instance)
+        return self._reply(404, {"detail": "Not found"})
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        self._count(url.path)
+        time.sleep(self.latency)
+        catalog = self.catalog
+        with catalog.lock:
+            if len(parts) == 2 and parts[0] == "results" and catalog.results.pop(parts[1], None):
+                return self._reply(200)
+            if len(parts) == 2 and parts[0] == "models":
+                model = catalog.find("models", parts[1])
+                if model is not None:
+                    del catalog.models[model["id"]]
+                    for instance in model["instances"]:
+                        catalog.model_instances.pop(instance["id"], None)
+                    return self._reply(200)
+        return self._reply(404, {"detail": "Not found"})
@@ -0,0 +1,96 @@
+"""
+Benchmark for decoding a large listing of results, as returned by :meth:`TestLibrary.list_results`,
+and renaming "project_id" to "collab_id" in each result.
+
+Run with ``python -m pytest benchmarks -s`` to see the timings. The number of results
+can be changed with the environment variable VF_BENCHMARK_RESULTS (default 200000).
+"""
+
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from ebrains_validation_framework import renameNestedJSONKey
+from ebrains_validation_framework.jsoncodec import CODECS, get_codec
+
+
+N_RESULTS = int(os.environ.get("VF_BENCHMARK_RESULTS", 200000))
+
+
+def synthetic_results(n):
+    return [
+        {
+            "id": f"{i:08x}-0000-0000-0000-000000000000",
+            "uri": f"https://model-validation-api.apps.ebrains.eu/results/{i:08x}-0000-0000-0000-000000000000",
+            "project_id": "model-validation",
+            "model_instance_id": "e5e3ae1d-0c1a-4d12-a2e4-2c6b4bb95d62",
+            "test_instance_id": "9c5b86a6-b3c2-4d5b-8a9e-f4a3c8bd8e43",
+            "score": i * 0.001,
+            "normalized_score": None,
+            "passed": None,
+            "timestamp": "2024-05-17T09:30:15.000250+00:00",
+            "comment": "",
+            "results_storage": [{"download_url": "https://data-proxy.ebrains.eu/api/v1/buckets/x/y.json"}],
+        }
+        for i in range(n)
+    ]
+
+
+def reference_rename(iterable, old_key, new_key):
+    # the implementation of renameNestedJSONKey before the optimization, for comparison
+    if isinstance(iterable, list):
+        return [reference_rename(item, old_key, new_key) for item in iterable]
+    if isinstance(iterable, dict):
+        for key in list(iterable.keys()):
+            if key == old_key:
+                iterable[new_key] = iterable.pop(key)
+    return iterable
+
+
+def measure(codec, content, rename):
+    # time of decoding `content`, time of renaming, and peak memory allocated while renaming;
+    # memory is traced in a separate run, as tracing slows down allocations
+    start = time.perf_counter()
+    data = codec.loads(content)
+    decoded = time.perf_counter()
+    rename(data, "project_id", "collab_id")
+    end = time.perf_counter()
+    data = codec.loads(content)
+    tracemalloc.start()
+    rename(data, "project_id", "collab_id")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return decoded - start, end - decoded, peak
+
+
+@pytest.fixture(scope="module")
+def content():
+    return get_codec("json").dumps(synthetic_results(N_RESULTS))
+
+
+"""
+1] Renaming keys of decoded listings
+"""
+
+
+# 1.1) Renaming is faster and allocates less memory than before
+@pytest.mark.parametrize("codec_name", list(CODECS))
+def test_decode_and_rename(content, codec_name):
+    try:
+        codec = get_codec(codec_name)
+    except ImportError:
+        pytest.skip(f"{codec_name} not installed")
+    results = {}
+    for label, rename in (("before", reference_rename), ("after", renameNestedJSONKey)):
+        results[label] = min((measure(codec, content, rename) for i in range(2)), key=lambda r: r[1])
+        decode_time, rename_time, peak = results[label]
+        print(
+            f"\n{codec_name} {label}: {N_RESULTS} results ({len(content) / 1e6:.0f} MB), "
+            f"decode {decode_time:.3f} s, rename {rename_time:.3f} s, extra peak memory {peak / 1e6:.2f} MB"
+        )
+    assert results["after"][1] < results["before"][1]
+    assert results["after"][2] < results["before"][2]
+    data = renameNestedJSONKey(codec.loads(content), "project_id", "collab_id")
+    assert data[0]["collab_id"] == "model-validation" and "project_id" not in data[0]
@@ -0,0 +1,284 @@
+"""
+End-to-end benchmarks of the client against an in-process fake of the validation service
+serving a synthetic catalog (see :mod:`fakeapi`): throughput of the `list_*` methods and of the
+batch getters, latency of the `get_*` methods and of :meth:`TestLibrary.register_result`,
+and the time taken by :func:`utils.generate_score_matrix` and :meth:`ModelCatalog.download_model_instance`.
+
+Run with ``python -m pytest benchmarks -s`` to see the measurements, which are also written to a
+JSON file (see ``conftest.py``). The number of repetitions of single requests can be changed with
+the environment variable VF_BENCHMARK_REPEAT (default 100).
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import fake_api_client
+from ebrains_validation_framework import ModelCatalog, TestLibrary
+
+
+REPEAT = int(os.environ.get("VF_BENCHMARK_REPEAT", 100))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def report(entry):
+    line = f"\n{entry['name']}: {entry['count']} in {entry['elapsed']:.3f} s, {entry['throughput']:.0f}/s"
+    if "latency" in entry:
+        line += ", latency p50 {p50:.4f} s, p95 {p95:.4f} s".format(**entry["latency"])
+    print(line)
+
+
+"""
+1] Listings
+"""
+
+
+# 1.1) Complete listings, retrieved in one response, in parallel pages, or parsed as they are received
+@pytest.mark.parametrize("options", [{}, {"parallel": 4, "page_size": 500}, {"stream": True}], ids=str)
+@pytest.mark.parametrize("method", ["list_models", "list_tests", "list_results"])
+def test_list(fake_api, fake_model_catalog, fake_test_library, benchmark_results, method, options):
+    client = fake_model_catalog if method == "list_models" else fake_test_library
+    records, elapsed = timed(lambda: list(getattr(client, method)(**options)))
+    expected = {"list_models": fake_api.models, "list_tests": fake_api.tests, "list_results": fake_api.results}
+    assert len(records) >= len(expected[method])  # results registered by other benchmarks are included
+    variant = ", ".join(f"{key}={value}" for key, value in options.items()) or "default"
+    report(benchmark_results.record(f"{method} ({variant})", elapsed, len(records), unit="records"))
+
+
+"""
+2] Retrieval of single entities
+"""
+
+
+def _get_single(fake_api, model_catalog, test_library):
+    model_ids = list(fake_api.models)
+    test_ids = list(fake_api.tests)
+    model_instance_ids = list(fake_api.model_instances)
+    test_instance_ids = list(fake_api.test_instances)
+    result_ids = list(fake_api.results)
+    return {
+        "get_model": lambda i: model_catalog.get_model(model_id=model_ids[i % len(model_ids)]),
+        "get_model_instance": lambda i: model_catalog.get_model_instance(
+            instance_id=model_instance_ids[i % len(model_instance_ids)]
+        ),
+        "get_test_definition": lambda i: test_library.get_test_definition(test_id=test_ids[i % len(test_ids)]),
+        "get_test_instance": lambda i: test_library.get_test_instance(
+            instance_id=test_instance_ids[i % len(test_instance_ids)]
+        ),
+        "get_result": lambda i: test_library.get_result(result_id=result_ids[i % len(result_ids)]),
+    }
+
+
+# 2.1) Latency of the get_* methods, without HTTP cache
+@pytest.mark.parametrize(
+    "method", ["get_model", "get_model_instance", "get_test_definition", "get_test_instance", "get_result"]
+)
+def test_get_single(fake_api, fake_model_catalog, fake_test_library, benchmark_results, method):
+    get = _get_single(fake_api, fake_model_catalog, fake_test_library)[method]
+    latencies = []
+    for i in range(REPEAT):
+        value, elapsed = timed(get, i)
+        assert value["id"]
+        latencies.append(elapsed)
+    report(benchmark_results.record(method, sum(latencies), REPEAT, latencies))
+
+
+# 2.2) Latency of the get_* methods answered from the HTTP cache
+def test_get_single_cached(fake_api, token_file, benchmark_results):
+    model_catalog = fake_api_client(ModelCatalog, fake_api, http_cache=True)
+    model_id = next(iter(fake_api.models))
+    model_catalog.get_model(model_id=model_id)
+    latencies = [timed(model_catalog.get_model, model_id=model_id)[1] for i in range(REPEAT)]
+    report(benchmark_results.record("get_model (cached)", sum(latencies), REPEAT, latencies))
+
+
+# 2.3) Throughput of the batch getters, with few requests
+@pytest.mark.parametrize("method", ["get_results", "get_models", "get_test_instances"])
+def test_get_batch(fake_api, fake_model_catalog, fake_test_library, benchmark_results, method):
+    if method == "get_results":
+        ids, client, max_calls = list(fake_api.results)[:1000], fake_test_library, 10
+    elif method == "get_models":
+        ids, client, max_calls = list(fake_api.models), fake_model_catalog, len(fake_api.models)
+    else:
+        ids, client, max_calls = list(fake_api.test_instances), fake_test_library, len(fake_api.test_instances)
+    with client.call_budget(max_calls=max_calls) as budget:
+        values, elapsed = timed(getattr(client, method), ids)
+    assert [value["id"] for value in values] == ids
+    report(benchmark_results.record(method, elapsed, len(ids), requests=budget.calls))
+
+
+"""
+3] Registration of results
+"""
+
+
+# 3.1) Latency of registering a result, for a model instance given by its ID
+def test_register_result(fake_api, fake_test_library, benchmark_results):
+    model_instance_ids = list(fake_api.model_instances)
+    test_instance_ids = list(fake_api.test_instances)
+    latencies = []
+    for i in range(REPEAT):
+        score = SimpleNamespace(
+            score=i * 0.01,
+            related_data={"collab_id": "model-validation"},
+            model=SimpleNamespace(model_instance_uuid=model_instance_ids[i % len(model_instance_ids)]),
+            test=SimpleNamespace(uuid=test_instance_ids[i % len(test_instance_ids)]),
+        )
+        result, elapsed = timed(fake_test_library.register_result, score)
+        assert result["id"] in fake_api.results
+        latencies.append(elapsed)
+    report(benchmark_results.record("register_result", sum(latencies), REPEAT, latencies))
+
+
+"""
+4] Reports
+"""
+
+
+# 4.1) Score matrix of many results, with one request per batch of results and per distinct entity
+def test_generate_score_matrix(fake_api, fake_test_library, benchmark_results):
+    pytest.importorskip("pandas")
+    from ebrains_validation_framework import utils
+
+    result_ids = list(fake_api.results)[:500]
+    results = [fake_api.results[result_id] for result_id in result_ids]
+    model_instance_ids = {result["model_instance_id"] for result in results}
+    test_instance_ids = {result["test_instance_id"] for result in results}
+    max_calls = (
+        5  # batches of 100 results
+        + len(model_instance_ids)
+        + len({fake_api.model_instances[id]["model_id"] for id in model_instance_ids})
+        + len(test_instance_ids)
+        + len({fake_api.test_instances[id]["test_id"] for id in test_instance_ids})
+    )
+    with fake_test_library.call_budget(max_calls=max_calls) as budget:
+        (styled_df, excluded), elapsed = timed(
+            utils.generate_score_matrix, result_list=result_ids, client_obj=fake_test_library
+        )
+    assert styled_df.data.shape == (len(model_instance_ids), len(test_instance_ids))
+    report(benchmark_results.record("generate_score_matrix", elapsed, len(result_ids), requests=budget.calls))
+
+
+"""
+5] Downloads
+"""
+
+
+# 5.1) Throughput of downloading the source of model instances
+def test_download_model_instance(fake_api, fake_model_catalog, benchmark_results, tmp_path):
+    instance_ids = list(fake_api.model_instances)[:20]
+    latencies = []
+    for instance_id in instance_ids:
+        path, elapsed = timed(
+            fake_model_catalog.download_model_instance,
+            instance_id=instance_id,
+            local_directory=str(tmp_path),
+            overwrite=True,
+        )
+        assert os.path.getsize(path) == fake_api.file_size
+        latencies.append(elapsed)
+    entry = benchmark_results.record(
+        "download_model_instance",
+        sum(latencies),
+        len(instance_ids),
+        latencies,
+        megabytes_per_second=len(instance_ids) * fake_api.file_size / sum(latencies) / 1e6,
+    )
+    report(entry)
+
+
+"""
+6] Local mirror
+"""
+
+
+# 6.1) Synchronising the mirror, then answering filter queries from it without any request
+def test_list_models_mirror(fake_api, fake_model_catalog, benchmark_results, tmp_path):
+    model_catalog = fake_api_client(ModelCatalog, fake_api, mirror=tmp_path / "mirror.db")
+    sync_report, elapsed = timed(model_catalog.sync_mirror, results=False)
+    counts = {kind: stats["total"] for kind, stats in sync_report.items()}
+    assert counts == {"models": len(fake_api.models), "tests": len(fake_api.tests)}
+    report(benchmark_results.record("sync_mirror", elapsed, counts["models"] + counts["tests"], unit="records"))
+    queries = {
+        "alias": {"alias": "model-7"},
+        "two filters": {"species": "Mus musculus", "brain_region": "hippocampus", "size": 20},
+        "list of values": {"brain_region": ["hippocampus", "cerebellum"], "cell_type": "interneuron", "size": 20},
+    }
+    for name, filters in queries.items():
+        assert model_catalog.list_models(**filters) == fake_model_catalog.list_models(**filters)
+        with model_catalog.call_budget(max_calls=0):
+            latencies = [timed(model_catalog.list_models, **filters)[1] for i in range(REPEAT)]
+        report(benchmark_results.record(f"list_models from mirror ({name})", sum(latencies), REPEAT, latencies))
+
+
+# 6.2) Incremental synchronisation: after new results are registered, only the first page of results is retrieved
+def test_sync_mirror_incremental(fake_api, fake_test_library, benchmark_results, tmp_path):
+    test_library = fake_api_client(TestLibrary, fake_api, mirror=tmp_path / "mirror.db")
+    initial, elapsed = timed(test_library.sync_mirror)
+    assert initial["results"]["mode"] == "full" and initial["results"]["total"] == len(fake_api.results)
+    report(benchmark_results.record("sync_mirror (full)", elapsed, initial["results"]["records"], unit="records"))
+    model_instance_id = next(iter(fake_api.model_instances))
+    test_instance_id = next(iter(fake_api.test_instances))
+    for i in range(10):
+        score = SimpleNamespace(
+            score=i * 0.1,
+            related_data={"collab_id": "model-validation"},
+            model=SimpleNamespace(model_instance_uuid=model_instance_id),
+            test=SimpleNamespace(uuid=test_instance_id),
+        )
+        fake_test_library.register_result(score)
+    sync_report, elapsed = timed(test_library.sync_mirror)
+    stats = sync_report["results"]
+    assert stats["mode"] == "incremental" and stats["added"] == 10 and stats["requests"] == 1
+    assert stats["bytes"] < initial["results"]["bytes"] / 10
+    entry = benchmark_results.record(
+        "sync_mirror (incremental)",
+        elapsed,
+        sum(stats["records"] for stats in sync_report.values()),
+        unit="records",
+        bytes=sum(stats["bytes"] for stats in sync_report.values()),
+        full_bytes=sum(stats["bytes"] for stats in initial.values()),
+    )
+    report(entry)
+
+
+# 6.3) Ranked full-text searches of the models in the mirror
+def test_search_models(fake_api, benchmark_results, tmp_path):
+    model_catalog = fake_api_client(ModelCatalog, fake_api, mirror=tmp_path / "mirror.db")
+    model_catalog.sync_mirror(results=False)
+    queries = {
+        "name": "Synthetic model 7",
+        "common word": "synthetic",
+        "prefix": "synth*",
+        "with filters": {"text": "synthetic", "species": "Mus musculus", "brain_region": "hippocampus"},
+    }
+    for name, query in queries.items():
+        filters = query if isinstance(query, dict) else {"text": query}
+        models = model_catalog.search_models(**filters)
+        assert models
+        with model_catalog.call_budget(max_calls=0):
+            latencies = [timed(model_catalog.search_models, **filters)[1] for i in range(REPEAT)]
+        report(benchmark_results.record(f"search_models ({name})", sum(latencies), REPEAT, latencies))
+
+
+"""
+7] Vocabulary
+"""
+
+
+# 7.1) Attribute options and the checking of filter values, answered from the cached vocabulary
+def test_cached_vocabulary(fake_api, fake_model_catalog, benchmark_results):
+    with fake_model_catalog.call_budget(max_calls=1) as budget:
+        fake_model_catalog.get_attribute_options()
+        latencies = [timed(fake_model_catalog.get_attribute_options, "species")[1] for i in range(REPEAT)]
+        with pytest.raises(ValueError):
+            fake_model_catalog.list_models(brain_region="hipocampus")  # rejected without a request
+    assert budget.calls == 1
+    report(benchmark_results.record("get_attribute_options (cached)", sum(latencies), REPEAT, latencies))
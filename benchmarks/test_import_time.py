@@ -0,0 +1,61 @@
+"""
+Benchmarks for the time taken to import the package in a fresh interpreter.
+
+Run with ``python -m pytest benchmarks``. These do not need EBRAINS credentials.
+The budgets (in seconds) can be changed with the environment variables
+VF_IMPORT_BUDGET and VF_UTILS_IMPORT_BUDGET.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+IMPORT_BUDGETS = {
+    "ebrains_validation_framework": float(os.environ.get("VF_IMPORT_BUDGET", 0.25)),
+    "ebrains_validation_framework.utils": float(os.environ.get("VF_UTILS_IMPORT_BUDGET", 0.5)),
+}
+
+# dependencies which should only be imported when first used
+LAZY_MODULES = ["requests", "nameparser", "ebrains_drive", "sciunit", "pkg_resources"]
+
+
+def cold_import_time(module_name, repeat=3):
+    # best of `repeat` cumulative import times (in seconds), each in a fresh interpreter,
+    # as reported by `python -X importtime`
+    times = []
+    for i in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module_name:
+                times.append(int(fields[1]) / 1e6)
+    return min(times)
+
+
+"""
+1] Import time
+"""
+
+
+# 1.1) Cold import of the package and of utils is within budget
+@pytest.mark.parametrize("module_name", list(IMPORT_BUDGETS))
+def test_cold_import_time(module_name):
+    elapsed = cold_import_time(module_name)
+    print(f"import {module_name}: {elapsed * 1000:.1f} ms")
+    assert elapsed < IMPORT_BUDGETS[module_name]
+
+
+# 1.2) Heavy dependencies are not loaded at import time
+@pytest.mark.parametrize("module_name", list(IMPORT_BUDGETS))
+def test_lazy_dependencies(module_name):
+    code = f"import sys, {module_name}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
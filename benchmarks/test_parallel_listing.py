@@ -0,0 +1,59 @@
+"""
+Benchmark for retrieving a long listing of results with :meth:`TestLibrary.list_results`,
+fetching one page at a time or several pages in parallel, from a local stand-in for the
+validation service which adds a fixed latency to each request.
+
+Run with ``python -m pytest benchmarks -s`` to see the throughput (records per second) for each
+degree of parallelism. The number of results, page size and latency (in seconds) can be changed
+with the environment variables VF_BENCHMARK_LISTING, VF_BENCHMARK_PAGE_SIZE and VF_BENCHMARK_LATENCY.
+"""
+
+import os
+import time
+
+import pytest
+
+from conftest import StandInHandler
+
+
+N_RESULTS = int(os.environ.get("VF_BENCHMARK_LISTING", 20000))
+PAGE_SIZE = int(os.environ.get("VF_BENCHMARK_PAGE_SIZE", 1000))
+LATENCY = float(os.environ.get("VF_BENCHMARK_LATENCY", 0.05))
+PARALLEL = [1, 2, 4, 8]
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    monkeypatch.setattr(
+        StandInHandler,
+        "records",
+        [
+            {"id": f"{i:08x}-0000-0000-0000-000000000000", "project_id": "model-validation", "score": i * 0.001}
+            for i in range(N_RESULTS)
+        ],
+    )
+    monkeypatch.setattr(StandInHandler, "latency", LATENCY)
+    return StandInHandler.records
+
+
+"""
+1] Parallel retrieval of pages
+"""
+
+
+# 1.1) Fetching pages in parallel increases throughput, and returns the same records in order
+def test_list_results_parallel(test_library, listing):
+    throughput = {}
+    for parallel in PARALLEL:
+        StandInHandler.requests = 0
+        start = time.perf_counter()
+        results = test_library.list_results(parallel=parallel, page_size=PAGE_SIZE)
+        elapsed = time.perf_counter() - start
+        throughput[parallel] = len(results) / elapsed
+        print(
+            f"\nparallel={parallel}: {len(results)} results in {StandInHandler.requests} requests, "
+            f"{elapsed:.3f} s, {throughput[parallel]:.0f} records/s"
+        )
+        assert [result["id"] for result in results] == [result["id"] for result in listing]
+        assert results[0]["collab_id"] == "model-validation"
+    assert throughput[max(PARALLEL)] > 2 * throughput[1]
@@ -0,0 +1,104 @@
+"""
+Benchmark for the peak memory used when retrieving a large listing of results with
+:meth:`TestLibrary.list_results`, decoding the complete response (the default) or parsing it
+incrementally as it is received (``stream=True``), from a local stand-in for the validation service.
+
+Each retrieval takes place in a fresh interpreter, in which the increase of the peak resident
+set size (RSS) is measured. Run with ``python -m pytest benchmarks -s`` to see the results.
+The number of results can be changed with the environment variable VF_BENCHMARK_STREAM_RESULTS
+(default 200000).
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import StandInHandler, unsigned_token
+
+resource = pytest.importorskip("resource")  # not available on Windows
+
+
+N_RESULTS = int(os.environ.get("VF_BENCHMARK_STREAM_RESULTS", 200000))
+
+# retrieves the listing, then prints the number of results and the peak RSS before and after, in bytes
+RETRIEVE = """
+import resource, sys
+import requests
+import ebrains_validation_framework
+from ebrains_validation_framework import TestLibrary
+
+
+def peak_rss():
+    # on Linux, ru_maxrss includes the memory used by the parent process before exec, but VmHWM does not
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # in bytes on macOS
+
+
+url, token, token_file, stream = sys.argv[1:]
+ebrains_validation_framework.TOKENFILE = token_file
+test_library = TestLibrary(token=token, environment="dev")
+test_library.url = url
+before = peak_rss()
+if stream == "stream":
+    n_results = sum(1 for result in test_library.list_results(stream=True) if "collab_id" in result)
+else:
+    n_results = sum(1 for result in test_library.list_results() if "collab_id" in result)
+print(n_results, before, peak_rss())
+"""
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    monkeypatch.setattr(
+        StandInHandler,
+        "records",
+        [
+            {
+                "id": f"{i:08x}-0000-0000-0000-000000000000",
+                "project_id": "model-validation",
+                "model_instance_id": "e5e3ae1d-0c1a-4d12-a2e4-2c6b4bb95d62",
+                "test_instance_id": "9c5b86a6-b3c2-4d5b-8a9e-f4a3c8bd8e43",
+                "score": i * 0.001,
+                "passed": None,
+                "timestamp": "2024-05-17T09:30:15.000250+00:00",
+                "results_storage": [{"download_url": "https://data-proxy.ebrains.eu/api/v1/buckets/x/y.json"}],
+            }
+            for i in range(N_RESULTS)
+        ],
+    )
+    monkeypatch.setattr(StandInHandler, "latency", 0.0)
+    return StandInHandler.records
+
+
+def peak_rss_increase(url, token_file, mode):
+    result = subprocess.run(
+        [sys.executable, "-c", RETRIEVE, url, unsigned_token(), token_file, mode],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    n_results, before, after = (int(value) for value in result.stdout.split())
+    return n_results, after - before
+
+
+"""
+1] Peak memory of large listings
+"""
+
+
+# 1.1) Parsing the response incrementally uses a small fraction of the memory
+def test_list_results_stream_memory(stand_in_server, token_file, listing):
+    increase = {}
+    for mode in ("complete", "stream"):
+        n_results, increase[mode] = peak_rss_increase(stand_in_server, token_file, mode)
+        print(f"\n{mode}: {n_results} results, peak RSS increase {increase[mode] / 1e6:.1f} MB")
+        assert n_results == N_RESULTS
+    assert increase["stream"] < increase["complete"] / 5
@@ -9,21 +9,35 @@ License: BSD 3-clause, see LICENSE.txt
 
 import os
 import re
+import base64
 import getpass
 import json
+import time
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 
 import platform
 import socket
 from importlib import import_module
 from pathlib import Path
-from urllib.error import URLError
-from urllib.parse import urlparse, urlunparse, parse_qs, urljoin, urlencode, quote
+from urllib.parse import urlparse, urlunparse, parse_qs, urljoin, urlencode, quote, unquote
 
-import requests
-from requests.auth import AuthBase
-from .datastores import URI_SCHEME_MAP
-from nameparser import HumanName
+from . import tracing
+from .httpcache import HTTPCache
+from .instrumentation import CallBudget, RequestEvent, endpoint_template
+from .jsoncodec import get_codec
+from .jsonstream import iter_json_array
+from .metadatastore import MetadataStore, entity_tags
+from .mirror import CatalogMirror
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight
+from .tokencache import TokenCache
+from .vocabulary import Vocabulary, normalize_filters
+
+# `requests`, `nameparser` and the data store modules are imported where they are first used,
+# so that importing this package stays fast for short-lived processes
 
 
 # check if running within Jupyter notebook inside Collab v2
@@ -40,6 +54,15 @@ __version__ = "0.9.2"
 
 TOKENFILE = os.path.expanduser("~/.ebrainstoken")
 
+# tokens expiring within this many seconds are checked with the EBRAINS IAM service
+TOKEN_EXPIRY_MARGIN = 300
+
+# size in bytes of the chunks read from the network when parsing streamed listings
+STREAM_CHUNK_SIZE = 65536
+
+# maximum number of IDs given to the `id` filter of a listing in one request, to limit the length of the URL
+MAX_IDS_PER_REQUEST = 100
+
 
 class ResponseError(Exception):
     pass
@@ -48,7 +71,7 @@ class ResponseError(Exception):
 def handle_response_error(message, response):
     try:
         structured_error_message = response.json()
-    except (json.JSONDecodeError, requests.JSONDecodeError):
+    except ValueError:  # includes json.JSONDecodeError and requests.JSONDecodeError
         structured_error_message = None
     if structured_error_message:
         response_text = str(structured_error_message)  # temporary, to be improved
@@ -58,17 +81,42 @@ def handle_response_error(message, response):
     raise ResponseError(full_message)
 
 
+def _decode_token_claims(token):
+    """
+    Return the claims contained in a JWT access token, or None if they cannot be read.
+
+    The signature is not verified: this is done by the validation service on every request.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+    if isinstance(claims, dict):
+        return claims
+    return None
+
+
 def renameNestedJSONKey(iterable, old_key, new_key):
-    if isinstance(iterable, list):
-        return [renameNestedJSONKey(item, old_key, new_key) for item in iterable]
+    # Renames `old_key` in a dict, or in each dict of a list, in place.
+    # Only the top-level records are changed; nested objects keep their keys.
+    # Called on freshly decoded responses, so it is written to touch each record only once,
+    # without copying the list or the keys of each record.
     if isinstance(iterable, dict):
-        for key in list(iterable.keys()):
-            if key == old_key:
-                iterable[new_key] = iterable.pop(key)
+        if old_key in iterable:
+            iterable[new_key] = iterable.pop(old_key)
+    elif isinstance(iterable, list):
+        for item in iterable:
+            if isinstance(item, dict):
+                if old_key in item:
+                    item[new_key] = item.pop(old_key)
+            elif isinstance(item, list):
+                renameNestedJSONKey(item, old_key, new_key)
     return iterable
 
 
-class EBRAINSAuth(AuthBase):
+class EBRAINSAuth(object):
     """Attaches OIDC Bearer Authentication to the given Request object."""
 
     def __init__(self, token):
@@ -81,20 +129,182 @@ class EBRAINSAuth(AuthBase):
         return r
 
 
+def _body_size(data):
+    # number of bytes in the body of a request, as given to `data`
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return 0
+
+
+def make_session(pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True):
+    """
+    Create a :class:`requests.Session` with a pool of persistent connections.
+
+    `pool_connections` is the number of hosts for which a connection pool is kept,
+    `pool_maxsize` the maximum number of connections kept open to each host, and
+    `pool_block` whether to wait for a free connection (rather than opening an extra,
+    unpooled one) when all connections to a host are in use.
+    With `keep_alive=False`, connections are closed after each request.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
 class BaseClient(object):
     """
     Base class that handles EBRAINS authentication
+
+    All requests to the validation service are sent through a pooled
+    :class:`requests.Session`, so that connections are reused between calls.
+    Clients created with :meth:`from_existing` share the session of the original client.
+
+    Parameters
+    ----------
+    session : requests.Session, optional
+        Session to use for all requests; by default a new one is created with :func:`make_session`.
+    pool_connections : int, optional
+        Number of hosts for which a pool of connections is kept; default 10.
+    pool_maxsize : int, optional
+        Maximum number of connections kept open per host; default 10.
+        Should be at least the number of threads making requests in parallel.
+    pool_block : boolean, optional
+        If True, wait for a free pooled connection instead of opening an extra one; default False.
+    keep_alive : boolean, optional
+        Set to False to close connections after each request; default True.
+    json_codec : string, optional
+        JSON library used to encode requests and decode responses: "orjson", "ujson" or "json".
+        By default the fastest installed library is used; see :mod:`ebrains_validation_framework.jsoncodec`.
+    http_cache : boolean or HTTPCache, optional
+        Whether to cache the responses of :meth:`TestLibrary.get_test_definition`,
+        :meth:`TestLibrary.get_test_instance`, :meth:`ModelCatalog.get_model` and
+        :meth:`ModelCatalog.get_model_instance`; default True. An existing
+        :class:`~ebrains_validation_framework.httpcache.HTTPCache` can also be given,
+        to share it between clients.
+    cache_ttl : float, optional
+        Number of seconds for which a cached response is reused without contacting the server,
+        if the server does not provide ETag or Last-Modified headers; default 300.
+        Responses with these headers are revalidated with the server on each use.
+    cache_maxsize : int, optional
+        Maximum number of cached responses; default 1000.
+    metadata_store : boolean, string or MetadataStore, optional
+        Persistent store of models, tests, their instances, results and attribute options, shared by
+        all processes using the same database file; the `get_*` methods look up entities there before
+        contacting the server. Pass True to use the default location, the path of a database file,
+        or a :class:`~ebrains_validation_framework.metadatastore.MetadataStore`. Not used by default.
+    mirror : boolean, string or CatalogMirror, optional
+        Local mirror of the model catalog, test library and results, kept up to date by :meth:`sync_mirror`,
+        from which :meth:`ModelCatalog.list_models`, :meth:`TestLibrary.list_tests` and
+        :meth:`TestLibrary.list_results` are then answered without contacting the server, and which is
+        searched by :meth:`ModelCatalog.search_models` and :meth:`TestLibrary.search_tests`. Pass True to use
+        the default location, the path of a database file, or a
+        :class:`~ebrains_validation_framework.mirror.CatalogMirror`. Not used by default.
+    vocabulary : boolean, string or Vocabulary, optional
+        Cache of the valid values of the attributes of models and tests, retrieved with one request and
+        kept in memory and on disk for a day, which answers `get_attribute_options` and is used to check
+        the values of filters before listings are requested; see :mod:`ebrains_validation_framework.vocabulary`.
+        Pass True (the default) to use the default location, the path of a JSON file, or a
+        :class:`~ebrains_validation_framework.vocabulary.Vocabulary`. With False, filter values are not
+        checked, and attribute options are requested from the server each time.
+    coalesce : boolean, optional
+        If True (the default), identical GET requests made concurrently from several threads
+        (or coroutines, for the asynchronous clients) share a single request to the server.
+    rate_limiter : boolean or RateLimiter, optional
+        If True (the default), the number of requests in progress at once is adapted to the load of
+        the server, and requests rejected with status 429 or 503 are retried, as described in
+        :mod:`ebrains_validation_framework.ratelimit`. A configured
+        :class:`~ebrains_validation_framework.ratelimit.RateLimiter` can also be given, e.g. to share
+        it between clients.
+    requests_per_second : float, optional
+        Maximum rate of requests, if the default rate limiter is used. By default the rate is not limited.
+    request_hooks : list, optional
+        Functions called with a :class:`~ebrains_validation_framework.instrumentation.RequestEvent`
+        (method, endpoint, status, bytes, latency, retries and cache outcome) for each request;
+        see :meth:`add_request_hook`.
+    cassette : string or Cassette, optional
+        Path of a file in which the HTTP exchanges are recorded, or from which they are replayed without
+        network access, or a :class:`~ebrains_validation_framework.cassette.Cassette`; see
+        :mod:`ebrains_validation_framework.cassette`. A path is replayed if the file exists, otherwise
+        recorded. The token is not checked when replaying. The cassette is used for all the requests
+        made with the session, including those of other clients sharing it.
     """
 
     # Note: Could possibly simplify the code later
 
     __test__ = False
 
-    def __init__(self, username=None, password=None, environment="production", token=None, interactive=True):
+    def __init__(
+        self,
+        username=None,
+        password=None,
+        environment="production",
+        token=None,
+        interactive=True,
+        session=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        json_codec=None,
+        http_cache=True,
+        cache_ttl=300,
+        cache_maxsize=1000,
+        metadata_store=None,
+        mirror=None,
+        vocabulary=True,
+        coalesce=True,
+        rate_limiter=True,
+        requests_per_second=None,
+        request_hooks=None,
+        cassette=None,
+    ):
         self.username = username
         self.verify = True
         self.environment = environment
         self.token = token
+        if session is None:
+            session = make_session(pool_connections, pool_maxsize, pool_block, keep_alive)
+        self.session = session
+        if cassette is not None:
+            from .cassette import Cassette, mount_cassette
+
+            if not isinstance(cassette, Cassette):
+                cassette = Cassette(cassette)
+            mount_cassette(session, cassette)
+        self.cassette = cassette
+        self.codec = get_codec(json_codec)
+        if http_cache is True:
+            http_cache = HTTPCache(ttl=cache_ttl, maxsize=cache_maxsize)
+        self.http_cache = http_cache if http_cache is not False else None  # an empty cache is falsy
+        if metadata_store is True:
+            metadata_store = MetadataStore()
+        elif isinstance(metadata_store, (str, Path)):
+            metadata_store = MetadataStore(str(metadata_store))
+        self.metadata_store = metadata_store if metadata_store is not False else None
+        if mirror is True:
+            mirror = CatalogMirror()
+        elif isinstance(mirror, (str, Path)):
+            mirror = CatalogMirror(str(mirror))
+        self.mirror = mirror if mirror is not False else None
+        if vocabulary is True:
+            vocabulary = Vocabulary()
+        elif isinstance(vocabulary, (str, Path)):
+            vocabulary = Vocabulary(str(vocabulary))
+        self.vocabulary = vocabulary if vocabulary is not False else None
+        self.single_flight = SingleFlight() if coalesce else None
+        if rate_limiter is True:
+            rate_limiter = RateLimiter(requests_per_second=requests_per_second)
+        self.rate_limiter = rate_limiter or None
+        self.request_hooks = list(request_hooks or [])
         if environment == "production":
             self.url = "https://model-validation-api.apps.ebrains.eu"
         elif environment == "staging":
@@ -118,84 +328,125 @@ class BaseClient(object):
                         raise KeyError(f"{err_msg_base} does not contain environment = {environment}")
             else:
                 raise IOError(f"{err_msg_base} not found in the current directory.")
-        self._authenticate(password, interactive)
+        if cassette is not None and cassette.mode == "replay":
+            # responses are taken from the cassette, so the token cannot be (and need not be) checked
+            self._token_info = None
+            self.auth = EBRAINSAuth(self.token) if self.token else None
+        else:
+            self._authenticate(password, interactive)
 
     def _authenticate(self, password, interactive):
         # If a token is provided, we try using it.
         # If not, we try to get a token from the environment
         # or from a local cache
+        self._token_info = None
+        self._token_cache = TokenCache(TOKENFILE)
         if not self.token:
             if have_collab_token_handler:
                 # if are we running in a Jupyter notebook within the Collaboratory
                 # the token is already available
                 self.token = oauth.get_token()
-            elif os.path.exists(TOKENFILE):
+            elif self._token_cache.exists():
                 if self.username:
-                    with open(TOKENFILE) as fp:
-                        data = json.load(fp).get(self.username, None)
-                        if data and "access_token" in data:
-                            self.token = data["access_token"]
-                        else:
-                            print(f"No token for {self.username} found in {TOKENFILE}")
+                    if not self._load_cached_token():
+                        print(f"No token for {self.username} found in {TOKENFILE}")
                 else:
                     print("Authentication token file found, but you have not provided your username.")
             else:
                 print("EBRAINS authentication token file not found locally.")
 
-        # If we don't have a token, we try to authenticate with username and password
         if not self._check_token_valid():
-            print(
-                "EBRAINS authentication token is invalid or has expired. "
-                "Will need to re-authenticate."
-            )
-            if (not self.username) and interactive:
-                print("\n==============================================")
-                print("Please enter your EBRAINS username.")
-                self.username = input("EBRAINS Username: ")
-
-            if self.username:
-                password = password or os.environ.get("EBRAINS_PASS")
-                if (not password) and interactive:
-                    # prompt for password
-                    print("Please enter your EBRAINS password: ")
-                    password = getpass.getpass()
-
-                if password:
-                    try:
-                        self._ebrains_auth(self.username, password)
-                    except Exception:
-                        print("Authentication Failure! Password entered is possibly incorrect.")
-                        raise
+            # Only one process at a time re-authenticates; the others wait for the lock,
+            # then use the token it stored, if any
+            with self._token_cache.lock():
+                if not (self._load_cached_token() and self._check_token_valid()):
+                    self._reauthenticate(password, interactive)
+                if self.token:
+                    self._store_token()
+        elif self.token:
+            self._store_token()
 
         if self.token:
             self.auth = EBRAINSAuth(self.token)
-
-            # store token in local cache
-            if os.path.exists(TOKENFILE):
-                with open(TOKENFILE, "r") as fp:
-                    token_data = json.load(fp)
-            else:
-                token_data = {}
-            token_data[self.username] = {"access_token": self.token}
-
-            with open(TOKENFILE, "w") as fp:
-                json.dump(token_data, fp)
-                fp.write("\n")
-            os.chmod(TOKENFILE, 0o600)
         else:
             self.auth = None
 
+    def _reauthenticate(self, password, interactive):
+        # If we don't have a valid token, we try to authenticate with username and password
+        print("EBRAINS authentication token is invalid or has expired. Will need to re-authenticate.")
+        if (not self.username) and interactive:
+            print("\n==============================================")
+            print("Please enter your EBRAINS username.")
+            self.username = input("EBRAINS Username: ")
+
+        if self.username:
+            password = password or os.environ.get("EBRAINS_PASS")
+            if (not password) and interactive:
+                # prompt for password
+                print("Please enter your EBRAINS password: ")
+                password = getpass.getpass()
+
+            if password:
+                try:
+                    self._ebrains_auth(self.username, password)
+                except Exception:
+                    print("Authentication Failure! Password entered is possibly incorrect.")
+                    raise
+
+    def _load_cached_token(self):
+        # Use the token stored for this user in the local cache, if it differs from the current one.
+        # Returns True if a new token was loaded.
+        if not self.username:
+            return False
+        data = self._token_cache.get(self.username)
+        if data and data["access_token"] != self.token:
+            self.token = data["access_token"]
+            self._token_info = data
+            return True
+        return False
+
+    def _store_token(self):
+        # store token in local cache; the file is only rewritten if the entry has changed
+        if not self.username:
+            return
+        try:
+            self._token_cache.store(self.username, self._get_token_info() or {"access_token": self.token})
+        except OSError as err:
+            print(f"Unable to save authentication token to {TOKENFILE}: {err}")
+
+    def _get_token_info(self):
+        # Return the expiry time and username for the current token, taken from the
+        # local token cache if available, otherwise decoded from the token itself
+        if not self.token:
+            return None
+        cached = self._token_info
+        if cached and cached.get("access_token") == self.token and cached.get("expires_at") and cached.get("username"):
+            return cached
+        claims = _decode_token_claims(self.token)
+        if claims and "exp" in claims and "preferred_username" in claims:
+            return {"access_token": self.token, "expires_at": claims["exp"], "username": claims["preferred_username"]}
+        return None
+
     def _check_token_valid(self):
         if self.token:
-            url = "https://iam.ebrains.eu/auth/realms/hbp/protocol/openid-connect/userinfo"
-            data = requests.get(url, auth=EBRAINSAuth(self.token), verify=self.verify)
-            if data.status_code == 200:
+            token_info = self._get_token_info()
+            if token_info and token_info["expires_at"] <= time.time():
+                return False
+            elif token_info and token_info["expires_at"] - time.time() > TOKEN_EXPIRY_MARGIN:
+                remote_username = token_info["username"]
+            else:
+                # the token is close to expiry, or we cannot read its contents,
+                # so we ask the EBRAINS IAM service
+                url = "https://iam.ebrains.eu/auth/realms/hbp/protocol/openid-connect/userinfo"
+                data = self.session.get(url, auth=EBRAINSAuth(self.token), verify=self.verify)
+                if data.status_code != 200:
+                    return False
                 remote_username = data.json()["preferred_username"]
-                if self.username and self.username != remote_username:
-                    raise Exception("Username does not match token")
-                else:
-                    self.username = remote_username
-                return True
+            if self.username and self.username != remote_username:
+                raise Exception("Username does not match token")
+            else:
+                self.username = remote_username
+            return True
         return False
 
     def _format_people_name(self, names):
@@ -220,6 +471,8 @@ class BaseClient(object):
                 raise ValueError("Name input as dict but without required keys: given_name, family_name")
 
         # string input - multiple persons
+        from nameparser import HumanName
+
         output_names_list = []
         if names:
             input_names_list = names.split(";")
@@ -326,6 +579,8 @@ class BaseClient(object):
         """
         EBRAINS authentication
         """
+        import requests
+
         session = requests.Session()
         # log-in page of model validation service
         r_login = session.get(self.url + "/login", allow_redirects=False)
@@ -375,7 +630,7 @@ class BaseClient(object):
             raise Exception(
                 "Something went wrong. Status code {} from final authentication step".format(r_val.status_code)
             )
-        config = r_val.json()
+        config = self._decode(r_val)
         self.token = config["access_token"]
         self.config = config
 
@@ -383,22 +638,688 @@ class BaseClient(object):
     def from_existing(cls, client):
         """Used to easily create a TestLibrary if you already have a ModelCatalog, or vice versa"""
         obj = cls.__new__(cls)
-        for attrname in ("username", "url", "token", "verify", "auth", "environment"):
+        for attrname in (
+            "username",
+            "url",
+            "token",
+            "verify",
+            "auth",
+            "environment",
+            "session",
+            "cassette",
+            "codec",
+            "http_cache",
+            "metadata_store",
+            "mirror",
+            "vocabulary",
+            "single_flight",
+            "rate_limiter",
+            "request_hooks",
+        ):
             setattr(obj, attrname, getattr(client, attrname))
         obj._set_app_info()
         return obj
 
-    def _get_attribute_options(self, param, valid_params):
+    def _request(self, method, url, cache=False, **kwargs):
+        """
+        Send an authenticated request to the validation service, using the shared session.
+
+        With `cache=True`, GET requests are answered from the HTTP cache where possible.
+        Identical GET requests made at the same time by several threads are sent only once.
+        Other requests discard the cached data which they may have made out of date.
+        """
+        kwargs.setdefault("auth", self.auth)
+        kwargs.setdefault("verify", self.verify)
+        if method != "GET":
+            try:
+                return self._send(method, url, **kwargs)
+            finally:
+                # also if no response was received, as the change may have been made nonetheless
+                self._invalidate_cache(url)
+        if self.single_flight is not None and set(kwargs) <= {"auth", "verify"}:
+            # identical requests in progress in other threads are shared
+            return self.single_flight.do((url, cache), self._get, url, cache, **kwargs)
+        return self._get(url, cache, **kwargs)
+
+    def _get(self, url, cache, **kwargs):
+        # GET request, answered from the HTTP cache where possible if `cache` is True
+        if self.http_cache is None or not cache:
+            return self._send("GET", url, **kwargs)
+
+        cached = self.http_cache.get_fresh(url)
+        if cached is None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            response = self._send(
+                "GET", url, cacheable=True, headers=dict(headers, **self.http_cache.validators(url)), **kwargs
+            )
+            cached = self.http_cache.update(url, response.status_code, response.headers, response.content)
+            if cached is None:
+                if response.status_code == 304:  # cached copy was discarded in the meantime
+                    response = self._send("GET", url, cacheable=True, headers=headers, **kwargs)
+                    self.http_cache.update(url, response.status_code, response.headers, response.content)
+                return response
+        elif self._instrumented:
+            self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "hit")
+        return self._cached_response(url, cached)
+
+    def _send(self, method, url, cacheable=False, **kwargs):
+        # send a request through the rate limiter, which retries it if throttled by the server,
+        # and report it to the request hooks; `cacheable` is True for responses stored in the HTTP cache
+        attempts = 0
+
+        def send():
+            nonlocal attempts
+            attempts += 1
+            return self.session.request(method, url, **kwargs)
+
+        self._check_call_budgets(method, url)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = send() if self.rate_limiter is None else self.rate_limiter.call(method, send)
+            return response
+        finally:
+            if self._instrumented:
+                streamed, bytes_sent = kwargs.get("stream", False), _body_size(kwargs.get("data"))
+                self._report_request(method, url, response, streamed, bytes_sent, start, attempts, cacheable)
+
+    def add_request_hook(self, hook):
+        """
+        Register a function to be called with a :class:`~ebrains_validation_framework.instrumentation.RequestEvent`
+        for each request to the validation service, and for each request answered locally from the
+        HTTP cache or the metadata store.
+
+        Hooks are shared with clients created with :meth:`from_existing`, and are called in the thread
+        (or, for the asynchronous clients, the event loop) which made the request, so should be quick.
+
+        Example
+        -------
+        >>> from ebrains_validation_framework.instrumentation import RequestStats
+        >>> stats = RequestStats()
+        >>> test_library.add_request_hook(stats)
+        >>> results = test_library.list_results(test_id=test_id)
+        >>> print(stats.report())
+        """
+        self.request_hooks.append(hook)
+
+    def remove_request_hook(self, hook):
+        """Unregister a function registered with :meth:`add_request_hook`."""
+        self.request_hooks.remove(hook)
+
+    @contextmanager
+    def call_budget(self, max_calls, on_exceed="raise"):
+        """
+        Context manager limiting the number of requests sent to the validation service within it.
+
+        Requests made by this client and by the clients created from it (or from which it was created)
+        with :meth:`from_existing` are counted, including those made by the functions of
+        :mod:`ebrains_validation_framework.utils` given it as `client_obj`, and those made in other threads
+        while the context is active. Requests answered from the HTTP cache or the metadata store are not counted.
+
+        Parameters
+        ----------
+        max_calls : int
+            Maximum number of requests.
+        on_exceed : "raise" or "report", optional
+            With "raise" (the default), each request beyond the budget raises
+            :class:`~ebrains_validation_framework.instrumentation.CallBudgetExceeded`, whose message gives
+            the number of requests to each endpoint; it is raised again at the end of the context if it
+            was caught. With "report", the numbers of requests to each endpoint are printed at the end
+            of the context if the budget was exceeded.
+
+        Returns
+        -------
+        CallBudget
+            A :class:`~ebrains_validation_framework.instrumentation.CallBudget`, with the total number of
+            requests (`calls`) and the number for each endpoint (`by_endpoint`).
+
+        Examples
+        --------
+        >>> with test_library.call_budget(max_calls=10) as budget:
+        ...     styled_df, excluded = utils.generate_score_matrix(result_list=result_list, client_obj=test_library)
+        >>> budget.by_endpoint
+        {'GET /results/': 1, 'GET /tests/query/instances/{id}': 3, ...}
+        """
+        budget = CallBudget(max_calls, on_exceed)
+        self.add_request_hook(budget)
+        try:
+            yield budget
+        finally:
+            self.remove_request_hook(budget)
+        budget.check()
+
+    def _check_call_budgets(self, method, url):
+        # count a request about to be sent against the active call budgets,
+        # which raise CallBudgetExceeded before it is sent if it is beyond the budget
+        budgets = [hook for hook in self.request_hooks if isinstance(hook, CallBudget)]
+        if budgets:
+            endpoint = endpoint_template(url, self.url)
+            for budget in budgets:
+                budget.count(method, endpoint)
+
+    def _report_request(self, method, url, response, streamed, bytes_sent, start, attempts, cacheable):
+        # report a request sent at time `start` (from time.perf_counter) to the request hooks;
+        # `response` is None if no response was received, `streamed` True if its body has not been read yet
+        if response is None:
+            status_code, bytes_received, cache = None, 0, None
+        else:
+            status_code = response.status_code
+            if streamed:
+                bytes_received = int(response.headers.get("Content-Length") or 0)
+            else:
+                bytes_received = len(response.content or b"")
+            cache = ("revalidated" if status_code == 304 else "miss") if cacheable else None
+        self._emit_request(
+            method,
+            url,
+            status_code,
+            bytes_sent,
+            bytes_received,
+            time.perf_counter() - start,
+            max(0, attempts - 1),
+            cache,
+        )
+
+    def _emit_request(self, method, url, status_code, bytes_sent, bytes_received, latency, retries, cache):
+        event = RequestEvent(
+            method,
+            url,
+            endpoint_template(url, self.url),
+            status_code,
+            bytes_sent,
+            bytes_received,
+            latency,
+            retries,
+            cache,
+        )
+        for hook in list(self.request_hooks):
+            hook(event)
+        tracing.record_request(event)
+
+    @property
+    def _instrumented(self):
+        # whether requests are reported, to request hooks or as tracing spans
+        return bool(self.request_hooks) or tracing.enabled()
+
+    @staticmethod
+    def _cached_response(url, cached):
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+
+        response = Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(cached.headers)
+        response._content = cached.content
+        return response
+
+    def _invalidate_cache(self, url):
+        # A change to a model or test may affect any of the cached responses for models or tests,
+        # e.g. those retrieved using an alias, so we discard all responses for the collection.
+        # In the metadata store, we discard the entries tagged with the identifiers or aliases in the URL.
+        if not url.startswith(self.url + "/"):
+            if self.http_cache is not None:
+                self.http_cache.clear()
+            if self.metadata_store is not None:
+                self.metadata_store.clear()
+            if self.mirror is not None:
+                self.mirror.invalidate()
+            return
+        path = url[len(self.url) + 1 :].split("?", 1)[0]
+        collection = path.split("/", 1)[0]
+        if self.http_cache is not None:
+            self.http_cache.invalidate(f"{self.url}/{collection}/")
+        if self.mirror is not None and collection in ("models", "tests", "results"):
+            self.mirror.invalidate(collection[:-1])
+        if self.metadata_store is not None:
+            self.metadata_store.invalidate(
+                *(unquote(part) for part in path.split("/")[1:] if part not in ("", "query", "instances", "latest"))
+            )
+
+    def _get_entity(self, kind, url, error_message, tags=(), missing_ok=False):
+        """
+        Retrieve the JSON data for one or more entities of the given kind, looking first in the metadata store.
+
+        `tags` are the identifiers or aliases used to look up the entities, in addition to those in the data.
+        If `missing_ok` is True, None is returned if the entity does not exist.
+        """
+        if self.metadata_store is not None:
+            content = self.metadata_store.get(kind, url)
+            if content is not None:
+                if self._instrumented:
+                    self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "store")
+                return self.codec.loads(content)
+        response = self._request("GET", url, cache=True)
+        if response.status_code == 404 and missing_ok:
+            return None
+        if response.status_code != 200:
+            handle_response_error(error_message, response)
+        data = self._decode(response)
+        if self.metadata_store is not None:
+            self.metadata_store.put(kind, url, response.content, entity_tags(data).union(tags))
+        return data
+
+    def _cached_entity(self, kind, url):
+        # the JSON data for an entity, if found in the metadata store or the HTTP cache, otherwise None
+        if self.metadata_store is not None:
+            content = self.metadata_store.get(kind, url)
+            if content is not None:
+                if self._instrumented:
+                    self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "store")
+                return self.codec.loads(content)
+        if self.http_cache is not None:
+            cached = self.http_cache.get_fresh(url)
+            if cached is not None:
+                if self._instrumented:
+                    self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "hit")
+                return self.codec.loads(cached.content)
+        return None
+
+    def _get_many(self, ids, get, parallel):
+        """
+        Call `get(id)` once for each distinct ID, with up to `parallel` calls at a time.
+
+        Returns the values in the order of `ids`. `get` returns None for IDs which do not exist;
+        these are reported, and None is returned in their place.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        found = dict(zip(unique_ids, self._map_concurrently(get, unique_ids, parallel)))
+        self._report_missing([id for id in unique_ids if found[id] is None])
+        return [found[id] for id in ids]
+
+    @staticmethod
+    def _map_concurrently(func, items, parallel):
+        # call `func` for each item in worker threads, up to `parallel` at a time, and return the values in order
+        if parallel > 1 and len(items) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(parallel, len(items))) as executor:
+                return list(executor.map(tracing.propagate(func), items))
+        return [func(item) for item in items]
+
+    @staticmethod
+    def _report_missing(missing_ids):
+        if missing_ids:
+            print("The following IDs could not be found: {}".format(", ".join(str(id) for id in missing_ids)))
+
+    @property
+    def throttling_stats(self):
+        """
+        Total time in seconds spent by requests waiting because of rate limiting or throttling by the server
+        ("throttled_time"), numbers of 429 and 503 responses ("throttled_responses") and of retried requests
+        ("retries"), and current limit on the number of requests in progress at once ("concurrency_limit").
+        """
+        if self.rate_limiter is None:
+            return {"throttled_time": 0.0, "throttled_responses": 0, "retries": 0, "concurrency_limit": None}
+        return self.rate_limiter.stats
+
+    @property
+    def coalescing_stats(self):
+        """
+        Numbers of GET requests sent to the server ("calls"), and of requests which instead
+        shared the response to an identical request already in progress ("coalesced").
+        """
+        if self.single_flight is None:
+            return {"calls": 0, "coalesced": 0}
+        return self.single_flight.stats
+
+    @property
+    def cache_stats(self):
+        """
+        Numbers of responses served from the HTTP cache ("hits"), fetched from the server ("misses"),
+        and confirmed as unchanged by the server ("revalidations").
+        """
+        if self.http_cache is None:
+            return {"hits": 0, "misses": 0, "revalidations": 0}
+        return self.http_cache.stats
+
+    def _encode(self, data):
+        """Serialize data to be sent to the validation service as JSON."""
+        return self.codec.dumps(data)
+
+    def _decode(self, response):
+        """Deserialize the JSON body of a response from the validation service."""
+        return self.codec.loads(response.content)
+
+    def _attribute_options_url(self, param, valid_params):
         if param in ("", "all"):
-            url = self.url + "/vocab/"
+            return self.url + "/vocab/"
         elif param in valid_params:
-            url = self.url + "/vocab/" + param.replace("_", "-") + "/"
+            return self.url + "/vocab/" + param.replace("_", "-") + "/"
         else:
             raise Exception("Specified attribute '{}' is invalid. Valid attributes: {}".format(param, valid_params))
-        return requests.get(url, auth=self.auth, verify=self.verify).json()
+
+    def _get_attribute_options(self, param, valid_params):
+        url = self._attribute_options_url(param, valid_params)
+        terms = self._vocabulary_terms() if self.vocabulary is not None else None
+        if terms is not None:
+            if param in ("", "all"):
+                return {field: list(values) for field, values in terms.items()}
+            if param in terms:
+                return list(terms[param])
+        return self._get_entity("vocab", url, "Error in retrieving attribute options")
+
+    def _vocabulary_terms(self, refresh=False):
+        # the valid values of all the attributes, retrieved with one request and cached in the vocabulary,
+        # or retrieved again if `refresh` is True; if the service cannot be reached, the cached values
+        # are used even if they have expired, or None is returned if there are none
+        import requests
+
+        entry = self.vocabulary.entry(self.url)
+        if entry is not None and not refresh and entry[0] + self.vocabulary.ttl >= time.time():
+            return entry[1]
+        try:
+            # the vocabulary is itself a cache, so the HTTP cache and the metadata store are not used
+            response = self._request("GET", self.url + "/vocab/")
+        except requests.exceptions.RequestException:
+            return entry[1] if entry else None
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving attribute options", response)
+        terms = self._decode(response)
+        self.vocabulary.put(self.url, terms)
+        return terms
+
+    def _normalize_filters(self, filters):
+        # check the values of the filters against the vocabulary, and replace them by the valid values they match,
+        # before any listing is requested; the vocabulary is retrieved again before a value is rejected,
+        # unless retrieved recently
+        if self.vocabulary is None or not any(field in filters for field in self.attribute_fields):
+            return filters
+        terms = self._vocabulary_terms()
+        if terms is None:  # service unreachable, and no vocabulary cached
+            return filters
+        try:
+            return normalize_filters(filters, terms, self.attribute_fields)
+        except ValueError:
+            if self.vocabulary.entry(self.url)[0] + self.vocabulary.refresh_interval > time.time():
+                raise
+        return normalize_filters(filters, self._vocabulary_terms(refresh=True), self.attribute_fields)
+
+    def _list_url(self, path, filters, size, from_index):
+        return (
+            self.url
+            + path
+            + "?"
+            + urlencode(filters, doseq=True)
+            + "&size="
+            + str(size)
+            + "&from_index="
+            + str(from_index)
+        )
+
+    def _fetch_page(self, path, filters, page_size, from_index, error_message, rename):
+        # retrieve one page of a listing, as a list of records
+        return self._fetch_page_with_size(path, filters, page_size, from_index, error_message, rename)[0]
+
+    def _fetch_page_with_size(self, path, filters, page_size, from_index, error_message, rename):
+        # retrieve one page of a listing, as a list of records and the size in bytes of the response body
+        response = self._request("GET", self._list_url(path, filters, page_size, from_index))
+        if response.status_code != 200:
+            handle_response_error(error_message, response)
+        records = self._decode(response)
+        if isinstance(records, dict):
+            records = [records]
+        if rename:
+            renameNestedJSONKey(records, "project_id", "collab_id")
+        return records, len(response.content)
+
+    def _stream_records(self, url, error_message, rename=True):
+        """
+        Generate the records of a listing, parsed incrementally from the response body as it is received,
+        so that only one record at a time is held in memory.
+        """
+        response = self._request("GET", url, stream=True)
+        try:
+            if response.status_code != 200:
+                handle_response_error(error_message, response)
+            for record in iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                if rename:
+                    renameNestedJSONKey(record, "project_id", "collab_id")
+                yield record
+        finally:
+            response.close()
+
+    def _list_parallel(self, path, filters, size, from_index, parallel, page_size, error_message, rename=True):
+        """
+        Retrieve up to `size` records of a listing, starting at `from_index`, fetching `parallel` pages at a time.
+
+        The service does not report the number of records in a listing, so the first page is
+        retrieved on its own; if it is full, windows of `parallel` pages are then retrieved
+        concurrently until a page is not full. Records are returned in order.
+        """
+        if page_size < 1 or parallel < 1:
+            raise ValueError("parallel and page_size must be positive integers")
+        from concurrent.futures import ThreadPoolExecutor
+
+        end = from_index + size
+        records = self._fetch_page(path, filters, min(page_size, size), from_index, error_message, rename)
+        start = from_index + len(records)
+        if len(records) < min(page_size, size):
+            return records
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            while start < end:
+                window = [(index, min(page_size, end - index)) for index in range(start, end, page_size)][:parallel]
+                pages = executor.map(
+                    tracing.propagate(
+                        lambda page: self._fetch_page(path, filters, page[1], page[0], error_message, rename)
+                    ),
+                    window,
+                )
+                for (index, count), page in zip(window, pages):
+                    records.extend(page)
+                    if len(page) < count:
+                        return records
+                start = window[-1][0] + window[-1][1]
+        return records
+
+    def _iter_pages(self, path, filters, page_size, prefetch, error_message, rename=True):
+        """
+        Generate the records of a listing, retrieving `page_size` records at a time.
+
+        If `prefetch` is True, the next page is retrieved in a worker thread while the records
+        of the current page are consumed, so at most two pages are held in memory.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be a positive integer")
+        executor = None
+        if prefetch:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=1)
+        next_page = None
+        from_index = 0
+        try:
+            while True:
+                if next_page is None:
+                    page = self._fetch_page(path, filters, page_size, from_index, error_message, rename)
+                else:
+                    page = next_page.result()
+                    next_page = None
+                from_index += page_size
+                last_page = len(page) < page_size
+                if executor is not None and not last_page:
+                    next_page = executor.submit(
+                        tracing.propagate(self._fetch_page),
+                        path,
+                        filters,
+                        page_size,
+                        from_index,
+                        error_message,
+                        rename,
+                    )
+                yield from page
+                if last_page:
+                    return
+                page = None
+        finally:
+            if executor is not None:
+                if next_page is not None:
+                    next_page.cancel()
+                executor.shutdown(wait=False)
+
+    def sync_mirror(self, full=False, results=True, parallel=4, page_size=1000):
+        """
+        Bring the local mirror given as `mirror` when creating the client up to date with the models
+        (with their instances), tests and results visible to the user.
+
+        Until a model or test is changed, or a result is registered, by this client,
+        :meth:`ModelCatalog.list_models`, :meth:`ModelCatalog.iter_models`, :meth:`TestLibrary.list_tests`,
+        :meth:`TestLibrary.iter_tests`, :meth:`TestLibrary.list_results` and :meth:`TestLibrary.iter_results`
+        (for results filtered by "id", "model_instance_id" or "test_instance_id") are then answered
+        from the mirror, without contacting the server, so they reflect the catalog at the time of
+        the synchronisation. Clients sharing the mirror, including in other processes, use it too.
+
+        Only new or changed records are written to the mirror. Results cannot be changed, so only those
+        more recent than the most recent result in the mirror are retrieved, if the server lists them
+        newest first; results deleted on the server are then not detected until the next full
+        synchronisation. The models and tests, and with `full=True` the results too, are retrieved
+        completely, and those no longer on the server are deleted from the mirror.
+        The progress of the synchronisation is saved after each page, so if it is interrupted
+        (e.g. by a network failure), calling this method again continues where it stopped.
+
+        Parameters
+        ----------
+        full : boolean, optional
+            If True, all the results are retrieved, so that deleted results are removed from the mirror.
+        results : boolean, optional
+            If False, results are not synchronised.
+        parallel : positive integer, optional
+            Number of pages retrieved at the same time, when collections are retrieved completely; default 4.
+        page_size : positive integer, optional
+            Number of records retrieved with each request; default 1000.
+
+        Returns
+        -------
+        dict
+            For "models", "tests" and "results", the "mode" of the synchronisation ("full" or "incremental"),
+            whether it "resumed" an interrupted one, the numbers of "requests" sent and of "records" and
+            "bytes" transferred, the numbers of records "added", "updated" and "deleted" in the mirror,
+            and the "total" number of records in the mirror.
+
+        Examples
+        --------
+        >>> model_catalog = ModelCatalog(username="alice", mirror=True)
+        >>> report = model_catalog.sync_mirror()
+        >>> report["results"]
+        {'mode': 'incremental', 'resumed': False, 'requests': 1, 'records': 1000, 'bytes': 612345,
+         'added': 12, 'updated': 0, 'deleted': 0, 'total': 23456}
+        >>> models = model_catalog.list_models(brain_region="hippocampus")  # no request to the server
+        """
+        if self.mirror is None:
+            raise Exception("This client has no mirror. Create it with mirror=True or the path of a database file.")
+        report = {}
+        for kind, path, fields, rename, time_field in self._mirrored_collections():
+            if kind == "result" and not results:
+                continue
+            with tracing.span("sync_mirror", entities=path.strip("/")):
+                report[kind + "s"] = self._sync_collection(
+                    kind, path, fields, rename, time_field, full, parallel, page_size
+                )
+        return report
+
+    def _sync_collection(self, kind, path, fields, rename, time_field, full, parallel, page_size):
+        # synchronise the records of one kind with the mirror, continuing any synchronisation in progress
+        mirror = self.mirror
+        state = mirror.sync_state(kind)
+        resumed = state is not None and not (full and state["mode"] == "incremental")
+        high_water = mirror.high_water(kind) if time_field else None
+        if not resumed:
+            state = mirror.begin_sync(kind, "full" if full or high_water is None else "incremental")
+        from_index = state["cursor"]
+        previous_time = None  # the time of the last record retrieved, in incremental mode
+        n_pages = 0
+        complete = False
+        while not complete:
+            incremental = state["mode"] == "incremental"
+            if incremental:
+                # usually few records are new, so pages are retrieved one at a time,
+                # starting with 100 records and doubling in size up to `page_size`
+                size = min(page_size, 100 * 2**n_pages)
+                starts = [from_index]
+            else:
+                size = page_size
+                starts = [from_index + i * size for i in range(parallel)]
+            n_pages += len(starts)
+            error_message = f"Error in retrieving {kind}s"
+            pages = self._map_concurrently(
+                lambda start: self._fetch_page_with_size(path, {}, size, start, error_message, rename),
+                starts,
+                parallel,
+            )
+            for start, (records, n_bytes) in zip(starts, pages):
+                transferred = {"requests": 1, "records": len(records), "bytes": n_bytes}
+                complete = len(records) < size
+                times = [record.get(time_field) for record in records] if time_field else []
+                latest = max(filter(None, times), default=None)
+                if incremental:
+                    # timestamps are ISO 8601 strings in UTC, which sort chronologically
+                    newest_first = None not in times and times == sorted(times, reverse=True)
+                    if not newest_first or (previous_time is not None and times and times[0] > previous_time):
+                        # new records cannot be told apart by their position, so all the records are retrieved
+                        stats = mirror.save_page(kind, [], fields, start, transferred=transferred)
+                        state = mirror.begin_sync(kind, "full", stats)
+                        from_index, complete = 0, False
+                        break
+                    previous_time = times[-1] if times else previous_time
+                    if times and times[-1] < high_water:
+                        records = [record for record, created in zip(records, times) if created >= high_water]
+                        complete = True
+                mirror.save_page(kind, records, fields, start + size, latest, transferred)
+                from_index = start + size
+                if complete:
+                    break
+        stats = mirror.finish_sync(kind)
+        return dict(mode=state["mode"], resumed=resumed, **stats, total=mirror.count(kind))
+
+    @staticmethod
+    def _mirrored_collections():
+        # for each collection in the mirror: kind of entity, path, filter fields, whether "project_id"
+        # is renamed "collab_id" in listings, and the field giving the time at which records were created,
+        # if they cannot be changed
+        return (
+            ("model", "/models/", ModelCatalog.valid_filters, True, None),
+            ("test", "/tests/", TestLibrary.valid_filters, False, None),
+            ("result", "/results/", ("id", "model_instance_id", "test_instance_id"), True, "timestamp"),
+        )
+
+    def _list_mirror(self, kind, filters, size=1000000, from_index=0):
+        # the records of a listing, taken from the mirror, or None if it has not been synchronised
+        # or if the filters are not indexed in the mirror
+        if self.mirror is None or self.mirror.synced_at(kind) is None:
+            return None
+        fields = next(collection[2] for collection in self._mirrored_collections() if collection[0] == kind)
+        if any(filter not in fields for filter in filters):
+            return None
+        return [self.codec.loads(content) for content in self.mirror.query(kind, filters, size, from_index)]
+
+    def _search_mirror(self, kind, text, size, filters):
+        # the records of a full-text search of the mirror, most relevant first
+        if self.mirror is None:
+            raise Exception("This client has no mirror. Create it with mirror=True or the path of a database file.")
+        if not self.mirror.count(kind):
+            raise Exception(f"The mirror contains no {kind}s. Synchronise it first with sync_mirror().")
+        return [self.codec.loads(content) for content in self.mirror.search(kind, text, size, filters)]
+
+    @staticmethod
+    def _check_filters(filters, valid_filters):
+        for filter in filters:
+            if filter not in valid_filters:
+                raise ValueError(
+                    "The specified filter '{}' is an invalid filter!\nValid filters are: {}".format(
+                        filter, valid_filters
+                    )
+                )
+
+    @staticmethod
+    def _check_attribute_values(data, fields, values):
+        for field in fields:
+            if field in data and data[field] not in values[field] + [None]:
+                raise Exception(
+                    "{} = '{}' is invalid.\nValue has to be one of these: {}".format(field, data[field], values[field])
+                )
 
     def api_info(self):
-        return requests.get(self.url).json()
+        return self._decode(self.session.get(self.url, verify=self.verify))
 
 
 class TestLibrary(BaseClient):
@@ -455,6 +1376,11 @@ class TestLibrary(BaseClient):
     token : string, optional
         You may directly input a valid authenticated EBRAINS access token.
         Note: you should use the `access_token` and NOT `refresh_token`.
+    **kwargs :
+        Other options of :class:`BaseClient`: connection pool settings (`session`, `pool_connections`,
+        `pool_maxsize`, `pool_block`, `keep_alive`), `json_codec`, the HTTP cache (`http_cache`, `cache_ttl`,
+        `cache_maxsize`), `metadata_store`, `mirror`, `vocabulary`, `coalesce`, rate limiting (`rate_limiter`,
+        `requests_per_second`), `request_hooks` and `cassette`.
 
     Examples
     --------
@@ -466,8 +1392,33 @@ class TestLibrary(BaseClient):
 
     __test__ = False
 
-    def __init__(self, username=None, password=None, environment="production", token=None, interactive=True):
-        super(TestLibrary, self).__init__(username, password, environment, token, interactive)
+    valid_filters = [
+        "alias",
+        "name",
+        "implementation_status",
+        "brain_region",
+        "species",
+        "cell_type",
+        "data_type",
+        "recording_modality",
+        "test_type",
+        "score_type",
+        "author",
+    ]
+    attribute_fields = [
+        "species",
+        "brain_region",
+        "cell_type",
+        "test_type",
+        "score_type",
+        "recording_modality",
+        "implementation_status",
+    ]
+
+    def __init__(
+        self, username=None, password=None, environment="production", token=None, interactive=True, **kwargs
+    ):
+        super(TestLibrary, self).__init__(username, password, environment, token, interactive, **kwargs)
         self._set_app_info()
 
     def _set_app_info(self):
@@ -531,19 +1482,42 @@ class TestLibrary(BaseClient):
             if os.path.isfile(test_path):
                 # test_path is a local path
                 with open(test_path) as fp:
-                    test_json = json.load(fp)
+                    return json.load(fp)
             else:
                 raise Exception("Error in local file path specified by test_path.")
-        else:
-            if test_id:
-                url = self.url + "/tests/" + test_id
-            else:
-                url = self.url + "/tests/" + quote(str(alias))
-            test_json = requests.get(url, auth=self.auth, verify=self.verify)
+        return self._get_entity("test", self._test_url(test_id, alias), "Error in retrieving test", (test_id, alias))
 
-        if test_json.status_code != 200:
-            handle_response_error("Error in retrieving test", test_json)
-        return test_json.json()
+    def get_test_definitions(self, test_ids, parallel=10):
+        """Retrieve several test definitions.
+
+        Each test is retrieved only once, even if its ID appears several times, and tests
+        found in the local caches are not requested from the server. The others are retrieved
+        concurrently. Tests which cannot be found are reported, without interrupting the retrieval
+        of the others.
+
+        Parameters
+        ----------
+        test_ids : list of UUID
+            System generated unique identifiers associated with test definitions.
+        parallel : positive integer
+            Maximum number of tests retrieved at the same time; default is set to 10.
+
+        Returns
+        -------
+        list
+            Information about the tests, in the order of `test_ids`, with None for tests which were not found.
+
+        Examples
+        --------
+        >>> tests = test_library.get_test_definitions([result["test_id"] for result in results])
+        """
+
+        def get(test_id):
+            return self._get_entity(
+                "test", self._test_url(test_id), "Error in retrieving test", (test_id,), missing_ok=True
+            )
+
+        return self._get_many(test_ids, get, parallel)
 
     def get_validation_test(
         self,
@@ -605,7 +1579,7 @@ class TestLibrary(BaseClient):
                 "One of the following needs to be provided for finding the required test:\n"
                 "test_path, instance_id, test_id or alias"
             )
-        else:
+        with tracing.span("resolve_test", test_id=test_id or None, alias=alias or None, version=version or None):
             if instance_id:
                 # `instance_id` is sufficient for identifying both test and instance
                 test_instance_json = self.get_test_instance(
@@ -625,24 +1599,25 @@ class TestLibrary(BaseClient):
                     version=version,
                 )
 
-        # Import the Test class specified in the definition.
-        # This assumes that the module containing the class is installed.
-        # In future we could add the ability to (optionally) install
-        # Python packages automatically.
-        path_parts = test_instance_json["path"].split(".")
-        cls_name = path_parts[-1]
-        module_name = ".".join(path_parts[:-1])
-        test_module = import_module(module_name)
-        test_cls = getattr(test_module, cls_name)
+            # Import the Test class specified in the definition.
+            # This assumes that the module containing the class is installed.
+            # In future we could add the ability to (optionally) install
+            # Python packages automatically.
+            path_parts = test_instance_json["path"].split(".")
+            cls_name = path_parts[-1]
+            module_name = ".".join(path_parts[:-1])
+            test_module = import_module(module_name)
+            test_cls = getattr(test_module, cls_name)
 
         # Load the reference data ("observations")
-        observation_data = self._load_reference_data(test_json["data_location"])
+        with tracing.span("download_observation"):
+            observation_data = self._load_reference_data(test_json["data_location"])
 
         # Combine parameters from test definition with locally-defined parameters
         if test_instance_json["parameters"]:
-            response = requests.get(test_instance_json["parameters"])
+            response = self.session.get(test_instance_json["parameters"])
             if response.status_code == 200:
-                all_parameters = response.json()
+                all_parameters = self._decode(response)
             else:
                 raise Exception(f"Unable to retrieve parameter file at {test_instance_json['parameters']}")
         else:
@@ -654,7 +1629,7 @@ class TestLibrary(BaseClient):
         test_instance.uuid = test_instance_json["id"]
         return test_instance
 
-    def list_tests(self, size=1000000, from_index=0, **filters):
+    def list_tests(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
         """Retrieve a list of test definitions satisfying specified filters.
 
         The filters may specify one or more attributes that belong
@@ -678,8 +1653,24 @@ class TestLibrary(BaseClient):
             Max number of tests to be returned; default is set to 1000000.
         from_index : positive integer
             Index of first test to be returned; default is set to 0.
+        parallel : positive integer, optional
+            If given, tests are retrieved in pages of `page_size` tests, with up to `parallel` pages
+            retrieved at the same time. This is faster for long listings, especially over
+            high-latency connections. `parallel` should not exceed the `pool_maxsize` of the client.
+        page_size : positive integer
+            Number of tests retrieved with each request, if `parallel` is given; default is set to 1000.
+        stream : boolean
+            If True, a generator is returned instead of a list, which parses the tests one by one
+            as the response is received, so that the whole listing is never held in memory.
+            The request is sent when iteration starts. Cannot be combined with `parallel`.
         **filters : variable length keyword arguments
-            To be used to filter test definitions from the test library.
+            To be used to filter test definitions from the test library. The values of attributes with a controlled
+            vocabulary (see :meth:`get_attribute_options`) are checked before any request is sent:
+            invalid values raise a ValueError suggesting the closest valid values, and values differing
+            from a valid value only in case or spacing are replaced by it.
+
+        If the client has a mirror synchronised with :meth:`sync_mirror`, the tests are taken from it,
+        without contacting the server; `parallel` and `page_size` are then ignored.
 
         Returns
         -------
@@ -691,38 +1682,97 @@ class TestLibrary(BaseClient):
         >>> tests = test_library.list_tests()
         >>> tests = test_library.list_tests(test_type="single cell activity")
         >>> tests = test_library.list_tests(test_type="single cell activity", cell_type="Pyramidal Cell")
+        >>> tests = test_library.list_tests(parallel=8)
+        >>> for test in test_library.list_tests(stream=True):
+        ...     print(test["alias"])
         """
 
-        valid_filters = [
-            "alias",
-            "name",
-            "implementation_status",
-            "brain_region",
-            "species",
-            "cell_type",
-            "data_type",
-            "recording_modality",
-            "test_type",
-            "score_type",
-            "author",
-        ]
-        params = locals()["filters"]
-        for filter in params:
-            if filter not in valid_filters:
-                raise ValueError(
-                    "The specified filter '{}' is an invalid filter!\nValid filters are: {}".format(
-                        filter, valid_filters
-                    )
-                )
-
-        url = self.url + "/tests/"
-        url += "?" + urlencode(params, doseq=True) + "&size=" + str(size) + "&from_index=" + str(from_index)
-        response = requests.get(url, auth=self.auth, verify=self.verify)
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        tests = self._list_mirror("test", filters, size, from_index)
+        if tests is not None:
+            return iter(tests) if stream else tests
+        if parallel:
+            return self._list_parallel(
+                "/tests/", filters, size, from_index, parallel, page_size, "Error listing tests", rename=False
+            )
+        url = self._list_url("/tests/", filters, size, from_index)
+        if stream:
+            return self._stream_records(url, "Error listing tests", rename=False)
+        response = self._request("GET", url)
         if response.status_code != 200:
             handle_response_error("Error listing tests", response)
-        tests = response.json()
+        tests = self._decode(response)
         return tests
 
+    def iter_tests(self, page_size=1000, prefetch=True, **filters):
+        """Iterate over test definitions satisfying specified filters.
+
+        Unlike :meth:`list_tests`, test definitions are retrieved from the server
+        a page at a time, and are generated as each page arrives, so the memory used
+        does not depend on the number of tests.
+
+        Parameters
+        ----------
+        page_size : positive integer
+            Number of tests retrieved with each request; default is set to 1000.
+        prefetch : boolean
+            If True (default), the next page is retrieved while the current page is being processed.
+        **filters : variable length keyword arguments
+            To be used to filter test definitions from the test library; see :meth:`list_tests`.
+
+        Returns
+        -------
+        generator
+            Test descriptions satisfying specified filters.
+
+        Examples
+        --------
+        >>> for test in test_library.iter_tests(species="Rattus norvegicus"):
+        ...     print(test["alias"])
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        tests = self._list_mirror("test", filters)
+        if tests is not None:
+            return iter(tests)
+        return self._iter_pages("/tests/", filters, page_size, prefetch, "Error listing tests", rename=False)
+
+    def search_tests(self, text, size=10, **filters):
+        """Search the test definitions for words in their names, aliases, descriptions or other metadata.
+
+        The search uses the full-text index of the local mirror (see :meth:`sync_mirror`), so it
+        does not contact the server, and reflects the test library at the time of the last synchronisation.
+
+        Parameters
+        ----------
+        text : string
+            Words which must all be found in each test; a word ending with "*" matches any word
+            starting with it. Words are compared ignoring case and accents.
+        size : positive integer
+            Max number of tests to be returned; default is set to 10.
+        **filters : variable length keyword arguments
+            To be used to filter test definitions from the test library; see :meth:`list_tests`.
+
+        Returns
+        -------
+        list
+            Test descriptions, most relevant first: matches in the name or alias count for more than
+            matches in the description.
+
+        Examples
+        --------
+        >>> test_library = TestLibrary(username="alice", mirror=True)
+        >>> test_library.sync_mirror(results=False)
+        >>> tests = test_library.search_tests("input resistance", species="Rattus norvegicus")
+        >>> tests = test_library.search_tests("somat*")
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        return self._search_mirror("test", text, size, filters)
+
     def add_test(
         self,
         collab_id=None,
@@ -802,69 +1852,12 @@ class TestLibrary(BaseClient):
                 path="morphounit.tests.CellDensityTest")
         """
 
-        test_data = {}
-        args = locals()
-        # handle naming difference with API: collab_id <-> project_id
-        args["project_id"] = args.pop("collab_id")
-
-        for field in [
-            "project_id",
-            "name",
-            "alias",
-            "author",
-            "species",
-            "age",
-            "brain_region",
-            "cell_type",
-            "publication",
-            "description",
-            "recording_modality",
-            "test_type",
-            "score_type",
-            "data_location",
-            "data_type",
-            "implementation_status",
-            "instances",
-        ]:
-            if args[field]:
-                test_data[field] = args[field]
-
-        values = self.get_attribute_options()
-        for field in (
-            "species",
-            "brain_region",
-            "cell_type",
-            "recording_modality",
-            "test_type",
-            "score_type",
-            "implementation_status",
-        ):
-            if field in test_data and test_data[field] not in values[field] + [None]:
-                raise Exception(
-                    "{} = '{}' is invalid.\nValue has to be one of these: {}".format(
-                        field, test_data[field], values[field]
-                    )
-                )
-
-        # format names of authors as required by API
-        if "author" in test_data:
-            test_data["author"] = self._format_people_name(test_data["author"])
-
-        # 'data_location' is now a list of urls
-        if not isinstance(test_data["data_location"], list):
-            test_data["data_location"] = [test_data["data_location"]]
-
+        test_data = self._test_data(locals(), self.get_attribute_options())
         url = self.url + "/tests/"
         headers = {"Content-type": "application/json"}
-        response = requests.post(
-            url,
-            data=json.dumps(test_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("POST", url, data=self._encode(test_data), headers=headers)
         if response.status_code == 201:
-            return response.json()
+            return self._decode(response)
         else:
             handle_response_error("Error in adding test", response)
 
@@ -954,8 +1947,25 @@ class TestLibrary(BaseClient):
         if not test_id:
             raise Exception("Test ID needs to be provided for editing a test.")
 
+        test_data = self._test_data(locals(), self.get_attribute_options())
+        url = self.url + "/tests/" + test_id
+        headers = {"Content-type": "application/json"}
+        response = self._request("PUT", url, data=self._encode(test_data), headers=headers)
+        if response.status_code == 200:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in editing test", response)
+
+    def _test_url(self, test_id="", alias=""):
+        if test_id:
+            return self.url + "/tests/" + test_id
+        else:
+            return self.url + "/tests/" + quote(str(alias))
+
+    def _test_data(self, args, values):
+        # assemble the data for add_test() and edit_test() from their arguments,
+        # checking attribute values against `values`, as returned by get_attribute_options()
         test_data = {}
-        args = locals()
         # handle naming difference with API: collab_id <-> project_id
         args["project_id"] = args.pop("collab_id")
 
@@ -976,26 +1986,12 @@ class TestLibrary(BaseClient):
             "data_location",
             "data_type",
             "implementation_status",
+            "instances",
         ]:
-            if args[field]:
+            if args.get(field):
                 test_data[field] = args[field]
 
-        values = self.get_attribute_options()
-        for field in (
-            "species",
-            "brain_region",
-            "cell_type",
-            "recording_modality",
-            "test_type",
-            "score_type",
-            "implementation_status",
-        ):
-            if field in test_data and test_data[field] not in values[field] + [None]:
-                raise Exception(
-                    "{} = '{}' is invalid.\nValue has to be one of these: {}".format(
-                        field, test_data[field], values[field]
-                    )
-                )
+        self._check_attribute_values(test_data, self.attribute_fields, values)
 
         # format names of authors as required by API
         if "author" in test_data:
@@ -1004,20 +2000,7 @@ class TestLibrary(BaseClient):
         # 'data_location' is now a list of urls
         if "data_location" in test_data and not isinstance(test_data["data_location"], list):
             test_data["data_location"] = [test_data["data_location"]]
-
-        url = self.url + "/tests/" + test_id
-        headers = {"Content-type": "application/json"}
-        response = requests.put(
-            url,
-            data=json.dumps(test_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            handle_response_error("Error in editing test", response)
+        return test_data
 
     def delete_test(self, test_id="", alias=""):
         """ONLY FOR SUPERUSERS: Delete a specific test definition by its test_id or alias.
@@ -1047,12 +2030,7 @@ class TestLibrary(BaseClient):
 
         if test_id == "" and alias == "":
             raise Exception("test ID or alias needs to be provided for deleting a test.")
-        elif test_id != "":
-            url = self.url + "/tests/" + test_id
-        else:
-            url = self.url + "/tests/" + quote(str(alias))
-
-        test_json = requests.delete(url, auth=self.auth, verify=self.verify)
+        test_json = self._request("DELETE", self._test_url(test_id, alias))
         if test_json.status_code == 403:
             handle_response_error("Only SuperUser accounts can delete data", test_json)
         elif test_json.status_code != 200:
@@ -1104,25 +2082,68 @@ class TestLibrary(BaseClient):
             if os.path.isfile(instance_path):
                 # instance_path is a local path
                 with open(instance_path) as fp:
-                    test_instance_json = json.load(fp)
+                    return json.load(fp)
             else:
                 raise Exception("Error in local file path specified by instance_path.")
+        test_instance_json = self._get_entity(
+            "test_instance",
+            self._test_instance_url(instance_id, test_id, alias, version),
+            "Error in retrieving test instance",
+            (instance_id, test_id, alias),
+        )
+        return self._select_test_instance(test_instance_json)
+
+    def get_test_instances(self, instance_ids, parallel=10):
+        """Retrieve several test instances.
+
+        Each test instance is retrieved only once, even if its ID appears several times, and
+        test instances found in the local caches are not requested from the server. The others
+        are retrieved concurrently. Test instances which cannot be found are reported, without
+        interrupting the retrieval of the others.
+
+        Parameters
+        ----------
+        instance_ids : list of UUID
+            System generated unique identifiers associated with test instances.
+        parallel : positive integer
+            Maximum number of test instances retrieved at the same time; default is set to 10.
+
+        Returns
+        -------
+        list
+            Information about the test instances, in the order of `instance_ids`,
+            with None for test instances which were not found.
+
+        Examples
+        --------
+        >>> test_instances = test_library.get_test_instances([result["test_instance_id"] for result in results])
+        """
+
+        def get(instance_id):
+            return self._get_entity(
+                "test_instance",
+                self._test_instance_url(instance_id),
+                "Error in retrieving test instance",
+                (instance_id,),
+                missing_ok=True,
+            )
+
+        return self._get_many(instance_ids, get, parallel)
+
+    def _test_instance_url(self, instance_id="", test_id="", alias="", version=""):
+        if instance_id:
+            return self.url + "/tests/query/instances/" + instance_id
+        elif test_id and version:
+            return self.url + "/tests/" + test_id + "/instances/?version=" + version
+        elif alias and version:
+            return self.url + "/tests/" + quote(str(alias)) + "/instances/?version=" + version
+        elif test_id and not version:
+            return self.url + "/tests/" + test_id + "/instances/latest"
         else:
-            if instance_id:
-                url = self.url + "/tests/query/instances/" + instance_id
-            elif test_id and version:
-                url = self.url + "/tests/" + test_id + "/instances/?version=" + version
-            elif alias and version:
-                url = self.url + "/tests/" + quote(str(alias)) + "/instances/?version=" + version
-            elif test_id and not version:
-                url = self.url + "/tests/" + test_id + "/instances/latest"
-            else:
-                url = self.url + "/tests/" + quote(str(alias)) + "/instances/latest"
-            response = requests.get(url, auth=self.auth, verify=self.verify)
+            return self.url + "/tests/" + quote(str(alias)) + "/instances/latest"
 
-        if response.status_code != 200:
-            handle_response_error("Error in retrieving test instance", response)
-        test_instance_json = response.json()
+    @staticmethod
+    def _select_test_instance(test_instance_json):
         if isinstance(
             test_instance_json, list
         ):  # can have multiple instances with the same version but different parameters
@@ -1167,15 +2188,11 @@ class TestLibrary(BaseClient):
             with open(instance_path) as fp:
                 test_instances_json = json.load(fp)
         else:
-            if test_id:
-                url = self.url + "/tests/" + test_id + "/instances/?size=100000"
-            else:
-                url = self.url + "/tests/" + quote(str(alias)) + "/instances/?size=100000"
-            response = requests.get(url, auth=self.auth, verify=self.verify)
+            response = self._request("GET", self._test_url(test_id, alias) + "/instances/?size=100000")
 
         if response.status_code != 200:
             handle_response_error("Error in retrieving test instances", response)
-        test_instances_json = response.json()
+        test_instances_json = self._decode(response)
         return test_instances_json
 
     def add_test_instance(
@@ -1237,15 +2254,9 @@ class TestLibrary(BaseClient):
             url = self.url + "/tests/" + quote(str(test_id)) + "/instances/"
 
         headers = {"Content-type": "application/json"}
-        response = requests.post(
-            url,
-            data=json.dumps(instance_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("POST", url, data=self._encode(instance_data), headers=headers)
         if response.status_code == 201:
-            return response.json()
+            return self._decode(response)
         else:
             handle_response_error("Error in adding test instance", response)
 
@@ -1324,23 +2335,17 @@ class TestLibrary(BaseClient):
             url = self.url + "/tests/query/instances/" + instance_id
         else:
             url = self.url + "/tests/" + test_identifier + "/instances/?version=" + version
-            response0 = requests.get(url, auth=self.auth, verify=self.verify)
+            response0 = self._request("GET", url)
             if response0.status_code != 200:
                 raise Exception("Invalid test identifier and/or version")
             url = (
-                self.url + "/tests/query/instances/" + response0.json()[0]["id"]
+                self.url + "/tests/query/instances/" + self._decode(response0)[0]["id"]
             )  # todo: handle more than 1 instance in response
 
         headers = {"Content-type": "application/json"}
-        response = requests.put(
-            url,
-            data=json.dumps(instance_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("PUT", url, data=self._encode(instance_data), headers=headers)
         if response.status_code == 200:
-            return response.json()
+            return self._decode(response)
         else:
             handle_response_error("Error in editing test instance", response)
 
@@ -1386,11 +2391,11 @@ class TestLibrary(BaseClient):
             url = self.url + "/tests/query/instances/" + instance_id
         else:
             url = self.url + "/tests/" + test_identifier + "/instances/" + version
-            response0 = requests.get(url, auth=self.auth, verify=self.verify)
+            response0 = self._request("GET", url)
             if response0.status_code != 200:
                 raise Exception("Invalid test identifier and/or version")
-            url = self.url + "/tests/query/instances/" + response0.json()[0]["id"]
-        response = requests.delete(url, auth=self.auth, verify=self.verify)
+            url = self.url + "/tests/query/instances/" + self._decode(response0)[0]["id"]
+        response = self._request("DELETE", url)
         if response.status_code == 403:
             handle_response_error("Only SuperUser accounts can delete data", response)
         elif response.status_code != 200:
@@ -1398,6 +2403,8 @@ class TestLibrary(BaseClient):
 
     def _load_reference_data(self, uri_list):
         # Load the reference data ("observations").
+        from .datastores import URI_SCHEME_MAP
+
         observation_data = []
         return_single = False
         if not isinstance(uri_list, list):
@@ -1407,7 +2414,7 @@ class TestLibrary(BaseClient):
             return_single = True
         for uri in uri_list:
             parse_result = urlparse(uri)
-            datastore = URI_SCHEME_MAP[parse_result.scheme](auth=self.auth)
+            datastore = URI_SCHEME_MAP[parse_result.scheme](auth=self.auth, session=self.session)
             observation_data.append(datastore.load_data(uri))
         if return_single:
             return observation_data[0]
@@ -1428,7 +2435,9 @@ class TestLibrary(BaseClient):
         * species
 
         If an attribute is specified, then only values that correspond to it will be returned,
-        else values for all attributes are returned.
+        else values for all attributes are returned. The values of all attributes are retrieved with
+        a single request and cached, in memory and on disk, for a day (see the `vocabulary` argument
+        of the client).
 
         Parameters
         ----------
@@ -1445,16 +2454,7 @@ class TestLibrary(BaseClient):
         >>> data = test_library.get_attribute_options()
         >>> data = test_library.get_attribute_options("cell types")
         """
-        valid_params = [
-            "species",
-            "brain_region",
-            "cell_type",
-            "test_type",
-            "score_type",
-            "recording_modality",
-            "implementation_status",
-        ]
-        return self._get_attribute_options(param, valid_params)
+        return self._get_attribute_options(param, self.attribute_fields)
 
     def get_result(self, result_id=""):
         """Retrieve a test result.
@@ -1481,13 +2481,77 @@ class TestLibrary(BaseClient):
             raise Exception("result_id needs to be provided for finding a specific result.")
         else:
             url = self.url + "/results/" + result_id
-        response = requests.get(url, auth=self.auth, verify=self.verify)
-        if response.status_code != 200:
-            handle_response_error("Error in retrieving result", response)
-        result_json = renameNestedJSONKey(response.json(), "project_id", "collab_id")
-        return result_json
+        result_json = self._get_entity("result", url, "Error in retrieving result", (result_id,))
+        return renameNestedJSONKey(result_json, "project_id", "collab_id")
+
+    def get_results(self, result_ids, parallel=10):
+        """Retrieve several test results.
+
+        Each result is retrieved only once, even if its ID appears several times, and results
+        found in the local caches are not requested from the server. The others are retrieved
+        with the `id` filter of :meth:`list_results`, up to 100 in each request, with up to
+        `parallel` requests at the same time. Results which cannot be found are reported,
+        without interrupting the retrieval of the others.
 
-    def list_results(self, size=1000000, from_index=0, **filters):
+        Parameters
+        ----------
+        result_ids : list of UUID
+            System generated unique identifiers associated with results.
+        parallel : positive integer
+            Maximum number of requests sent at the same time; default is set to 10.
+
+        Returns
+        -------
+        list
+            Information about the results, in the order of `result_ids`, with None for results which were not found.
+
+        Examples
+        --------
+        >>> result_ids = ["901ac0f3-2557-4ae3-bb2b-37617312da09", "f32776c7-658f-462f-a944-1daf8765ec97"]
+        >>> results = test_library.get_results(result_ids)
+        """
+        found, batches = self._cached_results(result_ids)
+
+        def get_batch(batch):
+            response = self._request("GET", self._list_url("/results/", {"id": batch}, len(batch), 0))
+            if response.status_code != 200:
+                handle_response_error("Error in retrieving results", response)
+            return self._decode(response)
+
+        self._add_listed_results(found, batches, self._map_concurrently(get_batch, batches, parallel))
+
+        # results not returned by the listing are requested individually, in case the `id` filter is not supported
+        def get(result_id):
+            if result_id in found:
+                return found[result_id]
+            url = self.url + "/results/" + result_id
+            return self._get_entity("result", url, "Error in retrieving result", (result_id,), missing_ok=True)
+
+        return renameNestedJSONKey(self._get_many(result_ids, get, parallel), "project_id", "collab_id")
+
+    def _cached_results(self, result_ids):
+        # results found in the local caches, by ID, and batches of the IDs of the other results
+        found = {}
+        for result_id in dict.fromkeys(result_ids):
+            result_json = self._cached_entity("result", self.url + "/results/" + result_id)
+            if result_json is not None:
+                found[result_id] = result_json
+        remaining = [result_id for result_id in dict.fromkeys(result_ids) if result_id not in found]
+        return found, [remaining[i : i + MAX_IDS_PER_REQUEST] for i in range(0, len(remaining), MAX_IDS_PER_REQUEST)]
+
+    def _add_listed_results(self, found, batches, listings):
+        # add the results listed for batches of IDs to `found`, and to the metadata store
+        requested = set(result_id for batch in batches for result_id in batch)
+        for listing in listings:
+            for result_json in listing:
+                result_id = result_json.get("id")
+                if result_id in requested and result_id not in found:
+                    found[result_id] = result_json
+                    if self.metadata_store is not None:
+                        url = self.url + "/results/" + result_id
+                        self.metadata_store.put("result", url, self._encode(result_json), entity_tags(result_json))
+
+    def list_results(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
         """Retrieve test results satisfying specified filters.
 
         This allows to retrieve a list of test results with their scores
@@ -1499,29 +2563,85 @@ class TestLibrary(BaseClient):
             Max number of results to be returned; default is set to 1000000.
         from_index : positive integer
             Index of first result to be returned; default is set to 0.
+        parallel : positive integer, optional
+            If given, results are retrieved in pages of `page_size` results, with up to `parallel` pages
+            retrieved at the same time. This is faster for long listings, especially over
+            high-latency connections. `parallel` should not exceed the `pool_maxsize` of the client.
+        page_size : positive integer
+            Number of results retrieved with each request, if `parallel` is given; default is set to 1000.
+        stream : boolean
+            If True, a generator is returned instead of a list, which parses the results one by one
+            as the response is received, so that the whole listing is never held in memory.
+            The request is sent when iteration starts. Cannot be combined with `parallel`.
         **filters : variable length keyword arguments
             To be used to filter the results metadata.
 
+        If the client has a mirror synchronised with :meth:`sync_mirror`, and the results are only filtered
+        by "id", "model_instance_id" or "test_instance_id", they are taken from it, without contacting
+        the server; `parallel` and `page_size` are then ignored.
+
+        Returns
+        -------
+        dict
+            Information about the results retrieved.
+
+        Examples
+        --------
+        >>> results = test_library.list_results()
+        >>> results = test_library.list_results(test_id="7b63f87b-d709-4194-bae1-15329daf3dec")
+        >>> results = test_library.list_results(id="901ac0f3-2557-4ae3-bb2b-37617312da09")
+        >>> results = test_library.list_results(model_instance_id="f32776c7-658f-462f-a944-1daf8765ec97")
+        >>> results = test_library.list_results(test_id="7b63f87b-d709-4194-bae1-15329daf3dec", parallel=8)
+        >>> n_passed = sum(1 for result in test_library.list_results(stream=True) if result["passed"])
+        """
+
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        results = self._list_mirror("result", filters, size, from_index)
+        if results is not None:
+            return iter(results) if stream else results
+        if parallel:
+            return self._list_parallel(
+                "/results/", filters, size, from_index, parallel, page_size, "Error in retrieving results"
+            )
+        url = self._list_url("/results/", filters, size, from_index)
+        if stream:
+            return self._stream_records(url, "Error in retrieving results")
+        response = self._request("GET", url)
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving results", response)
+        result_json = self._decode(response)
+        return renameNestedJSONKey(result_json, "project_id", "collab_id")
+
+    def iter_results(self, page_size=1000, prefetch=True, **filters):
+        """Iterate over test results satisfying specified filters.
+
+        Unlike :meth:`list_results`, results are retrieved from the server a page at a time,
+        and are generated as each page arrives, so the memory used does not depend on
+        the number of results.
+
+        Parameters
+        ----------
+        page_size : positive integer
+            Number of results retrieved with each request; default is set to 1000.
+        prefetch : boolean
+            If True (default), the next page is retrieved while the current page is being processed.
+        **filters : variable length keyword arguments
+            To be used to filter the results metadata; see :meth:`list_results`.
+
         Returns
         -------
-        dict
-            Information about the results retrieved.
+        generator
+            Information about each result.
 
         Examples
         --------
-        >>> results = test_library.list_results()
-        >>> results = test_library.list_results(test_id="7b63f87b-d709-4194-bae1-15329daf3dec")
-        >>> results = test_library.list_results(id="901ac0f3-2557-4ae3-bb2b-37617312da09")
-        >>> results = test_library.list_results(model_instance_id="f32776c7-658f-462f-a944-1daf8765ec97")
+        >>> scores = [result["score"] for result in test_library.iter_results(test_id=test_id)]
         """
-
-        url = self.url + "/results/"
-        url += "?" + urlencode(filters, doseq=True) + "&size=" + str(size) + "&from_index=" + str(from_index)
-        response = requests.get(url, auth=self.auth, verify=self.verify)
-        if response.status_code != 200:
-            handle_response_error("Error in retrieving results", response)
-        result_json = response.json()
-        return renameNestedJSONKey(result_json, "project_id", "collab_id")
+        results = self._list_mirror("result", filters)
+        if results is not None:
+            return iter(results)
+        return self._iter_pages("/results/", filters, page_size, prefetch, "Error in retrieving results")
 
     def register_result(self, test_result, data_store=None, collab_id=None):
         """Register test result with EBRAINS Validation Results Service.
@@ -1556,23 +2676,43 @@ class TestLibrary(BaseClient):
         >>> response = test_library.register_result(test_result=score)
         """
 
-        if hasattr(test_result, "exec_timestamp"):
-            timestamp = test_result.exec_timestamp
-        elif "timestamp" in test_result.related_data:
-            timestamp = test_result.related_data["timestamp"]
+        collab_id = self._result_collab_id(test_result, data_store, collab_id)
+
+        model_catalog = ModelCatalog.from_existing(self)
+        with tracing.span("resolve_model"):
+            model_instance_uuid = model_catalog.find_model_instance_else_add(test_result.model)["id"]
+
+        with tracing.span("upload_artifacts"):
+            results_storage = self._upload_result_files(test_result, data_store, collab_id)
+
+        url = self.url + "/results/"
+        result_json = self._result_data(test_result, model_instance_uuid, results_storage, collab_id)
+
+        headers = {"Content-type": "application/json"}
+        with tracing.span("register"):
+            response = self._request("POST", url, data=self._encode(result_json), headers=headers)
+        if response.status_code == 201:
+            result = self._decode(response)
+            print(
+                "Result registered successfully! "
+                f"- see https://model-catalog.apps.ebrains.eu/#result_id.{result['id']}"
+            )
+            return renameNestedJSONKey(result, "project_id", "collab_id")
         else:
-            timestamp = datetime.now()
+            handle_response_error("Error registering result", response)
 
+    @staticmethod
+    def _result_collab_id(test_result, data_store, collab_id):
         if collab_id is None:
             collab_id = test_result.related_data.get("collab_id", None)
             if collab_id is None and data_store:
                 collab_id = data_store.collab_id
         if collab_id is None:
             raise Exception("Don't know where to register this result. Please specify `collab_id`!")
+        return collab_id
 
-        model_catalog = ModelCatalog.from_existing(self)
-        model_instance_uuid = model_catalog.find_model_instance_else_add(test_result.model)["id"]
-
+    def _upload_result_files(self, test_result, data_store, collab_id):
+        # upload any files produced by the test run (e.g. figures) to the data store
         results_storage = []
         if data_store:
             if not data_store.authorized:
@@ -1595,37 +2735,27 @@ class TestLibrary(BaseClient):
                     for ftu in data_store.upload_data(files_to_upload)
                 ]
                 results_storage.extend(list_dict_files_uploaded)
+        return results_storage
 
-        url = self.url + "/results/"
-        result_json = {
+    @staticmethod
+    def _result_data(test_result, model_instance_uuid, results_storage, collab_id):
+        if hasattr(test_result, "exec_timestamp"):
+            timestamp = test_result.exec_timestamp
+        elif "timestamp" in test_result.related_data:
+            timestamp = test_result.related_data["timestamp"]
+        else:
+            timestamp = datetime.now()
+        return {
             "model_instance_id": model_instance_uuid,
             "test_instance_id": test_result.test.uuid,
             "results_storage": results_storage,
             "score": (int(test_result.score) if isinstance(test_result.score, bool) else test_result.score),
             "passed": (None if "passed" not in test_result.related_data else test_result.related_data["passed"]),
-            "timestamp": timestamp.isoformat(),
+            "timestamp": timestamp,
             "project_id": collab_id,
             "normalized_score": (int(test_result.score) if isinstance(test_result.score, bool) else test_result.score),
         }
 
-        headers = {"Content-type": "application/json"}
-        response = requests.post(
-            url,
-            data=json.dumps(result_json),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
-        if response.status_code == 201:
-            result = response.json()
-            print(
-                "Result registered successfully! "
-                f"- see https://model-catalog.apps.ebrains.eu/#result_id.{result['id']}"
-            )
-            return renameNestedJSONKey(result, "project_id", "collab_id")
-        else:
-            handle_response_error("Error registering result", response)
-
     def delete_result(self, result_id=""):
         """ONLY FOR SUPERUSERS: Delete a result on the validation framework.
 
@@ -1650,7 +2780,7 @@ class TestLibrary(BaseClient):
             raise Exception("result_id needs to be provided for finding a specific result.")
         else:
             url = self.url + "/results/" + result_id
-        model_image_json = requests.delete(url, auth=self.auth, verify=self.verify)
+        model_image_json = self._request("DELETE", url)
         if model_image_json.status_code == 403:
             handle_response_error("Only SuperUser accounts can delete data", model_image_json)
         elif model_image_json.status_code != 200:
@@ -1659,22 +2789,12 @@ class TestLibrary(BaseClient):
     def _get_platform(self):
         """
         Return a dict containing information about the platform the test was run on.
+
+        The information is collected once per process; see :func:`get_platform_info`.
         """
         # This needs to be extended to support remote execution, e.g. job queues on clusters.
         # Use Sumatra?
-        network_name = platform.node()
-        bits, linkage = platform.architecture()
-        return dict(
-            architecture_bits=bits,
-            architecture_linkage=linkage,
-            machine=platform.machine(),
-            network_name=network_name,
-            ip_addr=_get_ip_address(),
-            processor=platform.processor(),
-            release=platform.release(),
-            system_name=platform.system(),
-            version=platform.version(),
-        )
+        return get_platform_info()._asdict()
 
 
 class ModelCatalog(BaseClient):
@@ -1729,6 +2849,11 @@ class ModelCatalog(BaseClient):
     token : string, optional
         You may directly input a valid authenticated token from Collaboratory v1 or v2.
         Note: you should use the `access_token` and NOT `refresh_token`.
+    **kwargs :
+        Other options of :class:`BaseClient`: connection pool settings (`session`, `pool_connections`,
+        `pool_maxsize`, `pool_block`, `keep_alive`), `json_codec`, the HTTP cache (`http_cache`, `cache_ttl`,
+        `cache_maxsize`), `metadata_store`, `mirror`, `vocabulary`, `coalesce`, rate limiting (`rate_limiter`,
+        `requests_per_second`), `request_hooks` and `cassette`.
 
     Examples
     --------
@@ -1740,8 +2865,33 @@ class ModelCatalog(BaseClient):
 
     __test__ = False
 
-    def __init__(self, username=None, password=None, environment="production", token=None, interactive=True):
-        super(ModelCatalog, self).__init__(username, password, environment, token, interactive)
+    valid_filters = [
+        "name",
+        "alias",
+        "brain_region",
+        "species",
+        "cell_type",
+        "model_scope",
+        "abstraction_level",
+        "author",
+        "owner",
+        "organization",
+        "collab_id",
+        "format",
+        "private",
+    ]
+    attribute_fields = [
+        "species",
+        "brain_region",
+        "cell_type",
+        "model_scope",
+        "abstraction_level",
+    ]
+
+    def __init__(
+        self, username=None, password=None, environment="production", token=None, interactive=True, **kwargs
+    ):
+        super(ModelCatalog, self).__init__(username, password, environment, token, interactive, **kwargs)
         self._set_app_info()
 
     def _set_app_info(self):
@@ -1839,21 +2989,59 @@ class ModelCatalog(BaseClient):
 
         if model_id == "" and alias == "":
             raise Exception("Model ID or alias needs to be provided for finding a model.")
-        elif model_id != "":
-            url = self.url + "/models/" + model_id
-        else:
-            url = self.url + "/models/" + quote(str(alias))
 
-        model_json = requests.get(url, auth=self.auth, verify=self.verify)
-        if model_json.status_code != 200:
-            handle_response_error("Error in retrieving model", model_json)
-        model_json = model_json.json()
+        model_json = self._get_entity(
+            "model", self._model_url(model_id, alias), "Error in retrieving model", (model_id, alias)
+        )
 
         if instances is False:
             model_json.pop("instances")
         return renameNestedJSONKey(model_json, "project_id", "collab_id")
 
-    def list_models(self, size=1000000, from_index=0, **filters):
+    def get_models(self, model_ids, instances=True, parallel=10):
+        """Retrieve several model descriptions.
+
+        Each model is retrieved only once, even if its ID appears several times, and models
+        found in the local caches are not requested from the server. The others are retrieved
+        concurrently. Models which cannot be found are reported, without interrupting the retrieval
+        of the others.
+
+        Parameters
+        ----------
+        model_ids : list of UUID
+            System generated unique identifiers associated with model descriptions.
+        instances : boolean, optional
+            Set to False if you wish to omit the details of the model instances; default True.
+        parallel : positive integer
+            Maximum number of models retrieved at the same time; default is set to 10.
+
+        Returns
+        -------
+        list
+            Model descriptions, in the order of `model_ids`, with None for models which were not found.
+
+        Examples
+        --------
+        >>> models = model_catalog.get_models([instance["model_id"] for instance in model_instances])
+        """
+
+        def get(model_id):
+            model_json = self._get_entity(
+                "model", self._model_url(model_id), "Error in retrieving model", (model_id,), missing_ok=True
+            )
+            if model_json is not None and instances is False:
+                model_json.pop("instances")
+            return model_json
+
+        return renameNestedJSONKey(self._get_many(model_ids, get, parallel), "project_id", "collab_id")
+
+    def _model_url(self, model_id="", alias=""):
+        if model_id:
+            return self.url + "/models/" + model_id
+        else:
+            return self.url + "/models/" + quote(str(alias))
+
+    def list_models(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
         """Retrieve list of model descriptions satisfying specified filters.
 
         The filters may specify one or more attributes that belong
@@ -1879,8 +3067,24 @@ class ModelCatalog(BaseClient):
             Max number of models to be returned; default is set to 1000000.
         from_index : positive integer
             Index of first model to be returned; default is set to 0.
+        parallel : positive integer, optional
+            If given, models are retrieved in pages of `page_size` models, with up to `parallel` pages
+            retrieved at the same time. This is faster for long listings, especially over
+            high-latency connections. `parallel` should not exceed the `pool_maxsize` of the client.
+        page_size : positive integer
+            Number of models retrieved with each request, if `parallel` is given; default is set to 1000.
+        stream : boolean
+            If True, a generator is returned instead of a list, which parses the models one by one
+            as the response is received, so that the whole listing is never held in memory.
+            The request is sent when iteration starts. Cannot be combined with `parallel`.
         **filters : variable length keyword arguments
-            To be used to filter model descriptions from the model catalog.
+            To be used to filter model descriptions from the model catalog. The values of attributes with a controlled
+            vocabulary (see :meth:`get_attribute_options`) are checked before any request is sent:
+            invalid values raise a ValueError suggesting the closest valid values, and values differing
+            from a valid value only in case or spacing are replaced by it.
+
+        If the client has a mirror synchronised with :meth:`sync_mirror`, the models are taken from it,
+        without contacting the server; `parallel` and `page_size` are then ignored.
 
         Returns
         -------
@@ -1892,51 +3096,120 @@ class ModelCatalog(BaseClient):
         >>> models = model_catalog.list_models()
         >>> models = model_catalog.list_models(collab_id="model-validation")
         >>> models = model_catalog.list_models(cell_type="Pyramidal Cell", brain_region="Hippocampus")
+        >>> models = model_catalog.list_models(parallel=8)
+        >>> for model in model_catalog.list_models(stream=True):
+        ...     print(model["name"])
         """
 
-        valid_filters = [
-            "name",
-            "alias",
-            "brain_region",
-            "species",
-            "cell_type",
-            "model_scope",
-            "abstraction_level",
-            "author",
-            "owner",
-            "organization",
-            "collab_id",
-            "format",
-            "private",
-        ]
-        params = locals()["filters"]
-        for filter in params:
-            if filter not in valid_filters:
-                raise ValueError(
-                    "The specified filter '{}' is an invalid filter!\nValid filters are: {}".format(
-                        filter, valid_filters
-                    )
-                )
-
-        # handle naming difference with API: collab_id <-> project_id
-        if "collab_id" in params:
-            params["project_id"] = params.pop("collab_id")
-
-        url = self.url + "/models/"
-        url += "?" + urlencode(params, doseq=True) + "&size=" + str(size) + "&from_index=" + str(from_index)
-        response = requests.get(url, auth=self.auth, verify=self.verify)
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        models = self._list_mirror("model", filters, size, from_index)
+        if models is not None:
+            return iter(models) if stream else models
+        if parallel:
+            return self._list_parallel(
+                "/models/",
+                self._model_filters(filters),
+                size,
+                from_index,
+                parallel,
+                page_size,
+                "Error in retrieving models",
+            )
+        url = self._list_url("/models/", self._model_filters(filters), size, from_index)
+        if stream:
+            return self._stream_records(url, "Error in retrieving models")
+        response = self._request("GET", url)
         if response.status_code == 200:
             try:
-                models = response.json()
-            except json.JSONDecodeError:
+                models = self._decode(response)
+            except ValueError:  # invalid JSON
                 handle_response_error("Error in list_models()", response)
             if isinstance(models, dict):
                 models = [models]
             return renameNestedJSONKey(models, "project_id", "collab_id")
         else:
-            error = response.json()
+            error = self._decode(response)
             raise Exception(f"{error['detail']} (status code {response.status_code})")
 
+    def iter_models(self, page_size=1000, prefetch=True, **filters):
+        """Iterate over model descriptions satisfying specified filters.
+
+        Unlike :meth:`list_models`, model descriptions are retrieved from the server
+        a page at a time, and are generated as each page arrives, so the memory used
+        does not depend on the number of models.
+
+        Parameters
+        ----------
+        page_size : positive integer
+            Number of models retrieved with each request; default is set to 1000.
+        prefetch : boolean
+            If True (default), the next page is retrieved while the current page is being processed.
+        **filters : variable length keyword arguments
+            To be used to filter model descriptions from the model catalog; see :meth:`list_models`.
+
+        Returns
+        -------
+        generator
+            Model descriptions satisfying specified filters.
+
+        Examples
+        --------
+        >>> for model in model_catalog.iter_models(brain_region="hippocampus"):
+        ...     print(model["name"])
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        models = self._list_mirror("model", filters)
+        if models is not None:
+            return iter(models)
+        return self._iter_pages(
+            "/models/", self._model_filters(filters), page_size, prefetch, "Error in retrieving models"
+        )
+
+    def search_models(self, text, size=10, **filters):
+        """Search the model descriptions for words in their names, aliases, descriptions or other metadata.
+
+        The search uses the full-text index of the local mirror (see :meth:`sync_mirror`), so it
+        does not contact the server, and reflects the model catalog at the time of the last synchronisation.
+
+        Parameters
+        ----------
+        text : string
+            Words which must all be found in each model; a word ending with "*" matches any word
+            starting with it. Words are compared ignoring case and accents.
+        size : positive integer
+            Max number of models to be returned; default is set to 10.
+        **filters : variable length keyword arguments
+            To be used to filter model descriptions from the model catalog; see :meth:`list_models`.
+
+        Returns
+        -------
+        list
+            Model descriptions, most relevant first: matches in the name or alias count for more than
+            matches in the description.
+
+        Examples
+        --------
+        >>> model_catalog = ModelCatalog(username="alice", mirror=True)
+        >>> model_catalog.sync_mirror(results=False)
+        >>> models = model_catalog.search_models("CA1 pyramidal", species="Rattus norvegicus")
+        >>> models = model_catalog.search_models("Purkinje", size=50)
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = self._normalize_filters(filters)
+        return self._search_mirror("model", text, size, filters)
+
+    @staticmethod
+    def _model_filters(filters):
+        params = dict(filters)
+        # handle naming difference with API: collab_id <-> project_id
+        if "collab_id" in params:
+            params["project_id"] = params.pop("collab_id")
+        return params
+
     def register_model(
         self,
         collab_id=None,
@@ -2022,66 +3295,14 @@ class ModelCatalog(BaseClient):
                                     "version":"2.0", "parameters":""}],
                         )
         """
-        model_data = {}
-        args = locals()
-
-        # handle naming difference with API: collab_id <-> project_id
-        args["project_id"] = args.pop("collab_id")
-
-        required_fields = ("project_id", "name", "author", "owner")
-
-        for field in [
-            "project_id",
-            "name",
-            "alias",
-            "author",
-            "organization",
-            "cell_type",
-            "model_scope",
-            "abstraction_level",
-            "brain_region",
-            "species",
-            "owner",
-            "description",
-            "instances",
-        ]:
-            if args[field]:
-                model_data[field] = args[field]
-            elif field in required_fields:
-                raise KeyError(f"'{field}' field required")
-
-        values = self.get_attribute_options()
-        for field in [
-            "species",
-            "brain_region",
-            "cell_type",
-            "abstraction_level",
-            "model_scope",
-        ]:
-            if field in model_data and model_data[field] not in values[field] + [None]:
-                raise Exception(
-                    "{} = '{}' is invalid.\nValue has to be one of these: {}".format(
-                        field, model_data[field], values[field]
-                    )
-                )
-
-        # format names of authors and owners as required by API
-        for field in ("author", "owner"):
-            if model_data[field]:
-                model_data[field] = self._format_people_name(model_data[field])
-
+        model_data = self._model_data(locals(), new=True)
+        model_data = self._format_model_data(model_data, self.get_attribute_options())
         url = self.url + "/models/"
         headers = {"Content-type": "application/json"}
 
-        response = requests.post(
-            url,
-            data=json.dumps(model_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("POST", url, data=self._encode(model_data), headers=headers)
         if response.status_code == 201:
-            return renameNestedJSONKey(response.json(), "project_id", "collab_id")
+            return renameNestedJSONKey(self._decode(response), "project_id", "collab_id")
         else:
             handle_response_error("Error in adding model", response)
 
@@ -2168,45 +3389,72 @@ class ModelCatalog(BaseClient):
         if not model_id:
             raise Exception("Model ID needs to be provided for editing a model.")
 
-        model_data = {}
-        args = locals()
+        model_data = self._model_data(locals(), new=False)
+        model_data = self._format_model_data(model_data, self.get_attribute_options())
+
+        headers = {"Content-type": "application/json"}
+        url = self.url + "/models/" + model_id
+        response = self._request("PUT", url, data=self._encode(model_data), headers=headers)
+        if response.status_code == 200:
+            return renameNestedJSONKey(self._decode(response), "project_id", "collab_id")
+        else:
+            handle_response_error("Error in updating model", response)
 
+    @staticmethod
+    def _model_data(args, new):
+        # assemble the data for register_model() (new=True) or edit_model() (new=False)
+        # from their arguments
+        model_data = {}
         # handle naming difference with API: collab_id <-> project_id
         args["project_id"] = args.pop("collab_id")
 
-        for field in [
-            "project_id",
-            "name",
-            "alias",
-            "author",
-            "organization",
-            "cell_type",
-            "model_scope",
-            "abstraction_level",
-            "brain_region",
-            "species",
-            "owner",
-            "project",
-            "license",
-            "description",
-        ]:
+        if new:
+            fields = [
+                "project_id",
+                "name",
+                "alias",
+                "author",
+                "organization",
+                "cell_type",
+                "model_scope",
+                "abstraction_level",
+                "brain_region",
+                "species",
+                "owner",
+                "description",
+                "instances",
+            ]
+            required_fields = ("project_id", "name", "author", "owner")
+        else:
+            fields = [
+                "project_id",
+                "name",
+                "alias",
+                "author",
+                "organization",
+                "cell_type",
+                "model_scope",
+                "abstraction_level",
+                "brain_region",
+                "species",
+                "owner",
+                "project",
+                "license",
+                "description",
+            ]
+            required_fields = ()
+
+        for field in fields:
             if args[field]:
                 model_data[field] = args[field]
+            elif field in required_fields:
+                raise KeyError(f"'{field}' field required")
+        return model_data
 
-        values = self.get_attribute_options()
-        for field in (
-            "species",
-            "brain_region",
-            "cell_type",
-            "abstraction_level",
-            "model_scope",
-        ):
-            if field in model_data and model_data[field] not in values[field] + [None]:
-                raise Exception(
-                    "{} = '{}' is invalid.\nValue has to be one of these: {}".format(
-                        field, model_data[field], values[field]
-                    )
-                )
+    def _format_model_data(self, model_data, values):
+        # check attribute values against `values`, as returned by get_attribute_options(),
+        # and convert names to the format required by the API
+        self._check_attribute_values(model_data, self.attribute_fields, values)
 
         # format names of authors and owners as required by API
         for field in ("author", "owner"):
@@ -2215,20 +3463,7 @@ class ModelCatalog(BaseClient):
 
         if "alias" in model_data and model_data["alias"] == "":
             model_data["alias"] = None
-
-        headers = {"Content-type": "application/json"}
-        url = self.url + "/models/" + model_id
-        response = requests.put(
-            url,
-            data=json.dumps(model_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
-        if response.status_code == 200:
-            return renameNestedJSONKey(response.json(), "project_id", "collab_id")
-        else:
-            handle_response_error("Error in updating model", response)
+        return model_data
 
     def delete_model(self, model_id="", alias=""):
         """ONLY FOR SUPERUSERS: Delete a specific model description by its model_id or alias.
@@ -2258,12 +3493,7 @@ class ModelCatalog(BaseClient):
 
         if model_id == "" and alias == "":
             raise Exception("Model ID or alias needs to be provided for deleting a model.")
-        elif model_id != "":
-            url = self.url + "/models/" + model_id
-        else:
-            url = self.url + "/models/" + quote(str(alias))
-
-        model_json = requests.delete(url, auth=self.auth, verify=self.verify)
+        model_json = self._request("DELETE", self._model_url(model_id, alias))
         if model_json.status_code == 403:
             handle_response_error("Only SuperUser accounts can delete data", model_json)
         elif model_json.status_code != 200:
@@ -2282,7 +3512,9 @@ class ModelCatalog(BaseClient):
         * species
 
         If an attribute is specified then, only values that correspond to it will be returned,
-        else values for all attributes are returned.
+        else values for all attributes are returned. The values of all attributes are retrieved with
+        a single request and cached, in memory and on disk, for a day (see the `vocabulary` argument
+        of the client).
 
         Parameters
         ----------
@@ -2299,14 +3531,7 @@ class ModelCatalog(BaseClient):
         >>> data = model_catalog.get_attribute_options()
         >>> data = model_catalog.get_attribute_options("cell types")
         """
-        valid_params = [
-            "species",
-            "brain_region",
-            "cell_type",
-            "model_scope",
-            "abstraction_level",
-        ]
-        return self._get_attribute_options(param, valid_params)
+        return self._get_attribute_options(param, self.attribute_fields)
 
     def get_model_instance(self, instance_path="", instance_id="", model_id="", alias="", version=""):
         """Retrieve an existing model instance.
@@ -2355,18 +3580,62 @@ class ModelCatalog(BaseClient):
         if instance_path and os.path.isfile(instance_path):
             # instance_path is a local path
             with open(instance_path) as fp:
-                model_instance_json = json.load(fp)
+                return json.load(fp)
+        model_instance_json = self._get_entity(
+            "model_instance",
+            self._model_instance_url(instance_id, model_id, alias, version),
+            "Error in retrieving model instance",
+            (instance_id, model_id, alias),
+        )
+        return self._select_model_instance(model_instance_json)
+
+    def get_model_instances(self, instance_ids, parallel=10):
+        """Retrieve several model instances.
+
+        Each model instance is retrieved only once, even if its ID appears several times, and
+        model instances found in the local caches are not requested from the server. The others
+        are retrieved concurrently. Model instances which cannot be found are reported, without
+        interrupting the retrieval of the others.
+
+        Parameters
+        ----------
+        instance_ids : list of UUID
+            System generated unique identifiers associated with model instances.
+        parallel : positive integer
+            Maximum number of model instances retrieved at the same time; default is set to 10.
+
+        Returns
+        -------
+        list
+            Information about the model instances, in the order of `instance_ids`,
+            with None for model instances which were not found.
+
+        Examples
+        --------
+        >>> model_instances = model_catalog.get_model_instances([result["model_instance_id"] for result in results])
+        """
+
+        def get(instance_id):
+            return self._get_entity(
+                "model_instance",
+                self._model_instance_url(instance_id),
+                "Error in retrieving model instance",
+                (instance_id,),
+                missing_ok=True,
+            )
+
+        return self._get_many(instance_ids, get, parallel)
+
+    def _model_instance_url(self, instance_id="", model_id="", alias="", version=""):
+        if instance_id:
+            return self.url + "/models/query/instances/" + instance_id
+        elif model_id and version:
+            return self.url + "/models/" + model_id + "/instances/?version=" + version
         else:
-            if instance_id:
-                url = self.url + "/models/query/instances/" + instance_id
-            elif model_id and version:
-                url = self.url + "/models/" + model_id + "/instances/?version=" + version
-            else:
-                url = self.url + "/models/" + quote(str(alias)) + "/instances/?version=" + version
-            model_instance_json = requests.get(url, auth=self.auth, verify=self.verify)
-        if model_instance_json.status_code != 200:
-            handle_response_error("Error in retrieving model instance", model_instance_json)
-        model_instance_json = model_instance_json.json()
+            return self.url + "/models/" + quote(str(alias)) + "/instances/?version=" + version
+
+    @staticmethod
+    def _select_model_instance(model_instance_json):
         # if specifying a version, this can return multiple instances, since instances
         # can have the same version but different parameters
         if len(model_instance_json) == 1:
@@ -2431,6 +3700,8 @@ class ModelCatalog(BaseClient):
             alias=alias,
             version=version,
         )
+        from .datastores import URI_SCHEME_MAP
+
         model_source = model_instance["source"]
         if model_source[-1] == "/":
             model_source = model_source[:-1]  # remove trailing '/'
@@ -2459,13 +3730,13 @@ class ModelCatalog(BaseClient):
                 model_source = urljoin(
                     model_source, urlparse(model_source).path
                 )  # remove query params from URL, e.g. `?bluenaas=true`
-            req = requests.head(model_source)
+            req = self.session.head(model_source)
             if req.status_code == 200:
                 if "directory" in req.headers["Content-Type"]:
                     base_source = "/".join(model_source.split("/")[:6])
                     model_rel_source = "/".join(model_source.split("/")[6:])
                     dir_name = model_source.split("/")[-1]
-                    req = requests.get(base_source)
+                    req = self.session.get(base_source)
                     contents = req.text.split("\n")
                     files_match = [
                         os.path.join(base_source, x) for x in contents if x.startswith(model_rel_source) and "." in x
@@ -2530,14 +3801,10 @@ class ModelCatalog(BaseClient):
             with open(instance_path) as fp:
                 model_instances_json = json.load(fp)
         else:
-            if model_id:
-                url = self.url + "/models/" + model_id + "/instances/?size=100000"
-            else:
-                url = self.url + "/models/" + quote(str(alias)) + "/instances/?size=100000"
-            model_instances_json = requests.get(url, auth=self.auth, verify=self.verify)
+            model_instances_json = self._request("GET", self._model_url(model_id, alias) + "/instances/?size=100000")
         if model_instances_json.status_code != 200:
             handle_response_error("Error in retrieving model instances", model_instances_json)
-        model_instances_json = model_instances_json.json()
+        model_instances_json = self._decode(model_instances_json)
         return model_instances_json
 
     def add_model_instance(
@@ -2619,15 +3886,9 @@ class ModelCatalog(BaseClient):
             url = self.url + "/models/" + quote(str(model_id)) + "/instances/"
 
         headers = {"Content-type": "application/json"}
-        response = requests.post(
-            url,
-            data=json.dumps(instance_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("POST", url, data=self._encode(instance_data), headers=headers)
         if response.status_code == 201:
-            return response.json()
+            return self._decode(response)
         else:
             handle_response_error("Error in adding model instance", response)
 
@@ -2774,14 +4035,10 @@ class ModelCatalog(BaseClient):
             url = self.url + "/models/query/instances/" + instance_id
         else:
             model_identifier = quote(str(model_id or alias))
-            response0 = requests.get(
-                self.url + f"/models/{model_identifier}/instances/?version={version}",
-                auth=self.auth,
-                verify=self.verify,
-            )
+            response0 = self._request("GET", self.url + f"/models/{model_identifier}/instances/?version={version}")
             if response0.status_code != 200:
                 raise Exception("Invalid model_id, alias and/or version")
-            model_data = response0.json()[
+            model_data = self._decode(response0)[
                 0
             ]  # to fix: in principle, can have multiple instances with same version but different parameters
             url = self.url + f"/models/{model_identifier}/instances/{model_data['id']}"
@@ -2790,15 +4047,9 @@ class ModelCatalog(BaseClient):
             instance_data.pop(key)
 
         headers = {"Content-type": "application/json"}
-        response = requests.put(
-            url,
-            data=json.dumps(instance_data),
-            auth=self.auth,
-            headers=headers,
-            verify=self.verify,
-        )
+        response = self._request("PUT", url, data=self._encode(instance_data), headers=headers)
         if response.status_code == 200:
-            return response.json()
+            return self._decode(response)
         else:
             handle_response_error("Error in editing model instance at {}".format(url), response)
 
@@ -2846,22 +4097,102 @@ class ModelCatalog(BaseClient):
                 url = self.url + "/models/query/instances/" + instance_id
         else:
             raise NotImplementedError("Need to retrieve instance to get id")
-        model_instance_json = requests.delete(url, auth=self.auth, verify=self.verify)
+        model_instance_json = self._request("DELETE", url)
         if model_instance_json.status_code == 403:
             handle_response_error("Only SuperUser accounts can delete data", model_instance_json)
         elif model_instance_json.status_code != 200:
             handle_response_error("Error in deleting model instance", model_instance_json)
 
 
+PlatformInfo = namedtuple(
+    "PlatformInfo",
+    [
+        "architecture_bits",
+        "architecture_linkage",
+        "machine",
+        "network_name",
+        "ip_addr",
+        "processor",
+        "release",
+        "system_name",
+        "version",
+        "cpu_model",
+        "cpu_count",
+        "memory_total",
+    ],
+)
+
+
+@lru_cache(maxsize=None)
+def get_platform_info():
+    """
+    Return information about the platform the client is running on.
+
+    The information is collected the first time this function is called, and the same
+    immutable record is returned on later calls. Collecting it does not use the network.
+
+    Returns
+    -------
+    PlatformInfo
+        A named tuple with the fields of :func:`platform.uname` and :func:`platform.architecture`,
+        together with the network name and IP address of the machine, the CPU model, the number
+        of logical CPUs (`cpu_count`) and the total physical memory in bytes (`memory_total`).
+        Fields which cannot be determined on the current system are set to None.
+
+    Examples
+    --------
+    >>> info = get_platform_info()
+    >>> info.cpu_count
+    8
+    """
+    uname = platform.uname()
+    bits, linkage = platform.architecture()
+    return PlatformInfo(
+        architecture_bits=bits,
+        architecture_linkage=linkage,
+        machine=uname.machine,
+        network_name=uname.node,
+        ip_addr=_get_ip_address(),
+        processor=uname.processor,
+        release=uname.release,
+        system_name=uname.system,
+        version=uname.version,
+        cpu_model=_get_cpu_model() or uname.processor or None,
+        cpu_count=os.cpu_count(),
+        memory_total=_get_memory_total(),
+    )
+
+
 def _get_ip_address():
     """
-    Not foolproof, but allows checking for an external connection with a short
-    timeout, before trying socket.gethostbyname(), which has a very long
-    timeout.
+    Return the IP address of the interface used for outgoing traffic.
+
+    Connecting a UDP socket only looks up the route in the local routing table;
+    no packets are sent, so this returns immediately even without a network connection.
     """
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        return s.getsockname()[0]
-    except (OSError, URLError, socket.timeout, socket.gaierror):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.setblocking(False)
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except OSError:
         return "127.0.0.1"
+
+
+def _get_cpu_model():
+    # platform.processor() is often empty or uninformative on Linux
+    try:
+        with open("/proc/cpuinfo") as fp:
+            for line in fp:
+                if line.startswith(("model name", "Model", "cpu model")):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+
+def _get_memory_total():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):  # not available on Windows
+        return None
@@ -0,0 +1,1235 @@
+"""
+Asynchronous (asyncio) clients for the EBRAINS Model Validation Framework.
+
+:class:`AsyncTestLibrary` and :class:`AsyncModelCatalog` provide the same
+get/list/add/edit/delete/register methods as :class:`TestLibrary` and
+:class:`ModelCatalog`, as coroutines, so that many requests can be in flight
+at the same time on a single event loop. Authentication is carried out
+(synchronously) when the client is created, exactly as for the synchronous clients.
+
+Requires the `aiohttp` package (``pip install ebrains_validation_framework[async]``).
+
+Example
+-------
+
+>>> async with AsyncModelCatalog(token=token) as model_catalog:
+...     models = await gather_limited(10, *(model_catalog.get_model(model_id=id) for id in model_ids))
+"""
+
+import asyncio
+import json
+import os
+import time
+from functools import partial
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from . import STREAM_CHUNK_SIZE, ModelCatalog, TestLibrary, _body_size, handle_response_error, renameNestedJSONKey
+from . import tracing
+from .jsonstream import JSONArrayParser
+from .metadatastore import entity_tags
+from .vocabulary import normalize_filters
+
+
+async def gather_limited(limit, *aws, return_exceptions=False):
+    """Run awaitables concurrently, with at most `limit` of them running at any one time.
+
+    Results are returned in the order of the input, as for :func:`asyncio.gather`.
+
+    Examples
+    --------
+    >>> results = await gather_limited(20, *(test_library.get_result(result_id=id) for id in result_ids))
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=return_exceptions)
+
+
+def _load_json_file(path, parameter_name):
+    if not os.path.isfile(path):
+        raise Exception("Error in local file path specified by {}.".format(parameter_name))
+    with open(path) as fp:
+        return json.load(fp)
+
+
+class AsyncResponse(object):
+    """
+    A fully-read HTTP response, with the subset of the :class:`requests.Response`
+    interface used by the clients (e.g. by :func:`handle_response_error`).
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+class _StreamedResponse(object):
+    """An HTTP response whose body has not yet been read, for incremental parsing."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status
+        self.headers = response.headers
+
+    def iter_chunked(self, size):
+        return self._response.content.iter_chunked(size)
+
+    async def read(self):
+        return AsyncResponse(self.status_code, self.headers, await self._response.read())
+
+    def close(self):
+        self._response.release()
+
+
+class _AsyncSessionHolder(object):
+    """Creates the :class:`aiohttp.ClientSession` on first use, inside the running event loop."""
+
+    def __init__(self, limit=100, limit_per_host=10):
+        if aiohttp is None:
+            raise ImportError("Please install the following package: aiohttp")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.session = None
+
+    def get(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+class _AsyncClientMixin(object):
+    """
+    Replaces the transport of the synchronous clients by an aiohttp session.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of simultaneous connections; default 100.
+    limit_per_host : int, optional
+        Maximum number of simultaneous connections to a single host; default 10.
+    """
+
+    def __init__(
+        self,
+        username=None,
+        password=None,
+        environment="production",
+        token=None,
+        interactive=True,
+        limit=100,
+        limit_per_host=10,
+        **kwargs
+    ):
+        if kwargs.get("cassette") is not None:
+            raise ValueError("Cassettes are not supported by the asynchronous clients")
+        super(_AsyncClientMixin, self).__init__(username, password, environment, token, interactive, **kwargs)
+        self._async_sessions = _AsyncSessionHolder(limit, limit_per_host)
+
+    @classmethod
+    def from_existing(cls, client, limit=100, limit_per_host=10):
+        """
+        Create an asynchronous client from an existing (synchronous or asynchronous) client.
+        Asynchronous clients created from one another share the same connection pool.
+        """
+        obj = super(_AsyncClientMixin, cls).from_existing(client)
+        if hasattr(client, "_async_sessions"):
+            obj._async_sessions = client._async_sessions
+        else:
+            obj._async_sessions = _AsyncSessionHolder(limit, limit_per_host)
+        return obj
+
+    async def close(self):
+        """Close all connections. Clients created with :meth:`from_existing` are closed too."""
+        await self._async_sessions.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _request(self, method, url, auth=True, cache=False, **kwargs):
+        """
+        Send a request to the validation service, and read the complete response.
+
+        The HTTP cache, request coalescing and rate limiting are used as for the synchronous clients;
+        see :meth:`BaseClient._request`.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        if auth and self.auth:
+            headers["Authorization"] = "Bearer " + self.auth.token
+        kwargs.setdefault("ssl", bool(self.verify))
+        if method != "GET":
+            try:
+                return await self._send(method, url, headers, **kwargs)
+            finally:
+                self._invalidate_cache(url)
+        if self.single_flight is not None and set(kwargs) <= {"ssl"}:
+            # identical requests in progress in other coroutines are shared
+            return await self.single_flight.do_async((url, auth, cache), self._get, url, headers, cache, **kwargs)
+        return await self._get(url, headers, cache, **kwargs)
+
+    async def _get(self, url, headers, cache, **kwargs):
+        if self.http_cache is None or not cache:
+            return await self._send("GET", url, headers, **kwargs)
+
+        cached = self.http_cache.get_fresh(url)
+        if cached is None:
+            validators = self.http_cache.validators(url)
+            response = await self._send("GET", url, dict(headers, **validators), cacheable=True, **kwargs)
+            cached = self.http_cache.update(url, response.status_code, response.headers, response.content)
+            if cached is None:
+                if response.status_code == 304:  # cached copy was discarded in the meantime
+                    response = await self._send("GET", url, headers, cacheable=True, **kwargs)
+                    self.http_cache.update(url, response.status_code, response.headers, response.content)
+                return response
+        elif self._instrumented:
+            self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "hit")
+        return AsyncResponse(200, cached.headers, cached.content)
+
+    async def _send(self, method, url, headers, cacheable=False, **kwargs):
+        async def send():
+            async with self._async_sessions.get().request(method, url, headers=headers, **kwargs) as response:
+                content = await response.read()
+                return AsyncResponse(response.status, response.headers, content)
+
+        return await self._call(method, url, send, _body_size(kwargs.get("data")), cacheable)
+
+    async def _call(self, method, url, send, bytes_sent=0, cacheable=False, streamed=False):
+        # see BaseClient._send: awaits `send()` through the rate limiter, and reports the request to the hooks
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            return await send()
+
+        self._check_call_budgets(method, url)
+        start = time.perf_counter()
+        response = None
+        try:
+            if self.rate_limiter is None:
+                response = await attempt()
+            else:
+                response = await self.rate_limiter.call_async(method, attempt)
+            return response
+        finally:
+            if self._instrumented:
+                self._report_request(method, url, response, streamed, bytes_sent, start, attempts, cacheable)
+
+    async def _run_sync(self, method_name, *args, **kwargs):
+        # run a method of the equivalent synchronous client in a worker thread,
+        # for operations which are mainly local (file) I/O
+        sync_client = self._sync_class.from_existing(self)
+        method = getattr(sync_client, method_name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, tracing.propagate(partial(method, *args, **kwargs)))
+
+    async def _get_entity(self, kind, url, error_message, tags=(), missing_ok=False):
+        # see BaseClient._get_entity; the metadata store is local, so is accessed synchronously
+        if self.metadata_store is not None:
+            content = self.metadata_store.get(kind, url)
+            if content is not None:
+                if self._instrumented:
+                    self._emit_request("GET", url, 200, 0, 0, 0.0, 0, "store")
+                return self.codec.loads(content)
+        response = await self._request("GET", url, cache=True)
+        if response.status_code == 404 and missing_ok:
+            return None
+        if response.status_code != 200:
+            handle_response_error(error_message, response)
+        data = self._decode(response)
+        if self.metadata_store is not None:
+            self.metadata_store.put(kind, url, response.content, entity_tags(data).union(tags))
+        return data
+
+    async def sync_mirror(self, full=False, results=True, parallel=4, page_size=1000):
+        """Bring the local mirror up to date. See :meth:`BaseClient.sync_mirror`."""
+        # the mirror is updated after each page, so the synchronous implementation runs in a worker thread
+        return await self._run_sync("sync_mirror", full=full, results=results, parallel=parallel, page_size=page_size)
+
+    @staticmethod
+    async def _iter_records(records):
+        # records taken from the mirror, as an asynchronous generator
+        for record in records:
+            yield record
+
+    async def _fetch_page(self, path, filters, page_size, from_index, error_message, rename):
+        response = await self._request("GET", self._list_url(path, filters, page_size, from_index))
+        if response.status_code != 200:
+            handle_response_error(error_message, response)
+        records = self._decode(response)
+        if isinstance(records, dict):
+            records = [records]
+        if rename:
+            renameNestedJSONKey(records, "project_id", "collab_id")
+        return records
+
+    async def _stream_records(self, url, error_message, rename=True):
+        # see BaseClient._stream_records
+        headers = {"Authorization": "Bearer " + self.auth.token} if self.auth else {}
+
+        async def send():
+            session = self._async_sessions.get()
+            return _StreamedResponse(await session.request("GET", url, headers=headers, ssl=bool(self.verify)))
+
+        response = await self._call("GET", url, send, streamed=True)
+        try:
+            if response.status_code != 200:
+                handle_response_error(error_message, await response.read())
+            parser = JSONArrayParser()
+            async for chunk in response.iter_chunked(STREAM_CHUNK_SIZE):
+                for record in parser.feed(chunk):
+                    yield renameNestedJSONKey(record, "project_id", "collab_id") if rename else record
+            for record in parser.close():
+                yield renameNestedJSONKey(record, "project_id", "collab_id") if rename else record
+        finally:
+            response.close()
+
+    async def _list_parallel(self, path, filters, size, from_index, parallel, page_size, error_message, rename=True):
+        # see BaseClient._list_parallel; the pages of each window are retrieved concurrently
+        if page_size < 1 or parallel < 1:
+            raise ValueError("parallel and page_size must be positive integers")
+        end = from_index + size
+        records = await self._fetch_page(path, filters, min(page_size, size), from_index, error_message, rename)
+        start = from_index + len(records)
+        if len(records) < min(page_size, size):
+            return records
+        while start < end:
+            window = [(index, min(page_size, end - index)) for index in range(start, end, page_size)][:parallel]
+            pages = await asyncio.gather(
+                *(self._fetch_page(path, filters, count, index, error_message, rename) for index, count in window)
+            )
+            for (index, count), page in zip(window, pages):
+                records.extend(page)
+                if len(page) < count:
+                    return records
+            start = window[-1][0] + window[-1][1]
+        return records
+
+    async def _iter_pages(self, path, filters, page_size, prefetch, error_message, rename=True):
+        # see BaseClient._iter_pages; the next page is retrieved in a separate task
+        if page_size < 1:
+            raise ValueError("page_size must be a positive integer")
+        next_page = None
+        from_index = 0
+        try:
+            while True:
+                if next_page is None:
+                    page = await self._fetch_page(path, filters, page_size, from_index, error_message, rename)
+                else:
+                    page = await next_page
+                    next_page = None
+                from_index += page_size
+                last_page = len(page) < page_size
+                if prefetch and not last_page:
+                    next_page = asyncio.ensure_future(
+                        self._fetch_page(path, filters, page_size, from_index, error_message, rename)
+                    )
+                for record in page:
+                    yield record
+                if last_page:
+                    return
+                page = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _get_many(self, ids, get, parallel):
+        # see BaseClient._get_many; `get` is a coroutine function
+        unique_ids = list(dict.fromkeys(ids))
+        found = dict(zip(unique_ids, await gather_limited(parallel, *(get(id) for id in unique_ids))))
+        self._report_missing([id for id in unique_ids if found[id] is None])
+        return [found[id] for id in ids]
+
+    async def _get_attribute_options(self, param, valid_params):
+        # see BaseClient._get_attribute_options
+        url = self._attribute_options_url(param, valid_params)
+        terms = await self._vocabulary_terms() if self.vocabulary is not None else None
+        if terms is not None:
+            if param in ("", "all"):
+                return {field: list(values) for field, values in terms.items()}
+            if param in terms:
+                return list(terms[param])
+        return await self._get_entity("vocab", url, "Error in retrieving attribute options")
+
+    async def _vocabulary_terms(self, refresh=False):
+        # see BaseClient._vocabulary_terms
+        entry = self.vocabulary.entry(self.url)
+        if entry is not None and not refresh and entry[0] + self.vocabulary.ttl >= time.time():
+            return entry[1]
+        try:
+            response = await self._request("GET", self.url + "/vocab/")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return entry[1] if entry else None
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving attribute options", response)
+        terms = self._decode(response)
+        self.vocabulary.put(self.url, terms)
+        return terms
+
+    async def _normalize_filters(self, filters):
+        # see BaseClient._normalize_filters
+        if self.vocabulary is None or not any(field in filters for field in self.attribute_fields):
+            return filters
+        terms = await self._vocabulary_terms()
+        if terms is None:
+            return filters
+        try:
+            return normalize_filters(filters, terms, self.attribute_fields)
+        except ValueError:
+            if self.vocabulary.entry(self.url)[0] + self.vocabulary.refresh_interval > time.time():
+                raise
+        return normalize_filters(filters, await self._vocabulary_terms(refresh=True), self.attribute_fields)
+
+    async def _iter_checked(self, kind, filters, iter_pages):
+        # for the iter_* methods: the values of the filters are checked, retrieving the vocabulary if needed,
+        # before the records are taken from the mirror, or from the pages of `iter_pages(filters)`
+        filters = await self._normalize_filters(filters)
+        records = self._list_mirror(kind, filters)
+        if records is not None:
+            for record in records:
+                yield record
+            return
+        pages = iter_pages(filters)
+        try:
+            async for record in pages:
+                yield record
+        finally:
+            await pages.aclose()
+
+    async def api_info(self):
+        return self._decode(await self._request("GET", self.url, auth=False))
+
+
+class AsyncTestLibrary(_AsyncClientMixin, TestLibrary):
+    """Asynchronous client for the EBRAINS Validation Test library.
+
+    Has the same methods as :class:`TestLibrary`, but all methods that
+    access the validation service are coroutines.
+
+    Parameters
+    ----------
+    username, password, environment, token, interactive
+        See :class:`TestLibrary`.
+    limit : int, optional
+        Maximum number of simultaneous connections; default 100.
+    limit_per_host : int, optional
+        Maximum number of simultaneous connections to a single host; default 10.
+
+    Examples
+    --------
+    >>> test_library = AsyncTestLibrary(token="<<token>>")
+    >>> test = await test_library.get_test_definition(alias="CDT-6")
+    >>> await test_library.close()
+    """
+
+    __test__ = False
+    _sync_class = TestLibrary
+
+    async def get_test_definition(self, test_path="", test_id="", alias=""):
+        """Retrieve a specific test definition. See :meth:`TestLibrary.get_test_definition`."""
+        if test_path == "" and test_id == "" and alias == "":
+            raise Exception("test_path or test_id or alias needs to be provided for finding a test.")
+        if test_path:
+            return _load_json_file(test_path, "test_path")
+        url = self._test_url(test_id, alias)
+        return await self._get_entity("test", url, "Error in retrieving test", (test_id, alias))
+
+    async def get_test_definitions(self, test_ids, parallel=10):
+        """Retrieve several test definitions. See :meth:`TestLibrary.get_test_definitions`."""
+
+        async def get(test_id):
+            url = self._test_url(test_id)
+            return await self._get_entity("test", url, "Error in retrieving test", (test_id,), missing_ok=True)
+
+        return await self._get_many(test_ids, get, parallel)
+
+    async def get_validation_test(
+        self,
+        test_path="",
+        instance_path="",
+        instance_id="",
+        test_id="",
+        alias="",
+        version="",
+        **params,
+    ):
+        """Retrieve a specific test instance as a Python class. See :meth:`TestLibrary.get_validation_test`."""
+        return await self._run_sync(
+            "get_validation_test",
+            test_path=test_path,
+            instance_path=instance_path,
+            instance_id=instance_id,
+            test_id=test_id,
+            alias=alias,
+            version=version,
+            **params,
+        )
+
+    async def list_tests(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
+        """Retrieve a list of test definitions. See :meth:`TestLibrary.list_tests`.
+
+        With `stream=True`, returns an asynchronous generator.
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = await self._normalize_filters(filters)
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        # the mirror is local, so is accessed synchronously
+        tests = self._list_mirror("test", filters, size, from_index)
+        if tests is not None:
+            return self._iter_records(tests) if stream else tests
+        if stream:
+            return self._stream_records(
+                self._list_url("/tests/", filters, size, from_index), "Error listing tests", rename=False
+            )
+        if parallel:
+            return await self._list_parallel(
+                "/tests/", filters, size, from_index, parallel, page_size, "Error listing tests", rename=False
+            )
+        response = await self._request("GET", self._list_url("/tests/", filters, size, from_index))
+        if response.status_code != 200:
+            handle_response_error("Error listing tests", response)
+        return self._decode(response)
+
+    def iter_tests(self, page_size=1000, prefetch=True, **filters):
+        """Asynchronously iterate over test definitions. See :meth:`TestLibrary.iter_tests`.
+
+        Examples
+        --------
+        >>> async for test in test_library.iter_tests(species="Rattus norvegicus"):
+        ...     print(test["alias"])
+        """
+        self._check_filters(filters, self.valid_filters)
+        return self._iter_checked(
+            "test",
+            filters,
+            lambda filters: self._iter_pages(
+                "/tests/", filters, page_size, prefetch, "Error listing tests", rename=False
+            ),
+        )
+
+    async def search_tests(self, text, size=10, **filters):
+        """Search the test definitions in the local mirror. See :meth:`TestLibrary.search_tests`."""
+        # the mirror is local, so is accessed synchronously
+        self._check_filters(filters, self.valid_filters)
+        filters = await self._normalize_filters(filters)
+        return self._search_mirror("test", text, size, filters)
+
+    async def add_test(
+        self,
+        collab_id=None,
+        name=None,
+        alias=None,
+        author=None,
+        species=None,
+        age=None,
+        brain_region=None,
+        cell_type=None,
+        publication=None,
+        description=None,
+        recording_modality=None,
+        test_type=None,
+        score_type=None,
+        data_location=None,
+        data_type=None,
+        implementation_status=None,
+        instances=[],
+    ):
+        """Register a new test on the test library. See :meth:`TestLibrary.add_test`."""
+        args = locals()
+        test_data = self._test_data(args, await self.get_attribute_options())
+        headers = {"Content-type": "application/json"}
+        response = await self._request("POST", self.url + "/tests/", data=self._encode(test_data), headers=headers)
+        if response.status_code == 201:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in adding test", response)
+
+    async def edit_test(
+        self,
+        test_id=None,
+        collab_id=None,
+        name=None,
+        alias=None,
+        author=None,
+        species=None,
+        age=None,
+        brain_region=None,
+        cell_type=None,
+        publication=None,
+        description=None,
+        recording_modality=None,
+        test_type=None,
+        score_type=None,
+        data_location=None,
+        data_type=None,
+        implementation_status=None,
+    ):
+        """Edit an existing test in the test library. See :meth:`TestLibrary.edit_test`."""
+        if not test_id:
+            raise Exception("Test ID needs to be provided for editing a test.")
+        args = locals()
+        test_data = self._test_data(args, await self.get_attribute_options())
+        headers = {"Content-type": "application/json"}
+        url = self.url + "/tests/" + test_id
+        response = await self._request("PUT", url, data=self._encode(test_data), headers=headers)
+        if response.status_code == 200:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in editing test", response)
+
+    async def delete_test(self, test_id="", alias=""):
+        """ONLY FOR SUPERUSERS: Delete a specific test definition. See :meth:`TestLibrary.delete_test`."""
+        if test_id == "" and alias == "":
+            raise Exception("test ID or alias needs to be provided for deleting a test.")
+        response = await self._request("DELETE", self._test_url(test_id, alias))
+        if response.status_code == 403:
+            handle_response_error("Only SuperUser accounts can delete data", response)
+        elif response.status_code != 200:
+            handle_response_error("Error in deleting test", response)
+
+    async def get_test_instance(self, instance_path="", instance_id="", test_id="", alias="", version=""):
+        """Retrieve a specific test instance definition. See :meth:`TestLibrary.get_test_instance`."""
+        if instance_path == "" and instance_id == "" and test_id == "" and alias == "":
+            raise Exception(
+                "instance_path or instance_id or test_id or alias needs to be provided for finding a test instance."
+            )
+        if instance_path:
+            return _load_json_file(instance_path, "instance_path")
+        url = self._test_instance_url(instance_id, test_id, alias, version)
+        test_instance_json = await self._get_entity(
+            "test_instance", url, "Error in retrieving test instance", (instance_id, test_id, alias)
+        )
+        return self._select_test_instance(test_instance_json)
+
+    async def get_test_instances(self, instance_ids, parallel=10):
+        """Retrieve several test instances. See :meth:`TestLibrary.get_test_instances`."""
+
+        async def get(instance_id):
+            url = self._test_instance_url(instance_id)
+            return await self._get_entity(
+                "test_instance", url, "Error in retrieving test instance", (instance_id,), missing_ok=True
+            )
+
+        return await self._get_many(instance_ids, get, parallel)
+
+    async def list_test_instances(self, instance_path="", test_id="", alias=""):
+        """Retrieve list of test instances belonging to a test. See :meth:`TestLibrary.list_test_instances`."""
+        if instance_path == "" and test_id == "" and alias == "":
+            raise Exception("instance_path or test_id or alias needs to be provided for finding test instances.")
+        if instance_path:
+            return _load_json_file(instance_path, "instance_path")
+        response = await self._request("GET", self._test_url(test_id, alias) + "/instances/?size=100000")
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving test instances", response)
+        return self._decode(response)
+
+    async def add_test_instance(
+        self,
+        test_id="",
+        alias="",
+        repository="",
+        path="",
+        version="",
+        description="",
+        parameters="",
+    ):
+        """Register a new test instance. See :meth:`TestLibrary.add_test_instance`."""
+        instance_data = locals()
+        instance_data.pop("self")
+
+        for key, val in instance_data.items():
+            if val == "":
+                instance_data[key] = None
+
+        test_id = test_id or alias
+        if not test_id:
+            raise Exception("test_id or alias needs to be provided for finding the test.")
+        url = self._test_url(alias=test_id) + "/instances/"
+        headers = {"Content-type": "application/json"}
+        response = await self._request("POST", url, data=self._encode(instance_data), headers=headers)
+        if response.status_code == 201:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in adding test instance", response)
+
+    async def edit_test_instance(
+        self,
+        instance_id="",
+        test_id="",
+        alias="",
+        repository=None,
+        path=None,
+        version=None,
+        description=None,
+        parameters=None,
+    ):
+        """Edit an existing test instance. See :meth:`TestLibrary.edit_test_instance`."""
+        test_identifier = test_id or alias
+        if instance_id == "" and (test_identifier == "" or version is None):
+            raise Exception(
+                "instance_id or (test_id, version) or (alias, version) "
+                "needs to be provided for finding a test instance."
+            )
+
+        instance_data = {}
+        args = locals()
+        for field in ("repository", "path", "version", "description", "parameters"):
+            value = args[field]
+            if value:
+                instance_data[field] = value
+
+        if not instance_id:
+            url = self.url + "/tests/" + test_identifier + "/instances/?version=" + version
+            response0 = await self._request("GET", url)
+            if response0.status_code != 200:
+                raise Exception("Invalid test identifier and/or version")
+            instance_id = self._decode(response0)[0]["id"]  # todo: handle more than 1 instance in response
+        url = self.url + "/tests/query/instances/" + instance_id
+
+        headers = {"Content-type": "application/json"}
+        response = await self._request("PUT", url, data=self._encode(instance_data), headers=headers)
+        if response.status_code == 200:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in editing test instance", response)
+
+    async def delete_test_instance(self, instance_id="", test_id="", alias="", version=""):
+        """ONLY FOR SUPERUSERS: Delete an existing test instance. See :meth:`TestLibrary.delete_test_instance`."""
+        test_identifier = test_id or alias
+        if instance_id == "" and (test_identifier == "" or version == ""):
+            raise Exception(
+                "instance_id or (test_id, version) or (alias, version) "
+                "needs to be provided for finding a test instance."
+            )
+
+        if not instance_id:
+            url = self.url + "/tests/" + test_identifier + "/instances/" + version
+            response0 = await self._request("GET", url)
+            if response0.status_code != 200:
+                raise Exception("Invalid test identifier and/or version")
+            instance_id = self._decode(response0)[0]["id"]
+        response = await self._request("DELETE", self.url + "/tests/query/instances/" + instance_id)
+        if response.status_code == 403:
+            handle_response_error("Only SuperUser accounts can delete data", response)
+        elif response.status_code != 200:
+            handle_response_error("Error in deleting test instance", response)
+
+    async def get_attribute_options(self, param=""):
+        """Retrieve valid values for test attributes. See :meth:`TestLibrary.get_attribute_options`."""
+        return await self._get_attribute_options(param, self.attribute_fields)
+
+    async def get_result(self, result_id=""):
+        """Retrieve a test result. See :meth:`TestLibrary.get_result`."""
+        if not result_id:
+            raise Exception("result_id needs to be provided for finding a specific result.")
+        url = self.url + "/results/" + result_id
+        result_json = await self._get_entity("result", url, "Error in retrieving result", (result_id,))
+        return renameNestedJSONKey(result_json, "project_id", "collab_id")
+
+    async def get_results(self, result_ids, parallel=10):
+        """Retrieve several test results. See :meth:`TestLibrary.get_results`."""
+        found, batches = self._cached_results(result_ids)
+
+        async def get_batch(batch):
+            response = await self._request("GET", self._list_url("/results/", {"id": batch}, len(batch), 0))
+            if response.status_code != 200:
+                handle_response_error("Error in retrieving results", response)
+            return self._decode(response)
+
+        self._add_listed_results(found, batches, await gather_limited(parallel, *map(get_batch, batches)))
+
+        async def get(result_id):
+            if result_id in found:
+                return found[result_id]
+            url = self.url + "/results/" + result_id
+            return await self._get_entity("result", url, "Error in retrieving result", (result_id,), missing_ok=True)
+
+        return renameNestedJSONKey(await self._get_many(result_ids, get, parallel), "project_id", "collab_id")
+
+    async def list_results(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
+        """Retrieve test results satisfying specified filters. See :meth:`TestLibrary.list_results`.
+
+        With `stream=True`, returns an asynchronous generator:
+
+        >>> async for result in await test_library.list_results(stream=True):
+        ...     print(result["score"])
+        """
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        results = self._list_mirror("result", filters, size, from_index)
+        if results is not None:
+            return self._iter_records(results) if stream else results
+        if stream:
+            return self._stream_records(
+                self._list_url("/results/", filters, size, from_index), "Error in retrieving results"
+            )
+        if parallel:
+            return await self._list_parallel(
+                "/results/", filters, size, from_index, parallel, page_size, "Error in retrieving results"
+            )
+        response = await self._request("GET", self._list_url("/results/", filters, size, from_index))
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving results", response)
+        return renameNestedJSONKey(self._decode(response), "project_id", "collab_id")
+
+    def iter_results(self, page_size=1000, prefetch=True, **filters):
+        """Asynchronously iterate over test results. See :meth:`TestLibrary.iter_results`."""
+        results = self._list_mirror("result", filters)
+        if results is not None:
+            return self._iter_records(results)
+        return self._iter_pages("/results/", filters, page_size, prefetch, "Error in retrieving results")
+
+    async def register_result(self, test_result, data_store=None, collab_id=None):
+        """Register test result with EBRAINS Validation Results Service. See :meth:`TestLibrary.register_result`.
+
+        Uploading of files to the data store takes place in a worker thread.
+        """
+        collab_id = self._result_collab_id(test_result, data_store, collab_id)
+
+        model_catalog = AsyncModelCatalog.from_existing(self)
+        with tracing.span("resolve_model"):
+            model_instance_uuid = (await model_catalog.find_model_instance_else_add(test_result.model))["id"]
+
+        loop = asyncio.get_running_loop()
+        with tracing.span("upload_artifacts"):
+            results_storage = await loop.run_in_executor(
+                None, tracing.propagate(partial(self._upload_result_files, test_result, data_store, collab_id))
+            )
+
+        result_json = self._result_data(test_result, model_instance_uuid, results_storage, collab_id)
+        headers = {"Content-type": "application/json"}
+        with tracing.span("register"):
+            response = await self._request(
+                "POST", self.url + "/results/", data=self._encode(result_json), headers=headers
+            )
+        if response.status_code == 201:
+            result = self._decode(response)
+            print(
+                "Result registered successfully! "
+                f"- see https://model-catalog.apps.ebrains.eu/#result_id.{result['id']}"
+            )
+            return renameNestedJSONKey(result, "project_id", "collab_id")
+        else:
+            handle_response_error("Error registering result", response)
+
+    async def delete_result(self, result_id=""):
+        """ONLY FOR SUPERUSERS: Delete a result on the validation framework. See :meth:`TestLibrary.delete_result`."""
+        if not result_id:
+            raise Exception("result_id needs to be provided for finding a specific result.")
+        response = await self._request("DELETE", self.url + "/results/" + result_id)
+        if response.status_code == 403:
+            handle_response_error("Only SuperUser accounts can delete data", response)
+        elif response.status_code != 200:
+            handle_response_error("Error in deleting result", response)
+
+
+class AsyncModelCatalog(_AsyncClientMixin, ModelCatalog):
+    """Asynchronous client for the EBRAINS Model Catalog.
+
+    Has the same methods as :class:`ModelCatalog`, but all methods that
+    access the validation service are coroutines.
+
+    Parameters
+    ----------
+    username, password, environment, token, interactive
+        See :class:`ModelCatalog`.
+    limit : int, optional
+        Maximum number of simultaneous connections; default 100.
+    limit_per_host : int, optional
+        Maximum number of simultaneous connections to a single host; default 10.
+
+    Examples
+    --------
+    >>> model_catalog = AsyncModelCatalog(token="<<token>>")
+    >>> model = await model_catalog.get_model(alias="B1")
+    >>> await model_catalog.close()
+    """
+
+    __test__ = False
+    _sync_class = ModelCatalog
+
+    async def get_model(self, model_id="", alias="", instances=True, images=True):
+        """Retrieve a specific model description. See :meth:`ModelCatalog.get_model`."""
+        if model_id == "" and alias == "":
+            raise Exception("Model ID or alias needs to be provided for finding a model.")
+        url = self._model_url(model_id, alias)
+        model_json = await self._get_entity("model", url, "Error in retrieving model", (model_id, alias))
+        if instances is False:
+            model_json.pop("instances")
+        return renameNestedJSONKey(model_json, "project_id", "collab_id")
+
+    async def get_models(self, model_ids, instances=True, parallel=10):
+        """Retrieve several model descriptions. See :meth:`ModelCatalog.get_models`."""
+
+        async def get(model_id):
+            url = self._model_url(model_id)
+            model_json = await self._get_entity(
+                "model", url, "Error in retrieving model", (model_id,), missing_ok=True
+            )
+            if model_json is not None and instances is False:
+                model_json.pop("instances")
+            return model_json
+
+        return renameNestedJSONKey(await self._get_many(model_ids, get, parallel), "project_id", "collab_id")
+
+    async def list_models(self, size=1000000, from_index=0, parallel=None, page_size=1000, stream=False, **filters):
+        """Retrieve list of model descriptions. See :meth:`ModelCatalog.list_models`.
+
+        With `stream=True`, returns an asynchronous generator.
+        """
+        self._check_filters(filters, self.valid_filters)
+        filters = await self._normalize_filters(filters)
+        if parallel and stream:
+            raise ValueError("stream cannot be combined with parallel")
+        models = self._list_mirror("model", filters, size, from_index)
+        if models is not None:
+            return self._iter_records(models) if stream else models
+        if stream:
+            url = self._list_url("/models/", self._model_filters(filters), size, from_index)
+            return self._stream_records(url, "Error in retrieving models")
+        if parallel:
+            return await self._list_parallel(
+                "/models/",
+                self._model_filters(filters),
+                size,
+                from_index,
+                parallel,
+                page_size,
+                "Error in retrieving models",
+            )
+        url = self._list_url("/models/", self._model_filters(filters), size, from_index)
+        response = await self._request("GET", url)
+        if response.status_code == 200:
+            try:
+                models = self._decode(response)
+            except ValueError:  # invalid JSON
+                handle_response_error("Error in list_models()", response)
+            if isinstance(models, dict):
+                models = [models]
+            return renameNestedJSONKey(models, "project_id", "collab_id")
+        else:
+            error = self._decode(response)
+            raise Exception(f"{error['detail']} (status code {response.status_code})")
+
+    def iter_models(self, page_size=1000, prefetch=True, **filters):
+        """Asynchronously iterate over model descriptions. See :meth:`ModelCatalog.iter_models`."""
+        self._check_filters(filters, self.valid_filters)
+        return self._iter_checked(
+            "model",
+            filters,
+            lambda filters: self._iter_pages(
+                "/models/", self._model_filters(filters), page_size, prefetch, "Error in retrieving models"
+            ),
+        )
+
+    async def search_models(self, text, size=10, **filters):
+        """Search the model descriptions in the local mirror. See :meth:`ModelCatalog.search_models`."""
+        # the mirror is local, so is accessed synchronously
+        self._check_filters(filters, self.valid_filters)
+        filters = await self._normalize_filters(filters)
+        return self._search_mirror("model", text, size, filters)
+
+    async def register_model(
+        self,
+        collab_id=None,
+        name=None,
+        alias=None,
+        author=None,
+        owner=None,
+        organization=None,
+        species=None,
+        brain_region=None,
+        cell_type=None,
+        model_scope=None,
+        abstraction_level=None,
+        license=None,
+        description=None,
+        instances=[],
+    ):
+        """Register a new model in the model catalog. See :meth:`ModelCatalog.register_model`."""
+        model_data = self._model_data(locals(), new=True)
+        model_data = self._format_model_data(model_data, await self.get_attribute_options())
+        headers = {"Content-type": "application/json"}
+        response = await self._request("POST", self.url + "/models/", data=self._encode(model_data), headers=headers)
+        if response.status_code == 201:
+            return renameNestedJSONKey(self._decode(response), "project_id", "collab_id")
+        else:
+            handle_response_error("Error in adding model", response)
+
+    async def edit_model(
+        self,
+        model_id=None,
+        collab_id=None,
+        name=None,
+        alias=None,
+        author=None,
+        owner=None,
+        organization=None,
+        species=None,
+        brain_region=None,
+        cell_type=None,
+        model_scope=None,
+        abstraction_level=None,
+        project=None,
+        license=None,
+        description=None,
+    ):
+        """Edit an existing model on the model catalog. See :meth:`ModelCatalog.edit_model`."""
+        if not model_id:
+            raise Exception("Model ID needs to be provided for editing a model.")
+        model_data = self._model_data(locals(), new=False)
+        model_data = self._format_model_data(model_data, await self.get_attribute_options())
+        headers = {"Content-type": "application/json"}
+        url = self.url + "/models/" + model_id
+        response = await self._request("PUT", url, data=self._encode(model_data), headers=headers)
+        if response.status_code == 200:
+            return renameNestedJSONKey(self._decode(response), "project_id", "collab_id")
+        else:
+            handle_response_error("Error in updating model", response)
+
+    async def delete_model(self, model_id="", alias=""):
+        """ONLY FOR SUPERUSERS: Delete a specific model description. See :meth:`ModelCatalog.delete_model`."""
+        if model_id == "" and alias == "":
+            raise Exception("Model ID or alias needs to be provided for deleting a model.")
+        response = await self._request("DELETE", self._model_url(model_id, alias))
+        if response.status_code == 403:
+            handle_response_error("Only SuperUser accounts can delete data", response)
+        elif response.status_code != 200:
+            handle_response_error("Error in deleting model", response)
+
+    async def get_attribute_options(self, param=""):
+        """Retrieve valid values for attributes. See :meth:`ModelCatalog.get_attribute_options`."""
+        return await self._get_attribute_options(param, self.attribute_fields)
+
+    async def get_model_instance(self, instance_path="", instance_id="", model_id="", alias="", version=""):
+        """Retrieve an existing model instance. See :meth:`ModelCatalog.get_model_instance`."""
+        if (
+            instance_path == ""
+            and instance_id == ""
+            and (model_id == "" or version == "")
+            and (alias == "" or version == "")
+        ):
+            raise Exception(
+                "instance_path or instance_id or (model_id, version) or (alias, version) "
+                "needs to be provided for finding a model instance."
+            )
+        if instance_path:
+            return _load_json_file(instance_path, "instance_path")
+        url = self._model_instance_url(instance_id, model_id, alias, version)
+        model_instance_json = await self._get_entity(
+            "model_instance", url, "Error in retrieving model instance", (instance_id, model_id, alias)
+        )
+        return self._select_model_instance(model_instance_json)
+
+    async def get_model_instances(self, instance_ids, parallel=10):
+        """Retrieve several model instances. See :meth:`ModelCatalog.get_model_instances`."""
+
+        async def get(instance_id):
+            url = self._model_instance_url(instance_id)
+            return await self._get_entity(
+                "model_instance", url, "Error in retrieving model instance", (instance_id,), missing_ok=True
+            )
+
+        return await self._get_many(instance_ids, get, parallel)
+
+    async def download_model_instance(
+        self,
+        instance_path="",
+        instance_id="",
+        model_id="",
+        alias="",
+        version="",
+        local_directory=".",
+        overwrite=False,
+    ):
+        """Download files corresponding to a model instance. See :meth:`ModelCatalog.download_model_instance`.
+
+        The download takes place in a worker thread.
+        """
+        return await self._run_sync(
+            "download_model_instance",
+            instance_path=instance_path,
+            instance_id=instance_id,
+            model_id=model_id,
+            alias=alias,
+            version=version,
+            local_directory=local_directory,
+            overwrite=overwrite,
+        )
+
+    async def list_model_instances(self, instance_path="", model_id="", alias=""):
+        """Retrieve list of model instances belonging to a model. See :meth:`ModelCatalog.list_model_instances`."""
+        if instance_path == "" and model_id == "" and alias == "":
+            raise Exception("instance_path or model_id or alias needs to be provided for finding model instances.")
+        if instance_path:
+            return _load_json_file(instance_path, "instance_path")
+        response = await self._request("GET", self._model_url(model_id, alias) + "/instances/?size=100000")
+        if response.status_code != 200:
+            handle_response_error("Error in retrieving model instances", response)
+        return self._decode(response)
+
+    async def add_model_instance(
+        self,
+        model_id="",
+        alias="",
+        source="",
+        version="",
+        description="",
+        parameters=None,
+        code_format="",
+        hash="",
+        morphology="",
+        license="",
+        collab_id=None,
+    ):
+        """Register a new model instance. See :meth:`ModelCatalog.add_model_instance`."""
+        instance_data = locals()
+        instance_data.pop("self")
+        instance_data["project_id"] = instance_data.pop("collab_id")
+
+        for key, val in instance_data.items():
+            if val == "":
+                instance_data[key] = None
+
+        model_id = model_id or alias
+        if not model_id:
+            raise Exception("model_id or alias needs to be provided for finding the model.")
+        url = self._model_url(alias=model_id) + "/instances/"
+        headers = {"Content-type": "application/json"}
+        response = await self._request("POST", url, data=self._encode(instance_data), headers=headers)
+        if response.status_code == 201:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in adding model instance", response)
+
+    async def find_model_instance_else_add(self, model_obj, collab_id=None):
+        """Find existing model instance; else create a new instance.
+        See :meth:`ModelCatalog.find_model_instance_else_add`."""
+        if not getattr(model_obj, "model_instance_uuid", None):
+            # check that the model is registered with the model registry.
+            if not hasattr(model_obj, "model_uuid") and not hasattr(model_obj, "model_alias"):
+                raise AttributeError(
+                    "Model object does not have a 'model_uuid'/'model_alias' attribute. "
+                    "Please register it with the Validation Framework and add "
+                    "the 'model_uuid'/'model_alias' to the model object."
+                )
+            if not hasattr(model_obj, "model_version"):
+                raise AttributeError("Model object does not have a 'model_version' attribute")
+
+            model_instance = await self.get_model_instance(
+                model_id=getattr(model_obj, "model_uuid", None),
+                alias=getattr(model_obj, "model_alias", None),
+                version=model_obj.model_version,
+            )
+            if not model_instance:  # check if instance doesn't exist
+                # if yes, then create a new instance
+                model_instance = await self.add_model_instance(
+                    model_id=getattr(model_obj, "model_uuid", None),
+                    alias=getattr(model_obj, "model_alias", None),
+                    source=getattr(model_obj, "remote_url", ""),
+                    version=model_obj.model_version,
+                    parameters=getattr(model_obj, "parameters", ""),
+                    collab_id=collab_id or getattr(model_obj, "collab_id", None),
+                )
+        else:
+            model_instance = await self.get_model_instance(instance_id=model_obj.model_instance_uuid)
+        return model_instance
+
+    async def edit_model_instance(
+        self,
+        instance_id="",
+        model_id="",
+        alias="",
+        source=None,
+        version=None,
+        description=None,
+        parameters=None,
+        code_format=None,
+        hash=None,
+        morphology=None,
+        license=None,
+    ):
+        """Edit an existing model instance. See :meth:`ModelCatalog.edit_model_instance`."""
+        if instance_id == "" and (model_id == "" or not version) and (alias == "" or not version):
+            raise Exception(
+                "instance_id or (model_id, version) or (alias, version) "
+                "needs to be provided for finding a model instance."
+            )
+
+        instance_data = {key: value for key, value in locals().items() if value is not None}
+
+        if instance_id:
+            url = self.url + "/models/query/instances/" + instance_id
+        else:
+            model_url = self._model_url(alias=model_id or alias)
+            response0 = await self._request("GET", model_url + f"/instances/?version={version}")
+            if response0.status_code != 200:
+                raise Exception("Invalid model_id, alias and/or version")
+            model_data = self._decode(response0)[0]
+            url = model_url + f"/instances/{model_data['id']}"
+
+        for key in ["self", "instance_id", "alias", "model_id"]:
+            instance_data.pop(key)
+
+        headers = {"Content-type": "application/json"}
+        response = await self._request("PUT", url, data=self._encode(instance_data), headers=headers)
+        if response.status_code == 200:
+            return self._decode(response)
+        else:
+            handle_response_error("Error in editing model instance at {}".format(url), response)
+
+    async def delete_model_instance(self, instance_id="", model_id="", alias="", version=""):
+        """ONLY FOR SUPERUSERS: Delete an existing model instance. See :meth:`ModelCatalog.delete_model_instance`."""
+        if instance_id == "" and (model_id == "" or not version) and (alias == "" or not version):
+            raise Exception(
+                "instance_id or (model_id, version) or (alias, version) "
+                "needs to be provided for finding a model instance."
+            )
+
+        if not instance_id:
+            # a version can match no instance, or several instances with different parameters
+            instances = await self.get_model_instance(model_id=model_id, alias=alias, version=version)
+            if isinstance(instances, dict):
+                instances = [instances]
+            if len(instances) != 1:
+                raise Exception(
+                    f"{len(instances)} model instances found with version '{version}'; "
+                    "provide the instance_id of the model instance to be deleted."
+                )
+            instance_id = instances[0]["id"]
+        if model_id:
+            url = self.url + "/models/" + model_id + "/instances/" + instance_id
+        else:
+            url = self.url + "/models/query/instances/" + instance_id
+        response = await self._request("DELETE", url)
+        if response.status_code == 403:
+            handle_response_error("Only SuperUser accounts can delete data", response)
+        elif response.status_code != 200:
+            handle_response_error("Error in deleting model instance", response)
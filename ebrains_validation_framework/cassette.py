@@ -0,0 +1,228 @@
+"""
+Recording and replay of the HTTP exchanges of the clients, in "cassette" files.
+
+A client created with a cassette in "record" mode sends its requests as usual, and appends each
+request and response to the cassette file. A client created with the same cassette in "replay" mode
+answers each request from the file, without contacting any server, so that workflows such as
+:meth:`TestLibrary.get_validation_test` or :func:`utils.generate_score_matrix` can be run again
+on machines without network access, or profiled without the variability of network latency.
+
+Each line of a cassette holds one exchange, as three tab-separated fields: a key identifying the request
+(the method, the URL with its query parameters sorted and, optionally, a digest of the body), the status
+and selected headers of the response, as JSON, and the body of the response, as it was received
+(or encoded in base64, if it contains line breaks). Cassettes whose name ends with ".gz" are compressed.
+When replaying, the file is read once into an index of the keys, so each request is answered with
+a dictionary lookup, whatever the size of the cassette, and bodies are not decoded. The responses to
+a request made several times are replayed in the order in which they were recorded, and the last one
+is repeated.
+
+Authorization headers are not recorded. Throttled responses (status 429 or 503) are not recorded either,
+as the request is repeated by the client.
+
+Example
+-------
+
+>>> test_library = TestLibrary(token=token, cassette="score-matrix.cassette.gz")  # records the first time
+>>> styled_df, excluded = utils.generate_score_matrix(result_list=result_ids, client_obj=test_library)
+>>> # later, on a machine without network access, the same code replays the responses
+"""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+from http.client import responses
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# response headers kept in cassettes; the others (dates, cookies, connection management, ...) are dropped
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Location", "Content-Disposition")
+
+
+class RequestNotRecorded(Exception):
+    """Raised when a request to be replayed is not found in the cassette."""
+
+
+def request_key(method, url, body=None, conditional=False):
+    """
+    Return the key identifying a request in a cassette: the method, the URL with its query parameters
+    sorted, a digest of `body` (if given), and whether the request is conditional
+    (i.e. has If-None-Match or If-Modified-Since headers).
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest() if isinstance(body, bytes) and body else "-"
+    url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+    return " ".join((method.upper(), url, digest, "c" if conditional else "-"))
+
+
+class Cassette(object):
+    """
+    A file of recorded HTTP exchanges, shared by all the clients (and threads) using it.
+
+    Parameters
+    ----------
+    path : string
+        Path of the cassette file; compressed with gzip if it ends with ".gz".
+    mode : "auto", "record" or "replay", optional
+        With "record", requests are sent to the server and the exchanges are appended to the file.
+        With "replay", requests are answered from the file, and those not found raise
+        :class:`RequestNotRecorded`. With "auto" (the default), the mode is "replay" if the file
+        exists, otherwise "record".
+    match_body : boolean, optional
+        If True, the body of a request is part of its key, so that requests with different bodies
+        are answered with different responses. By default, requests with a body (e.g. registering
+        results, which contain a timestamp) are identified by their method and URL only.
+    """
+
+    def __init__(self, path, mode="auto", match_body=False):
+        if mode not in ("auto", "record", "replay"):
+            raise ValueError("mode must be 'auto', 'record' or 'replay'")
+        self.path = str(path)
+        if mode == "auto":
+            mode = "replay" if os.path.exists(self.path) else "record"
+        self.mode = mode
+        self.match_body = match_body
+        self.recorded = 0
+        self.replayed = 0
+        self._index = {}  # key: list of responses, as unparsed lines
+        self._positions = {}  # key: number of times the responses for the key have been replayed
+        self._file = None
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    def _open(self, mode):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "b")
+        return open(self.path, mode + "b")
+
+    def _load(self):
+        index = {}
+        with self._open("r") as cassette_file:
+            for line in cassette_file:
+                key, _, entry = line.rstrip(b"\n").partition(b"\t")
+                if entry:
+                    index.setdefault(key.decode("utf-8"), []).append(entry)
+        self._index = index
+
+    def _key(self, request, conditional):
+        return request_key(request.method, request.url, request.body if self.match_body else None, conditional)
+
+    def _find_key(self, request):
+        # a conditional request may be answered with the response to the unconditional one,
+        # but not the reverse, as a "304 Not Modified" response is only valid for the former
+        if "If-None-Match" in request.headers or "If-Modified-Since" in request.headers:
+            key = self._key(request, True)
+            if key in self._index:
+                return key
+        key = self._key(request, False)
+        return key if key in self._index else None
+
+    def record(self, request, status_code, headers, content):
+        """Append the response to a request (a :class:`requests.PreparedRequest`) to the cassette."""
+        conditional = "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        recorded_headers = {name: headers[name] for name in RECORDED_HEADERS if name in headers}
+        meta = {"status": status_code, "headers": recorded_headers}
+        if b"\n" in content:
+            meta["base64"] = True
+            content = base64.b64encode(content)
+        key = self._key(request, conditional).encode("utf-8")
+        line = b"\t".join((key, json.dumps(meta).encode("utf-8"), content)) + b"\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open("a")
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def play(self, request):
+        """
+        Return the status, headers and body of the recorded response to a request
+        (a :class:`requests.PreparedRequest`), or raise :class:`RequestNotRecorded`.
+        """
+        with self._lock:
+            key = self._find_key(request)
+            if key is None:
+                raise RequestNotRecorded(f"No response to {request.method} {request.url} in cassette {self.path}")
+            entries = self._index[key]
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self.replayed += 1
+        meta, _, content = entries[min(position, len(entries) - 1)].partition(b"\t")
+        meta = json.loads(meta)
+        if meta.get("base64"):
+            content = base64.b64decode(content)
+        return meta["status"], meta["headers"], content
+
+    def rewind(self):
+        """Replay the responses to each request from the first one again."""
+        with self._lock:
+            self._positions.clear()
+
+    def close(self):
+        """Close the cassette file, after recording."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    A :mod:`requests` transport adapter which records the exchanges made through `adapter`
+    in `cassette`, or replays them from it, depending on the mode of the cassette.
+    """
+
+    def __init__(self, cassette, adapter=None):
+        super(CassetteAdapter, self).__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, stream=False, **kwargs):
+        if self.cassette.mode == "replay":
+            return self._replayed_response(request, *self.cassette.play(request))
+        response = self.adapter.send(request, stream=stream, **kwargs)
+        if response.status_code not in (429, 503):
+            # the body is read now, so streamed responses are held in memory while recording
+            self.cassette.record(request, response.status_code, response.headers, response.content)
+        return response
+
+    def _replayed_response(self, request, status_code, headers, content):
+        from urllib3 import HTTPResponse
+
+        headers = dict(headers, **{"Content-Length": str(len(content))})
+        response = Response()
+        response.status_code = status_code
+        response.reason = responses.get(status_code, "")
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = HTTPResponse(
+            body=io.BytesIO(content), headers=headers, status=status_code, preload_content=False, decode_content=False
+        )
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        if self.adapter is not None:
+            self.adapter.close()
+
+
+def mount_cassette(session, cassette):
+    """Send all the requests made with a :class:`requests.Session` through `cassette`."""
+    for prefix in ("https://", "http://"):
+        adapter = session.get_adapter(prefix)
+        if isinstance(adapter, CassetteAdapter):
+            adapter = adapter.adapter
+        session.mount(prefix, CassetteAdapter(cassette, adapter))
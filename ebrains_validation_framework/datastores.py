@@ -25,8 +25,6 @@ from urllib.request import urlretrieve
 
 import requests
 
-import ebrains_drive
-
 mimetypes.init()
 
 
@@ -75,6 +73,8 @@ class CollabDriveDataStore(_CollabDataStore):
     def authorize(self, auth=None):
         if auth is None:
             auth = self._auth
+        import ebrains_drive
+
         self.client = ebrains_drive.DriveApiClient(token=auth.token)
         self._authorized = True
         self.repo = self.client.repos.get_repo_by_url(self.collab_id)
@@ -175,6 +175,8 @@ class CollabBucketDataStore(_CollabDataStore):
     def authorize(self, auth=None):
         if auth is None:
             auth = self._auth
+        import ebrains_drive
+
         self.client = ebrains_drive.BucketApiClient(token=auth.token)
         self._authorized = True
         self.bucket = self.client.buckets.get_bucket(self.collab_id)
@@ -214,10 +216,13 @@ class CollabBucketDataStore(_CollabDataStore):
 class HTTPDataStore(object):
     """
     A class for downloading data from the web.
+
+    JSON data are retrieved with `session` (a :class:`requests.Session`) if given,
+    e.g. that of a client, so that they are recorded in, or replayed from, its cassette.
     """
 
-    def __init__(self, **kwargs):
-        pass
+    def __init__(self, session=None, **kwargs):
+        self.session = session
 
     def upload_data(self, file_paths):
         raise NotImplementedError("The HTTPDataStore does not support uploading data.")
@@ -265,7 +270,7 @@ class HTTPDataStore(object):
     def load_data(self, remote_path):
         content_type, encoding = mimetypes.guess_type(remote_path)
         if content_type == "application/json":
-            return requests.get(remote_path).json()
+            return (self.session or requests).get(remote_path).json()
         else:
             local_paths = self.download_data([remote_path], overwrite=True)
             return local_paths[0]
@@ -0,0 +1,152 @@
+"""
+An in-memory HTTP cache for responses from the validation service.
+
+Used for requests which are repeated often, such as retrieving test definitions
+and model instances. Responses with an ETag or Last-Modified header are revalidated
+with the server on each use, using a conditional request; a "304 Not Modified" reply
+is answered from the cached copy. Responses without such validators are reused without
+contacting the server until their time-to-live expires.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachedResponse(object):
+    """The headers and body of a cached response, with its validators."""
+
+    __slots__ = ("headers", "content", "etag", "last_modified", "fresh_until")
+
+    def __init__(self, headers, content, fresh_until):
+        self.headers = dict(headers)
+        self.content = content
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.fresh_until = fresh_until
+
+
+def _max_age(cache_control):
+    # Return the max-age directive from a Cache-Control header, or None
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() == "max-age":
+            try:
+                return int(value.strip('"'))
+            except ValueError:
+                return 0
+    return None
+
+
+class HTTPCache(object):
+    """
+    A thread-safe, size-limited cache of HTTP responses, keyed by URL.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        Number of seconds for which a response without validators (ETag or Last-Modified headers)
+        is used without contacting the server; default 300.
+    maxsize : int, optional
+        Maximum number of responses kept; the least recently used are discarded first. Default 1000.
+
+    Attributes
+    ----------
+    hits : int
+        Number of responses served from the cache without contacting the server.
+    misses : int
+        Number of responses fetched from the server.
+    revalidations : int
+        Number of cached responses confirmed as unchanged by the server ("304 Not Modified").
+    """
+
+    def __init__(self, ttl=300, maxsize=1000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """A dict with the numbers of hits, misses and revalidations."""
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations}
+
+    def get_fresh(self, url):
+        """Return the cached response for `url` if it can be used without revalidation, otherwise None."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry.fresh_until <= time.time():
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return entry
+
+    def validators(self, url):
+        """Return the headers needed to make a conditional request for `url`."""
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def update(self, url, status_code, headers, content):
+        """
+        Update the cache with a response received from the server.
+
+        Returns the cached response if the server replied "304 Not Modified", otherwise None,
+        in which case the response received should be used.
+        """
+        with self._lock:
+            if status_code == 304:
+                entry = self._entries.get(url)
+                if entry is not None:
+                    entry.fresh_until = self._fresh_until(headers, entry.etag or entry.last_modified)
+                    self._entries.move_to_end(url)
+                    self.revalidations += 1
+                return entry
+            self.misses += 1
+            cache_control = headers.get("Cache-Control", "")
+            if status_code != 200 or "no-store" in cache_control:
+                self._entries.pop(url, None)
+                return None
+            validated = headers.get("ETag") or headers.get("Last-Modified")
+            self._entries[url] = CachedResponse(headers, content, self._fresh_until(headers, validated))
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return None
+
+    def _fresh_until(self, headers, validated):
+        # responses with validators are revalidated on each use, unless the server says otherwise
+        now = time.time()
+        cache_control = headers.get("Cache-Control", "")
+        max_age = _max_age(cache_control)
+        if "no-cache" in cache_control:
+            return now
+        elif max_age is not None:
+            return now + max_age
+        elif validated:
+            return now
+        else:
+            return now + self.ttl
+
+    def invalidate(self, prefix):
+        """Discard all cached responses whose URL starts with `prefix`."""
+        with self._lock:
+            for url in [url for url in self._entries if url.startswith(prefix)]:
+                del self._entries[url]
+
+    def clear(self):
+        """Discard all cached responses."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,271 @@
+"""
+Instrumentation of the requests made by the clients.
+
+Functions registered with :meth:`BaseClient.add_request_hook` are called with a
+:class:`RequestEvent` for each HTTP request sent to the validation service, and for each
+request answered from the HTTP cache or the metadata store without contacting the server.
+:class:`RequestStats` is such a function, which aggregates the events for each endpoint.
+
+Example
+-------
+
+>>> stats = RequestStats()
+>>> model_catalog.add_request_hook(stats)
+>>> models = model_catalog.get_models(model_ids)
+>>> print(stats.report())
+"""
+
+import bisect
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+
+RequestEvent = namedtuple(
+    "RequestEvent",
+    [
+        "method",
+        "url",
+        "endpoint",
+        "status_code",
+        "bytes_sent",
+        "bytes_received",
+        "latency",
+        "retries",
+        "cache",
+    ],
+)
+RequestEvent.__doc__ = """
+A request to the validation service.
+
+`endpoint` is the path of the URL with identifiers and aliases replaced by "{id}", e.g. "/models/{id}".
+`status_code` is None if no response was received, e.g. because of a connection error.
+`latency` is the time in seconds until the response headers were received (including any retries),
+`retries` the number of times the request was repeated after being throttled by the server.
+`cache` is None for requests which cannot be cached, otherwise "miss" (received from the server),
+"revalidated" (confirmed as unchanged by the server), "hit" (taken from the HTTP cache)
+or "store" (taken from the metadata store); `bytes_received` is 0 unless the server sent a body.
+"""
+
+# path segments which are part of the API, rather than identifiers or aliases
+_ENDPOINT_WORDS = frozenset(["models", "tests", "results", "vocab", "query", "instances", "latest", "images"])
+
+# upper bounds (in seconds) of the latency histogram bins
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def endpoint_template(url, base_url=None):
+    """
+    Return the path of a URL with identifiers and aliases replaced by "{id}", e.g. "/models/{id}/instances/".
+    The query string is dropped; if `base_url` is given, only the part of the path after it is kept.
+    """
+    if base_url and url.startswith(base_url):
+        url = url[len(base_url) :]
+    segments = urlsplit(url).path.split("/")
+    return "/".join(segment if segment in _ENDPOINT_WORDS or not segment else "{id}" for segment in segments) or "/"
+
+
+class _EndpointStats(object):
+    __slots__ = (
+        "calls",
+        "statuses",
+        "cache",
+        "bytes_sent",
+        "bytes_received",
+        "retries",
+        "total_time",
+        "max_time",
+        "histogram",
+    )
+
+    def __init__(self, n_buckets):
+        self.calls = 0
+        self.statuses = {}
+        self.cache = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (n_buckets + 1)  # the last bin counts latencies above the largest bound
+
+
+class RequestStats(object):
+    """
+    Aggregates request events for each endpoint (HTTP method and templated path):
+    numbers of calls, of each status code and cache outcome, of bytes and of retries,
+    and a histogram of latencies.
+
+    Register an instance with :meth:`BaseClient.add_request_hook`. It can be shared by several
+    clients and threads.
+
+    Parameters
+    ----------
+    buckets : sequence of float, optional
+        Upper bounds, in seconds, of the bins of the latency histograms; default `DEFAULT_BUCKETS`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        key = f"{event.method} {event.endpoint}"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats(len(self.buckets))
+            stats.calls += 1
+            stats.statuses[event.status_code] = stats.statuses.get(event.status_code, 0) + 1
+            stats.cache[event.cache] = stats.cache.get(event.cache, 0) + 1
+            stats.bytes_sent += event.bytes_sent
+            stats.bytes_received += event.bytes_received
+            stats.retries += event.retries
+            stats.total_time += event.latency
+            stats.max_time = max(stats.max_time, event.latency)
+            stats.histogram[bisect.bisect_left(self.buckets, event.latency)] += 1
+
+    def reset(self):
+        """Discard all the statistics collected so far."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def _percentile(self, histogram, calls, fraction):
+        # upper bound of the bin containing the given fraction of calls (max latency for the last bin)
+        rank = fraction * calls
+        count = 0
+        for upper, n in zip(self.buckets, histogram):
+            count += n
+            if count >= rank:
+                return upper
+        return None
+
+    def summary(self):
+        """
+        Return the statistics for each endpoint.
+
+        Returns
+        -------
+        dict
+            For each endpoint, e.g. "GET /models/{id}", a dict with the numbers of "calls", of each
+            status code ("statuses") and cache outcome ("cache"), the totals of "bytes_sent",
+            "bytes_received", "retries" and "total_time", the "mean_time" and "max_time",
+            the approximate "p50" and "p95" latencies (upper bounds of histogram bins, or None if
+            above the largest bin), and the "histogram", a list of (upper bound, count) pairs.
+        """
+        with self._lock:
+            summary = {}
+            for key, stats in sorted(self._endpoints.items(), key=lambda item: -item[1].total_time):
+                summary[key] = {
+                    "calls": stats.calls,
+                    "statuses": dict(stats.statuses),
+                    "cache": dict(stats.cache),
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "retries": stats.retries,
+                    "total_time": stats.total_time,
+                    "mean_time": stats.total_time / stats.calls,
+                    "max_time": stats.max_time,
+                    "p50": self._percentile(stats.histogram, stats.calls, 0.5),
+                    "p95": self._percentile(stats.histogram, stats.calls, 0.95),
+                    "histogram": list(zip(self.buckets + (float("inf"),), stats.histogram)),
+                }
+            return summary
+
+    def report(self):
+        """Return the statistics as a table, with the endpoints taking the most time first."""
+        lines = [
+            "{:<45} {:>7} {:>9} {:>9} {:>9} {:>9} {:>11} {:>7}".format(
+                "endpoint", "calls", "total s", "mean s", "p95 s", "max s", "received", "cached"
+            )
+        ]
+        for key, stats in self.summary().items():
+            cached = stats["cache"].get("hit", 0) + stats["cache"].get("store", 0)
+            p95 = ">{:g}".format(self.buckets[-1]) if stats["p95"] is None else "{:g}".format(stats["p95"])
+            lines.append(
+                "{:<45} {:>7} {:>9.3f} {:>9.3f} {:>9} {:>9.3f} {:>11} {:>7}".format(
+                    key,
+                    stats["calls"],
+                    stats["total_time"],
+                    stats["mean_time"],
+                    p95,
+                    stats["max_time"],
+                    stats["bytes_received"],
+                    cached,
+                )
+            )
+        return "\n".join(lines)
+
+
+class CallBudgetExceeded(Exception):
+    """Raised when more requests are sent than allowed by :meth:`BaseClient.call_budget`."""
+
+
+class CallBudget(object):
+    """
+    Counts the requests sent to the validation service, for each endpoint, and enforces a maximum.
+    Requests answered from the HTTP cache or the metadata store are not counted.
+
+    Usually created with :meth:`BaseClient.call_budget`. The clients call :meth:`count` before sending
+    each request, so that a request beyond the budget is not sent.
+
+    Parameters
+    ----------
+    max_calls : int
+        Maximum number of requests.
+    on_exceed : "raise" or "report", optional
+        With "raise" (the default), each request beyond the budget raises :class:`CallBudgetExceeded`,
+        with the number of requests to each endpoint so far. With "report", requests continue, and
+        :meth:`check` prints the numbers of requests to each endpoint.
+    """
+
+    def __init__(self, max_calls, on_exceed="raise"):
+        if on_exceed not in ("raise", "report"):
+            raise ValueError("on_exceed must be 'raise' or 'report'")
+        self.max_calls = max_calls
+        self.on_exceed = on_exceed
+        self.calls = 0
+        self.by_endpoint = {}
+        self._lock = threading.Lock()
+
+    def count(self, method, endpoint):
+        """
+        Count a request about to be sent to `endpoint` (e.g. "/results/{id}"), raising
+        :class:`CallBudgetExceeded` instead if it is beyond the budget and `on_exceed` is "raise".
+        """
+        key = f"{method} {endpoint}"
+        with self._lock:
+            self.calls += 1
+            self.by_endpoint[key] = self.by_endpoint.get(key, 0) + 1
+            exceeded = self.calls > self.max_calls
+        if exceeded and self.on_exceed == "raise":
+            raise CallBudgetExceeded(self.report())
+
+    def __call__(self, event):
+        # requests are counted by count() before being sent, not when reported to the request hooks,
+        # so that an exception is never raised once a request has been sent
+        pass
+
+    @property
+    def exceeded(self):
+        """True if more requests have been sent than allowed."""
+        return self.calls > self.max_calls
+
+    def report(self):
+        """Return the numbers of requests to each endpoint, the most frequent first."""
+        lines = [f"{self.calls} requests made, with a budget of {self.max_calls}:"]
+        for key, count in sorted(self.by_endpoint.items(), key=lambda item: -item[1]):
+            lines.append(f"  {count:>6}  {key}")
+        return "\n".join(lines)
+
+    def check(self):
+        """
+        If the budget has been exceeded, raise :class:`CallBudgetExceeded` (with `on_exceed="raise"`,
+        in case the exception raised by the request was caught), or print the numbers of requests
+        to each endpoint (with `on_exceed="report"`).
+        """
+        if self.exceeded:
+            if self.on_exceed == "raise":
+                raise CallBudgetExceeded(self.report())
+            print("API call budget exceeded. " + self.report())
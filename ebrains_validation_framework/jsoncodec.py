@@ -0,0 +1,108 @@
+"""
+Encoding and decoding of the JSON data exchanged with the validation service.
+
+Listings returned by the service can be tens of megabytes, so `orjson` or `ujson`
+are used when installed, as they are several times faster than the standard
+library :mod:`json` module. Dates and times are serialized in ISO 8601 format
+by all codecs, as are NumPy scalars and arrays (e.g. in SciUnit scores).
+"""
+
+import json
+from datetime import date
+
+
+def _default(obj):
+    # serialization of types not supported natively by the JSON libraries
+    if isinstance(obj, date):  # includes datetime
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # NumPy scalars and arrays
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONCodec(object):
+    """Codec using the :mod:`json` module from the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj):
+        """Serialize `obj` to UTF-8 encoded JSON (bytes)."""
+        return json.dumps(obj, default=_default).encode("utf-8")
+
+    def loads(self, data):
+        """Deserialize JSON data (bytes or str)."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using the `orjson` package."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, default=_default, option=self._options)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec using the `ujson` package."""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, default=_default).encode("utf-8")
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+
+# in order of preference
+CODECS = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+
+
+def get_codec(codec=None):
+    """
+    Return a JSON codec.
+
+    Parameters
+    ----------
+    codec : string or JSONCodec, optional
+        Name of the codec ("orjson", "ujson" or "json"), or a codec object, which is returned unchanged.
+        By default, the fastest of the installed libraries is used.
+
+    Returns
+    -------
+    JSONCodec
+        An object with methods `dumps(obj)`, returning bytes, and `loads(data)`.
+    """
+    if codec is None:
+        for codec_class in CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+    elif isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown JSON codec '{codec}'. Valid codecs: {list(CODECS)}")
+        try:
+            return CODECS[codec]()
+        except ImportError:
+            raise ImportError(f"Please install the following package: {codec}")
+    return codec
@@ -0,0 +1,151 @@
+"""
+Incremental parsing of JSON arrays, for listings too large to be held in memory.
+
+The listings returned by the validation service are JSON arrays of records.
+:class:`JSONArrayParser` parses such an array from successive chunks of the response body,
+as they are received, and returns the records one by one, so that memory use is proportional
+to the size of a record rather than to the size of the response.
+
+The standard library JSON decoder (written in C) is used to decode each record,
+so no additional packages are needed.
+"""
+
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_NUMBER = "0123456789+-.eE"
+
+
+def _skip_whitespace(text, position):
+    while position < len(text) and text[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+class JSONArrayParser(object):
+    """
+    Incremental parser for a JSON array.
+
+    Data are passed to :meth:`feed` as they are received, which returns the elements of the array
+    completed by each chunk; :meth:`close` is called at the end of the data. If the document is not
+    an array, but e.g. a single object, it is returned as the only element by :meth:`close`.
+
+    Parameters
+    ----------
+    encoding : string, optional
+        Encoding of the data, if given as bytes; default "utf-8".
+
+    Examples
+    --------
+    >>> parser = JSONArrayParser()
+    >>> parser.feed(b'[{"id": 1}, {"i')
+    [{'id': 1}]
+    >>> parser.feed(b'd": 2}]')
+    [{'id': 2}]
+    >>> parser.close()
+    []
+    """
+
+    def __init__(self, encoding="utf-8"):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._position = 0
+        self._started = False  # the opening bracket has been read
+        self._first = False  # no element has been read yet
+        self._finished = False  # the closing bracket has been read
+        self._array = True
+
+    def feed(self, chunk):
+        """Add a chunk of data (bytes or str), and return the list of elements completed by it."""
+        if isinstance(chunk, bytes):
+            chunk = self._text_decoder.decode(chunk)
+        # discard what has already been parsed before adding the new data
+        buffer = self._buffer = self._buffer[self._position :] + chunk
+        position = 0
+        elements = []
+        while self._array:
+            position = _skip_whitespace(buffer, position)
+            if position == len(buffer):
+                break
+            if self._finished:
+                raise ValueError(f"Extra data after the end of the JSON array: {buffer[position:position + 20]!r}")
+            if not self._started:
+                if buffer[position] != "[":
+                    # not an array: the whole document is decoded at the end
+                    self._array = False
+                    break
+                self._started = self._first = True
+                position += 1
+                continue
+            if self._first and buffer[position] == "]":  # empty array
+                self._finished = True
+                position += 1
+                continue
+            try:
+                element, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # incomplete element, wait for more data
+            # the element is only complete if followed by a delimiter, as numbers may be truncated
+            # (e.g. "26169." followed by "75" in the next chunk)
+            if isinstance(element, (int, float)) and not isinstance(element, bool):
+                while end < len(buffer) and buffer[end] in _NUMBER:
+                    end += 1
+                if end == len(buffer):
+                    break
+            delimiter = _skip_whitespace(buffer, end)
+            if delimiter == len(buffer):
+                break
+            if buffer[delimiter] == "]":
+                self._finished = True
+            elif buffer[delimiter] != ",":
+                raise ValueError(f"Expecting ',' or ']' in JSON array at: {buffer[delimiter:delimiter + 20]!r}")
+            position = delimiter + 1
+            self._first = False
+            elements.append(element)
+        self._position = position
+        return elements
+
+    def close(self):
+        """Signal the end of the data. Returns the remaining elements, and checks that the array was complete."""
+        buffer = self._buffer[self._position :] + self._text_decoder.decode(b"", final=True)
+        self._buffer, self._position = "", 0
+        if not self._array:
+            return [self._decoder.decode(buffer)]
+        if buffer.strip():
+            # report the error found by the decoder in the remaining, incomplete, data
+            self._decoder.raw_decode(buffer, _skip_whitespace(buffer, 0))
+            raise ValueError(f"Incomplete JSON array: {buffer[:20]!r}")
+        if not self._finished:
+            raise ValueError("Incomplete JSON array" if self._started else "Empty JSON document")
+        return []
+
+
+def iter_json_array(chunks, encoding="utf-8"):
+    """
+    Generate the elements of a JSON array, parsed incrementally from chunks of data.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Successive chunks (bytes or str) of the JSON document, e.g. from
+        :meth:`requests.Response.iter_content`.
+    encoding : string, optional
+        Encoding of the chunks, if they are bytes; default "utf-8".
+
+    Yields
+    ------
+    object
+        The decoded elements of the array. If the document is not an array,
+        e.g. a single JSON object, the document itself is generated.
+
+    Raises
+    ------
+    ValueError
+        If the document is not valid JSON.
+    """
+    parser = JSONArrayParser(encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
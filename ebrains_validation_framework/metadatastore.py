@@ -0,0 +1,220 @@
+"""
+A persistent store of catalog entities (models, tests, their instances, results and
+vocabularies), kept in an SQLite database on the local disk.
+
+Unlike the in-memory HTTP cache, the store is shared by all clients which use the same
+database file, across processes and between runs. The database uses write-ahead logging,
+so many processes can read it while another one writes to it.
+
+Entries expire after a time-to-live that depends on the type of entity, and the least
+recently used entries are discarded when the number of entries exceeds a limit.
+Each entry is tagged with the identifiers and aliases of the entities it contains,
+so that entries affected by a change to an entity can be discarded.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ebrains_validation_framework", "metadata.db"
+)
+
+# time-to-live in seconds, for each kind of entity
+DEFAULT_TTL = {
+    "model": 3600,
+    "model_instance": 3600,
+    "test": 3600,
+    "test_instance": 3600,
+    "result": 86400,  # results cannot be modified, only deleted
+    "vocab": 86400,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    content BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, kind, key)
+);
+CREATE INDEX IF NOT EXISTS tags_entry ON tags (kind, key);
+CREATE TRIGGER IF NOT EXISTS entries_delete_tags AFTER DELETE ON entries BEGIN
+    DELETE FROM tags WHERE kind = old.kind AND key = old.key;
+END;
+"""
+
+
+def entity_tags(data):
+    """
+    Return the identifiers and aliases of the entities contained in JSON data from the validation service,
+    i.e. of a record or of each record in a list, of its parent model or test, and of its instances.
+    """
+    records = data if isinstance(data, list) else [data]
+    tags = set()
+    for record in records:
+        if isinstance(record, dict):
+            for field in ("id", "alias", "model_id", "test_id"):
+                if record.get(field):
+                    tags.add(str(record[field]))
+            for instance in record.get("instances") or ():
+                if isinstance(instance, dict) and instance.get("id"):
+                    tags.add(str(instance["id"]))
+    return tags
+
+
+class MetadataStore(object):
+    """
+    An SQLite-backed store of the JSON representations of catalog entities.
+
+    Parameters
+    ----------
+    path : string, optional
+        Path of the database file; by default "ebrains_validation_framework/metadata.db"
+        in the user's cache directory. To share the store between all users of a compute node,
+        use a path on a local file system which all of them can write to.
+        Network file systems should be avoided, as SQLite locking is often unreliable on them.
+    ttl : dict, optional
+        Time-to-live in seconds for each kind of entity ("model", "model_instance", "test",
+        "test_instance", "result", "vocab"), overriding the values in `DEFAULT_TTL`.
+    maxsize : int, optional
+        Maximum number of entries; the least recently used are discarded first. Default 100000.
+
+    Attributes
+    ----------
+    hits : int
+        Number of entities found in the store by this object.
+    misses : int
+        Number of entities not found in the store, or found to have expired.
+    """
+
+    # how many entries are added between checks of the size limit
+    eviction_interval = 100
+    # the time of last access of an entry is only updated if older than this (in seconds),
+    # so that most lookups do not need to write to the database
+    access_resolution = 60
+
+    def __init__(self, path=DEFAULT_PATH, ttl=None, maxsize=100000):
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._connection = None
+        self._pid = None
+        self._lock = threading.RLock()
+
+    @property
+    def stats(self):
+        """A dict with the numbers of hits and misses."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _connect(self):
+        # connections cannot be used in a child process, so a new one is opened after a fork
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        """Close the connection to the database."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, kind, key):
+        """Return the stored content for the given kind of entity and key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT content, expires_at, accessed_at FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            if now - row[2] >= self.access_resolution:
+                connection.execute("UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?", (now, kind, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, kind, key, content, tags=()):
+        """
+        Store content (bytes) for the given kind of entity and key.
+
+        `tags` are the identifiers and aliases of the entities concerned, used by :meth:`invalidate`.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:  # transaction
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                connection.execute(
+                    "INSERT INTO entries (kind, key, content, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, content, now + self.ttl.get(kind, 0), now),
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tags (tag, kind, key) VALUES (?, ?, ?)",
+                    [(str(tag), kind, key) for tag in tags if tag],
+                )
+            self._puts += 1
+            if self._puts % self.eviction_interval == 0:
+                self.evict()
+
+    def evict(self):
+        """Discard expired entries, then the least recently used entries in excess of `maxsize`."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+                excess = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.maxsize
+                if excess > 0:
+                    connection.execute(
+                        "DELETE FROM entries WHERE rowid IN "
+                        "(SELECT rowid FROM entries ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    )
+
+    def invalidate(self, *tags):
+        """Discard all entries concerning the entities with the given identifiers or aliases."""
+        tags = [str(tag) for tag in tags if tag]
+        if not tags:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "DELETE FROM entries WHERE (kind, key) IN "
+                    f"(SELECT kind, key FROM tags WHERE tag IN ({', '.join('?' * len(tags))}))",
+                    tags,
+                )
+
+    def clear(self):
+        """Discard all entries."""
+        with self._lock:
+            self._connect().execute("DELETE FROM entries")
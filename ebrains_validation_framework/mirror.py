@@ -0,0 +1,607 @@
+"""
+A local mirror of the model catalog, the test library and the test results, kept in an SQLite database.
+
+The catalog changes slowly, so rather than sending each filter query to the server,
+all models (with their instances), tests and results can be downloaded with
+:meth:`BaseClient.sync_mirror`, after which :meth:`ModelCatalog.list_models`, :meth:`TestLibrary.list_tests`
+and :meth:`TestLibrary.list_results` are answered from the mirror, without any request.
+
+Synchronisation is incremental. Each collection is retrieved page by page, and the progress of the
+synchronisation (the index of the next page, and the numbers of records and bytes transferred so far) is
+saved with the records of each page, in the same transaction, so that a synchronisation which is interrupted
+resumes where it stopped. Only the records which are new, or whose content has changed, are written.
+Results cannot be changed once registered, so, for them, the time of the most recent result is kept
+as a high-water mark, and later synchronisations stop at the first page reaching it, provided the server
+lists results newest first. The other collections, and results listed in any other order, are retrieved
+completely, and the records deleted on the server are found by comparing the set of IDs retrieved with
+the set of IDs in the mirror.
+
+The values of the fields which can be used as filters are kept in a secondary index. The records
+with each value used in a query are loaded from it into memory as a bitmap, so that filters can be
+combined with bitwise operations, and filter queries take well under a millisecond for catalogs of
+tens of thousands of entries (plus the time taken to decode the records returned). As on the server,
+a filter given a list of values matches any of them, and records must match all the filters given.
+Values are compared ignoring case; people (authors and owners) match either their family name or
+their full name.
+
+The names, aliases, descriptions and other metadata of the models and tests are also indexed
+for full-text search, with the FTS5 extension of SQLite, which is kept up to date in the same transactions
+as the records. Searches (:meth:`ModelCatalog.search_models`, :meth:`TestLibrary.search_tests`) return
+the records ranked by relevance (BM25), with a match in the name or alias counting for more than one in
+the description, and take a few milliseconds.
+
+Example
+-------
+
+>>> model_catalog = ModelCatalog(username="alice", mirror=True)
+>>> report = model_catalog.sync_mirror()
+>>> report["results"]
+{'mode': 'incremental', 'resumed': False, 'requests': 1, 'records': 1000, 'bytes': 612345, 'added': 12, ...}
+>>> models = model_catalog.list_models(species="Mus musculus", brain_region=["hippocampus", "striatum"])
+>>> models = model_catalog.search_models("place cells", species="Mus musculus")
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .jsoncodec import get_codec
+
+
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ebrains_validation_framework", "mirror.db"
+)
+
+# incremented when the layout of the database changes; the mirror is then emptied
+_SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sort_key TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS records_seq ON records (kind, seq);
+CREATE INDEX IF NOT EXISTS records_order ON records (kind, sort_key DESC, seq);
+CREATE TABLE IF NOT EXISTS field_values (
+    kind TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (kind, field, value, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS field_values_seq ON field_values (kind, seq);
+CREATE TABLE IF NOT EXISTS collections (
+    kind TEXT PRIMARY KEY,
+    synced_at REAL,
+    high_water TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    cursor INTEGER NOT NULL,
+    high_water TEXT,
+    stats TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+"""
+
+# fields by which the records of each kind are listed, most recent first, as on the server; records of
+# other kinds, and records with the same value of the field, are listed in the order of their sequence numbers,
+# i.e. the order in which they were first synchronised
+_ORDER_FIELDS = {"result": "timestamp"}
+
+# full-text indexes of the kinds of records which can be searched, by sequence number (the rowid);
+# created separately, as the FTS5 extension may not be available
+_TEXT_KINDS = ("model", "test")
+
+_TEXT_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS {kind}_text USING fts5(
+    name, alias, description, metadata, tokenize = "unicode61 remove_diacritics 2", prefix = "2 3"
+)
+"""
+
+# fields whose values are indexed, with the name, alias and description, for full-text search
+_METADATA_FIELDS = (
+    "author",
+    "owner",
+    "organization",
+    "brain_region",
+    "species",
+    "cell_type",
+    "model_scope",
+    "abstraction_level",
+    "test_type",
+    "data_type",
+    "recording_modality",
+    "score_type",
+)
+
+# weights of matches in the name, alias, description and metadata when ranking search results
+_TEXT_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+_TABLES = ("records", "field_values", "collections", "sync_state", "seen") + tuple(
+    f"{kind}_text" for kind in _TEXT_KINDS
+)
+
+# maximum number of records retrieved from the database with one query
+_BATCH_SIZE = 500
+
+
+def _normalize(value):
+    # the form in which field values are indexed and compared
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().casefold()
+
+
+def field_values(record, field):
+    """
+    Return the set of normalized values of a field of a model or test, used to match filters:
+    for people, their family names and full names; for "format", the code formats of the model instances.
+    """
+    if field == "format":
+        values = [instance.get("code_format") for instance in record.get("instances") or () if instance]
+    else:
+        values = record.get(field)
+        if not isinstance(values, list):
+            values = [values]
+    normalized = set()
+    for value in values:
+        if isinstance(value, dict):  # a person
+            given_name, family_name = value.get("given_name"), value.get("family_name")
+            if family_name:
+                normalized.add(_normalize(family_name))
+                if given_name:
+                    normalized.add(_normalize(f"{given_name} {family_name}"))
+        elif value is not None and value != "":
+            normalized.add(_normalize(value))
+    return normalized
+
+
+def search_text(record):
+    """Return the text of a model or test indexed for full-text search: its name, alias, description and metadata."""
+    metadata = []
+    for field in _METADATA_FIELDS:
+        values = record.get(field)
+        for value in values if isinstance(values, list) else [values]:
+            if isinstance(value, dict):  # a person
+                value = " ".join(filter(None, (value.get("given_name"), value.get("family_name"))))
+            if value:
+                metadata.append(str(value))
+    return (record.get("name") or "", record.get("alias") or "", record.get("description") or "", "\n".join(metadata))
+
+
+def _sort_key(kind, record):
+    # the value by which records are listed, most recent first (see _ORDER_FIELDS)
+    field = _ORDER_FIELDS.get(kind)
+    return str(record.get(field) or "") if field else ""
+
+
+def text_query(text):
+    """
+    Return the FTS5 query for the words in `text`, all of which must match. Words ending with "*"
+    match any word starting with them; other characters with a meaning in FTS5 queries are ignored.
+    """
+    words = re.findall(r"(\w+)(\*?)", text)
+    return " ".join(f'"{word}"{star}' for word, star in words)
+
+
+class CatalogMirror(object):
+    """
+    An SQLite-backed mirror of the models, tests and results, indexed by the values of their filter fields.
+
+    Parameters
+    ----------
+    path : string, optional
+        Path of the database file; by default "ebrains_validation_framework/mirror.db"
+        in the user's cache directory. The listings depend on the permissions of the user
+        who synchronised the mirror, so it should not be shared between users.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._codec = get_codec()
+        self._bitmaps = {}  # kind: (version of the records, {(field, value): bitmap of sequence numbers})
+        self._connection = None
+        self._pid = None
+        self._full_text = False
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        # connections cannot be used in a child process, so a new one is opened after a fork
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:  # transaction
+                connection.execute("BEGIN IMMEDIATE")
+                if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                    # the mirror is only a copy, so one with an older layout is emptied rather than migrated
+                    for table in _TABLES:
+                        connection.execute(f"DROP TABLE IF EXISTS {table}")
+                    for statement in _SCHEMA.split(";"):
+                        if statement.strip():
+                            connection.execute(statement)
+                    try:
+                        for kind in _TEXT_KINDS:
+                            connection.execute(_TEXT_SCHEMA.format(kind=kind))
+                    except sqlite3.OperationalError:  # no FTS5 extension
+                        pass
+                    connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self._full_text = all(f"{kind}_text" in tables for kind in _TEXT_KINDS)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        """Close the connection to the database."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def begin_sync(self, kind, mode, stats=None):
+        """
+        Start a synchronisation of the records of the given kind ("model", "test" or "result"),
+        replacing any synchronisation in progress, and return its state (see :meth:`sync_state`).
+
+        In "full" mode, all the records are expected to be saved with :meth:`save_page`, and those
+        which are not are deleted by :meth:`finish_sync`. In "incremental" mode, only new or changed
+        records are saved, and none are deleted. The statistics of the synchronisation start from `stats`,
+        if given, e.g. when an incremental synchronisation is continued as a full one.
+        """
+        stats = dict(stats or {"requests": 0, "records": 0, "bytes": 0, "added": 0, "updated": 0, "deleted": 0})
+        with self._lock:
+            connection = self._connect()
+            with connection:  # transaction
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("DELETE FROM seen WHERE kind = ?", (kind,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO sync_state (kind, mode, started_at, cursor, high_water, stats) "
+                    "VALUES (?, ?, ?, 0, NULL, ?)",
+                    (kind, mode, time.time(), json.dumps(stats)),
+                )
+        return self.sync_state(kind)
+
+    def sync_state(self, kind):
+        """
+        Return the state of the synchronisation of the given kind in progress, or None: a dictionary of its
+        "mode", the time it "started_at", the index ("cursor") from which it continues, the most recent time
+        among the records retrieved ("high_water"), and its "stats" (the numbers of "requests", "records"
+        and "bytes" transferred, and of records "added", "updated" and "deleted" in the mirror).
+        """
+        with self._lock:
+            return self._sync_state(self._connect(), kind)
+
+    def _sync_state(self, connection, kind):
+        row = connection.execute(
+            "SELECT mode, started_at, cursor, high_water, stats FROM sync_state WHERE kind = ?", (kind,)
+        ).fetchone()
+        if row is None:
+            return None
+        mode, started_at, cursor, high_water, stats = row
+        return {
+            "mode": mode,
+            "started_at": started_at,
+            "cursor": cursor,
+            "high_water": high_water,
+            "stats": json.loads(stats),
+        }
+
+    def save_page(self, kind, records, fields, cursor, high_water=None, transferred=None):
+        """
+        Write those of `records` which are new or have changed, indexing the values of `fields`, and record
+        the progress of the synchronisation of the given kind in progress: the index `cursor` of the next page,
+        the most recent time `high_water` among the records retrieved, and `transferred`, a dictionary of the
+        numbers of "requests", "records" and "bytes" transferred, which are added to its statistics.
+        Return the statistics.
+
+        Records are written in the same transaction as the progress, so a synchronisation which is
+        interrupted can be resumed from the cursor.
+        """
+        encoded = {}
+        for record in records:
+            content = self._codec.dumps(record)
+            encoded[record["id"]] = (record, content, hashlib.sha1(content).digest())
+        with self._lock:
+            connection = self._connect()
+            with connection:  # transaction
+                connection.execute("BEGIN IMMEDIATE")
+                state = self._sync_state(connection, kind)
+                if state is None:
+                    raise Exception(f"No synchronisation of the {kind}s is in progress")
+                stats = state["stats"]
+                existing = {}
+                ids = list(encoded)
+                for start in range(0, len(ids), _BATCH_SIZE):
+                    batch = ids[start : start + _BATCH_SIZE]
+                    rows = connection.execute(
+                        "SELECT id, seq, digest FROM records WHERE kind = ? "
+                        f"AND id IN ({', '.join('?' * len(batch))})",
+                        [kind] + batch,
+                    )
+                    existing.update((id, (seq, digest)) for id, seq, digest in rows)
+                next_seq = connection.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM records WHERE kind = ?", (kind,)
+                ).fetchone()[0]
+                values = []
+                texts = []
+                text_table = f"{kind}_text" if self._full_text and kind in _TEXT_KINDS else None
+                written = stats["added"] + stats["updated"]
+                for id, (record, content, digest) in encoded.items():
+                    if id in existing:
+                        seq, previous_digest = existing[id]
+                        if digest == previous_digest:
+                            continue
+                        connection.execute(
+                            "UPDATE records SET sort_key = ?, digest = ?, content = ? WHERE kind = ? AND id = ?",
+                            (_sort_key(kind, record), digest, content, kind, id),
+                        )
+                        connection.execute("DELETE FROM field_values WHERE kind = ? AND seq = ?", (kind, seq))
+                        if text_table:
+                            connection.execute(f"DELETE FROM {text_table} WHERE rowid = ?", (seq,))
+                        stats["updated"] += 1
+                    else:
+                        seq = next_seq
+                        next_seq += 1
+                        connection.execute(
+                            "INSERT INTO records (kind, id, seq, sort_key, digest, content) VALUES (?, ?, ?, ?, ?, ?)",
+                            (kind, id, seq, _sort_key(kind, record), digest, content),
+                        )
+                        stats["added"] += 1
+                    for field in fields:
+                        values.extend((kind, field, value, seq) for value in field_values(record, field))
+                    if text_table:
+                        texts.append((seq,) + search_text(record))
+                connection.executemany(
+                    "INSERT OR IGNORE INTO field_values (kind, field, value, seq) VALUES (?, ?, ?, ?)", values
+                )
+                if texts:
+                    connection.executemany(
+                        f"INSERT INTO {text_table} (rowid, name, alias, description, metadata) VALUES (?, ?, ?, ?, ?)",
+                        texts,
+                    )
+                if state["mode"] == "full":
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO seen (kind, id) VALUES (?, ?)", [(kind, id) for id in ids]
+                    )
+                if stats["added"] + stats["updated"] > written:
+                    self._bump_version(connection, kind)
+                for key, value in (transferred or {}).items():
+                    stats[key] += value
+                if high_water is not None and (state["high_water"] is None or high_water > state["high_water"]):
+                    state["high_water"] = high_water
+                connection.execute(
+                    "UPDATE sync_state SET cursor = ?, high_water = ?, stats = ? WHERE kind = ?",
+                    (cursor, state["high_water"], json.dumps(stats), kind),
+                )
+        return stats
+
+    def finish_sync(self, kind):
+        """
+        Complete the synchronisation of the given kind in progress: in "full" mode, delete the records
+        which were not saved during the synchronisation, i.e. those deleted on the server; then keep the
+        most recent time among the records as the high-water mark, and mark the records as synchronised.
+        Return the statistics of the synchronisation.
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:  # transaction
+                connection.execute("BEGIN IMMEDIATE")
+                state = self._sync_state(connection, kind)
+                if state is None:
+                    raise Exception(f"No synchronisation of the {kind}s is in progress")
+                stats = state["stats"]
+                if state["mode"] == "full":
+                    unseen = "SELECT id FROM seen WHERE kind = ?"
+                    if self._full_text and kind in _TEXT_KINDS:
+                        connection.execute(
+                            f"DELETE FROM {kind}_text WHERE rowid IN "
+                            f"(SELECT seq FROM records WHERE kind = ? AND id NOT IN ({unseen}))",
+                            (kind, kind),
+                        )
+                    connection.execute(
+                        "DELETE FROM field_values WHERE kind = ? AND seq IN "
+                        f"(SELECT seq FROM records WHERE kind = ? AND id NOT IN ({unseen}))",
+                        (kind, kind, kind),
+                    )
+                    stats["deleted"] += connection.execute(
+                        f"DELETE FROM records WHERE kind = ? AND id NOT IN ({unseen})", (kind, kind)
+                    ).rowcount
+                high_water = state["high_water"]
+                previous = self._high_water(connection, kind)
+                if high_water is None or (previous is not None and previous > high_water):
+                    high_water = previous
+                self._bump_version(connection, kind)
+                connection.execute(
+                    "UPDATE collections SET synced_at = ?, high_water = ? WHERE kind = ?",
+                    (time.time(), high_water, kind),
+                )
+                connection.execute("DELETE FROM sync_state WHERE kind = ?", (kind,))
+                connection.execute("DELETE FROM seen WHERE kind = ?", (kind,))
+        return stats
+
+    def replace(self, kind, records, fields):
+        """
+        Replace all the records of the given kind by `records`, indexing the values of `fields`,
+        and mark them as synchronised.
+        """
+        self.begin_sync(kind, "full")
+        self.save_page(kind, records, fields, len(records))
+        self.finish_sync(kind)
+
+    @staticmethod
+    def _bump_version(connection, kind):
+        # the version of the records of a kind changes with each write, so that cached bitmaps are discarded
+        connection.execute(
+            "INSERT INTO collections (kind, version) VALUES (?, 1) "
+            "ON CONFLICT (kind) DO UPDATE SET version = version + 1",
+            (kind,),
+        )
+
+    @staticmethod
+    def _high_water(connection, kind):
+        row = connection.execute("SELECT high_water FROM collections WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else None
+
+    def high_water(self, kind):
+        """Return the most recent time among the records of the given kind, after their last synchronisation."""
+        with self._lock:
+            return self._high_water(self._connect(), kind)
+
+    def synced_at(self, kind):
+        """Return the time at which the records of the given kind were synchronised, or None."""
+        with self._lock:
+            row = self._connect().execute("SELECT synced_at FROM collections WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else None
+
+    def count(self, kind):
+        """Return the number of records of the given kind."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM records WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def _bitmap(self, kind, field, value, version):
+        # the sequence numbers of the records with the given value of a field, as the bits set in an integer,
+        # cached until the records change
+        cache = self._bitmaps.get(kind)
+        if cache is None or cache[0] != version:
+            cache = self._bitmaps[kind] = (version, {})
+        bitmaps = cache[1]
+        if (field, value) not in bitmaps:
+            rows = self._connect().execute(
+                "SELECT seq FROM field_values WHERE kind = ? AND field = ? AND value = ?", (kind, field, value)
+            )
+            numbers = [row[0] for row in rows]
+            bitmap = bytearray(max(numbers, default=0) // 8 + 1)
+            for number in numbers:
+                bitmap[number // 8] |= 1 << (number % 8)
+            bitmaps[(field, value)] = int.from_bytes(bitmap, "little")
+        return bitmaps[(field, value)]
+
+    def _matches(self, connection, kind, filters):
+        # the sequence numbers of the records matching all the filters, as the bits set in an integer
+        row = connection.execute("SELECT version FROM collections WHERE kind = ?", (kind,)).fetchone()
+        version = row[0] if row else 0
+        matches = -1  # all bits set
+        for field, values in filters.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            field_matches = 0
+            for value in values:
+                field_matches |= self._bitmap(kind, field, _normalize(value), version)
+            matches &= field_matches
+        return matches
+
+    def query(self, kind, filters, size=1000000, from_index=0):
+        """
+        Return the JSON representations (bytes) of up to `size` records of the given kind matching `filters`,
+        starting at `from_index`: results most recent first, as listed by the server, and models and tests
+        in the order in which they were first synchronised.
+
+        Each filter is a field name and a value, or a list of values of which any may match.
+        """
+        with self._lock:
+            connection = self._connect()
+            if not filters:
+                rows = connection.execute(
+                    "SELECT content FROM records WHERE kind = ? ORDER BY sort_key DESC, seq LIMIT ? OFFSET ?",
+                    (kind, size, from_index),
+                )
+                return [row[0] for row in rows]
+            matches = self._matches(connection, kind, filters)
+            bits = format(matches, "b")[::-1]  # the character at index i is the bit for sequence number i
+            if kind in _ORDER_FIELDS:
+                # the sequence numbers of the matching records, in the order of the field
+                rows = connection.execute(
+                    "SELECT seq FROM records WHERE kind = ? ORDER BY sort_key DESC, seq", (kind,)
+                )
+                numbers = [number for (number,) in rows if number < len(bits) and bits[number] == "1"]
+                numbers = numbers[from_index : from_index + size]
+            else:
+                numbers = []
+                number = -1
+                for i in range(from_index + size):
+                    number = bits.find("1", number + 1)
+                    if number < 0:
+                        break
+                    if i >= from_index:
+                        numbers.append(number)
+            contents = {}
+            for start in range(0, len(numbers), _BATCH_SIZE):
+                batch = numbers[start : start + _BATCH_SIZE]
+                rows = connection.execute(
+                    f"SELECT seq, content FROM records WHERE kind = ? AND seq IN ({', '.join('?' * len(batch))})",
+                    [kind] + batch,
+                )
+                contents.update(rows)
+            return [contents[number] for number in numbers if number in contents]
+
+    def search(self, kind, text, size=10, filters=None):
+        """
+        Return the JSON representations (bytes) of up to `size` models or tests (depending on `kind`)
+        containing all the words in `text`, most relevant first, and matching `filters`, if given
+        (see :meth:`query`). A word ending with "*" matches any word starting with it.
+        """
+        with self._lock:
+            connection = self._connect()
+            if not self._full_text:
+                raise Exception("Full-text search requires a version of SQLite with the FTS5 extension")
+            if kind not in _TEXT_KINDS:
+                raise ValueError(f"Records of kind '{kind}' cannot be searched")
+            query = text_query(text)
+            if not query:
+                return []
+            matches = self._matches(connection, kind, filters) if filters else None
+            weights = ", ".join(str(weight) for weight in _TEXT_WEIGHTS)
+            rows = connection.execute(
+                f"SELECT rowid FROM {kind}_text WHERE {kind}_text MATCH ? ORDER BY bm25({kind}_text, {weights})"
+                + ("" if filters else " LIMIT ?"),
+                (query,) if filters else (query, size),
+            )
+            numbers = []
+            for (number,) in rows:
+                if matches is None or (matches >> number) & 1:
+                    numbers.append(number)
+                    if len(numbers) == size:
+                        break
+            contents = {}
+            for start in range(0, len(numbers), _BATCH_SIZE):
+                batch = numbers[start : start + _BATCH_SIZE]
+                rows = connection.execute(
+                    f"SELECT seq, content FROM records WHERE kind = ? AND seq IN ({', '.join('?' * len(batch))})",
+                    [kind] + batch,
+                )
+                contents.update(rows)
+            return [contents[number] for number in numbers if number in contents]
+
+    def invalidate(self, *kinds):
+        """
+        Mark the records of the given kinds (by default, all) as out of date, e.g. after a model or test
+        has been changed, so that listings are retrieved from the server until the next synchronisation.
+        """
+        with self._lock:
+            connection = self._connect()
+            if kinds:
+                connection.executemany(
+                    "UPDATE collections SET synced_at = NULL WHERE kind = ?", [(kind,) for kind in kinds]
+                )
+            else:
+                connection.execute("UPDATE collections SET synced_at = NULL")
@@ -0,0 +1,232 @@
+"""
+Client-side rate limiting of requests to the validation service.
+
+Requests wait for a token from a token bucket, if a maximum request rate is set,
+and for a free slot below a limit on the number of requests in progress at once.
+The concurrency limit follows the AIMD scheme (additive increase, multiplicative decrease)
+used for TCP congestion control: it grows slowly while requests succeed, and is halved when
+the server replies "429 Too Many Requests" or "503 Service Unavailable", so that throughput
+tracks what the server can sustain.
+
+Throttled requests are retried after the delay given by the server in a Retry-After header,
+during which all other requests also wait, or otherwise after an exponential backoff with
+random jitter. Only requests which can safely be repeated are retried: requests with
+idempotent methods, and requests of any method rejected with status 429, which signals
+that the server did not process them.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+THROTTLED_STATUS_CODES = (429, 503)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+def _parse_retry_after(value):
+    # Return the number of seconds given by a Retry-After header (delay or HTTP date), or None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RateLimiter(object):
+    """
+    Limits the rate and concurrency of requests, and retries throttled requests.
+
+    A single limiter is shared by all methods of a client, and by clients created from it
+    with :meth:`from_existing`.
+
+    Parameters
+    ----------
+    requests_per_second : float, optional
+        Maximum sustained rate of requests. By default the rate is not limited.
+    burst : int, optional
+        Number of requests which can be sent at once before the rate limit applies;
+        default `requests_per_second`.
+    initial_concurrency : int, optional
+        Initial limit on the number of requests in progress at once; default 10.
+    max_concurrency : int, optional
+        Upper bound for the concurrency limit; default 100.
+    max_retries : int, optional
+        Maximum number of retries of a throttled request; default 5.
+    backoff_base : float, optional
+        Maximum delay in seconds before the first retry, when the server gives no Retry-After header;
+        the maximum doubles with each further retry. Default 0.5.
+    backoff_max : float, optional
+        Upper bound on the delay before a retry, in seconds; default 60.
+
+    Attributes
+    ----------
+    throttled_time : float
+        Total time in seconds spent by requests waiting because of rate limiting or throttling.
+    throttled_responses : int
+        Number of 429 and 503 responses received.
+    retries : int
+        Number of requests retried.
+    """
+
+    def __init__(
+        self,
+        requests_per_second=None,
+        burst=None,
+        initial_concurrency=10,
+        max_concurrency=100,
+        max_retries=5,
+        backoff_base=0.5,
+        backoff_max=60.0,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max(1, int(requests_per_second or 1))
+        self.concurrency_limit = float(initial_concurrency)
+        self.min_concurrency = 1
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.throttled_time = 0.0
+        self.throttled_responses = 0
+        self.retries = 0
+        self.in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def stats(self):
+        """A dict with the time spent throttled, the numbers of throttled responses and retries,
+        and the current concurrency limit."""
+        return {
+            "throttled_time": self.throttled_time,
+            "throttled_responses": self.throttled_responses,
+            "retries": self.retries,
+            "concurrency_limit": int(self.concurrency_limit),
+        }
+
+    def _reserve(self):
+        # Called with the lock held. Takes a slot (and a token) and returns 0 if a request can be sent now,
+        # otherwise returns the time to wait, or None to wait until a request in progress completes
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self.in_flight >= int(self.concurrency_limit):
+            return None
+        if self.requests_per_second:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.requests_per_second)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def acquire(self):
+        """Wait until a request can be sent. Returns the time at which it may be sent."""
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                wait = self._reserve()
+                if wait == 0:
+                    break
+                self._condition.wait(wait)
+            now = time.monotonic()
+            self.throttled_time += now - start
+        return now
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request can be sent."""
+        import asyncio
+
+        start = time.monotonic()
+        while True:
+            with self._condition:
+                wait = self._reserve()
+                if wait == 0:
+                    now = time.monotonic()
+                    self.throttled_time += now - start
+                    return now
+            await asyncio.sleep(0.01 if wait is None else wait)
+
+    def release(self, sent_at, status_code=None, retry_after=None):
+        """Record the completion of a request sent at time `sent_at`, and adapt the limits to its outcome."""
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if status_code in THROTTLED_STATUS_CODES:
+                self.throttled_responses += 1
+                # decrease at most once for the requests in progress when throttling started
+                if sent_at > self._last_decrease:
+                    self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                    self._last_decrease = now
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+            elif status_code is not None:
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+            self._condition.notify_all()
+
+    def _should_retry(self, method, status_code, attempt):
+        return (
+            status_code in THROTTLED_STATUS_CODES
+            and attempt < self.max_retries
+            and (method.upper() in IDEMPOTENT_METHODS or status_code == 429)
+        )
+
+    def _backoff(self, attempt, retry_after):
+        # Delay before a retry. With Retry-After, the wait happens in acquire(), for all requests
+        if retry_after is not None:
+            delay = 0.0
+        else:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        with self._condition:
+            self.retries += 1
+            self.throttled_time += delay
+        return delay
+
+    def call(self, method, send):
+        """Send a request with `send()`, which returns the response, applying the limits and retrying if throttled."""
+        attempt = 0
+        while True:
+            sent_at = self.acquire()
+            try:
+                response = send()
+            except BaseException:
+                self.release(sent_at)
+                raise
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            self.release(sent_at, response.status_code, retry_after)
+            if not self._should_retry(method, response.status_code, attempt):
+                return response
+            response.close()  # release the connection, in case the body was not read
+            time.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    async def call_async(self, method, send):
+        """Asynchronous version of :meth:`call`, for which `send()` returns an awaitable."""
+        import asyncio
+
+        attempt = 0
+        while True:
+            sent_at = await self.acquire_async()
+            try:
+                response = await send()
+            except BaseException:
+                self.release(sent_at)
+                raise
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            self.release(sent_at, response.status_code, retry_after)
+            if not self._should_retry(method, response.status_code, attempt):
+                return response
+            response.close()
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
@@ -0,0 +1,90 @@
+"""
+Coalescing of identical concurrent requests ("single flight").
+
+When several threads, or several coroutines, request the same resource at the same time,
+only the first request is sent to the server; the others wait for it to complete and
+receive the same result (or exception).
+"""
+
+import threading
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call at a time for each key, sharing its outcome with concurrent callers.
+
+    Attributes
+    ----------
+    calls : int
+        Number of calls actually made.
+    coalesced : int
+        Number of calls which waited for, and shared the outcome of, an identical call in progress.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """A dict with the numbers of calls made and of calls coalesced."""
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+    def do(self, key, func, *args, **kwargs):
+        """Call `func(*args, **kwargs)`, unless a call with the same key is in progress in another thread."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, func, *args, **kwargs):
+        """Await `func(*args, **kwargs)`, unless a call with the same key is in progress in the same event loop."""
+        import asyncio  # imported here, as only needed by the asynchronous clients
+
+        key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = asyncio.ensure_future(func(*args, **kwargs))
+                future.add_done_callback(lambda f: self._discard_future(key, f))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        # shield the shared call, so that cancelling one caller does not cancel it for the others
+        return await asyncio.shield(future)
+
+    def _discard_future(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
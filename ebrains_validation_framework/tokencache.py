@@ -0,0 +1,151 @@
+"""
+Provides a cache of EBRAINS authentication tokens, stored in a JSON file
+in the user's home directory, that can be shared by many processes at once.
+
+Readers never take a lock: the file is always replaced atomically, so a reader
+sees either the old or the new contents, never a partially written file.
+Writers, and processes which need to refresh an expired token, take an exclusive
+lock on a companion ".lock" file, so that only one process re-authenticates
+while the others wait and then pick up the new token.
+"""
+
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+class TokenCache(object):
+    """
+    A JSON file mapping EBRAINS usernames to their cached token information.
+
+    Parameters
+    ----------
+    path : string
+        Path of the token file.
+
+    Examples
+    --------
+    >>> cache = TokenCache(os.path.expanduser("~/.ebrainstoken"))
+    >>> with cache.lock():
+    ...     entry = cache.get("adavison")
+    ...     cache.store("adavison", {"access_token": token})
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._lock_file = None
+        self._lock_depth = 0
+
+    def exists(self):
+        """Returns True if the token file exists."""
+        return os.path.exists(self.path)
+
+    def read(self):
+        """Returns the contents of the token file, or an empty dict if it is missing or unreadable."""
+        try:
+            with open(self.path) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+
+    def get(self, username):
+        """Returns the cached token information for the given user, or None."""
+        entry = self.read().get(username)
+        if isinstance(entry, dict) and "access_token" in entry:
+            return entry
+        return None
+
+    def store(self, username, entry):
+        """
+        Saves the token information for the given user.
+
+        The file is only rewritten if the stored entry has changed.
+        Returns True if the file was written.
+        """
+        with self.lock():
+            token_data = self.read()
+            if token_data.get(username) == entry:
+                return False
+            token_data[username] = entry
+            self._write(token_data)
+            return True
+
+    def _write(self, token_data):
+        # write to a temporary file in the same directory, then atomically replace the
+        # token file, so that concurrent readers never see a partially written file
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".ebrainstoken-", dir=dirname)
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(token_data, fp)
+                fp.write("\n")
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def lock(self):
+        """
+        Context manager holding an exclusive lock on the token cache, shared between processes.
+
+        The lock is re-entrant within a single cache object, and is released automatically
+        by the operating system if the process exits while holding it.
+        """
+        if self._lock_depth == 0:
+            self._acquire()
+        self._lock_depth += 1
+        try:
+            yield self
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                self._release()
+
+    def _acquire(self):
+        fp = open(self.lock_path, "a+")
+        try:
+            os.chmod(self.lock_path, 0o600)
+        except OSError:
+            pass
+        if fcntl is not None:
+            # POSIX record locks also work on NFS-mounted home directories
+            fcntl.lockf(fp, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            fp.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fp.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+        self._lock_file = fp
+
+    def _release(self):
+        fp, self._lock_file = self._lock_file, None
+        try:
+            if fcntl is not None:
+                fcntl.lockf(fp, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                fp.seek(0)
+                msvcrt.locking(fp.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            fp.close()
@@ -0,0 +1,346 @@
+"""
+Tracing of the phases of validation workflows, as OpenTelemetry-compatible spans.
+
+When tracing is enabled with :func:`configure`, the functions of :mod:`ebrains_validation_framework.utils`
+(e.g. :func:`~ebrains_validation_framework.utils.run_test_standalone`) record a span for the whole workflow,
+with child spans for each phase (authentication, resolving the test and model, downloading the observation,
+running the test, uploading output files, registering the result), and each request to the validation
+service is recorded as a child span of the phase which made it.
+
+Spans are either recorded by a built-in tracer and written by an exporter, e.g. to the console or to
+a file with one JSON object per line, which needs no additional packages and works offline, or passed to
+the OpenTelemetry API (``pip install opentelemetry-api``), to be processed by the tracer provider
+configured by the application. Tracing is disabled by default.
+
+Example
+-------
+
+>>> from ebrains_validation_framework import tracing, utils
+>>> tracing.configure("spans.jsonl")
+>>> result, score = utils.run_test_standalone(model=model, test_alias="CDT-5", client_obj=test_library)
+>>> tracing.summarize("spans.jsonl")["judge"]["total_time"]
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_tracer = None  # the active tracer, or None if tracing is disabled
+_current_span = contextvars.ContextVar("ebrains_validation_framework_span", default=None)
+
+
+class Span(object):
+    """
+    A span recorded by the built-in tracer, with the fields of the OpenTelemetry data model.
+    Times are in nanoseconds since the epoch.
+    """
+
+    def __init__(self, name, trace_id, parent_span_id, kind="INTERNAL", attributes=None, start_time=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time_ns() if start_time is None else start_time
+        self.end_time = None
+        self.status = "UNSET"
+        self.status_message = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message):
+        self.status = "ERROR"
+        self.status_message = message
+
+    def end(self, end_time=None):
+        self.end_time = time.time_ns() if end_time is None else end_time
+
+    @property
+    def duration(self):
+        """Duration of the span in seconds."""
+        return (self.end_time - self.start_time) / 1e9
+
+    def to_dict(self, resource=None):
+        data = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        if resource:
+            data["resource"] = resource
+        return data
+
+
+class ConsoleSpanExporter(object):
+    """Writes a line for each finished span to a stream (by default, standard error)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def export(self, span, resource):
+        stream = self.stream or sys.stderr
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        status = " ERROR" if span.status == "ERROR" else ""
+        stream.write(f"[trace {span.trace_id[:8]}] {span.name} {span.duration * 1000:.1f} ms{status} {attributes}\n")
+
+    def shutdown(self):
+        pass
+
+
+class FileSpanExporter(object):
+    """
+    Appends each finished span to a file, as one JSON object per line (using the field names of the
+    OpenTelemetry protocol), so that the spans of many runs can be collected in one file
+    and analysed with :func:`summarize`.
+
+    Parameters
+    ----------
+    path : string
+        Path of the file.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+
+    def export(self, span, resource):
+        line = json.dumps(span.to_dict(resource), default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a") as span_file:
+                span_file.write(line)
+
+    def shutdown(self):
+        pass
+
+
+class _Tracer(object):
+    # records spans, and passes them to the exporter when they end
+
+    def __init__(self, exporter, service_name):
+        self.exporter = exporter
+        self.resource = {"service.name": service_name}
+
+    @contextmanager
+    def span(self, name, kind, attributes):
+        parent = _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent else os.urandom(16).hex(),
+            parent.span_id if parent else None,
+            kind,
+            attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.set_error(f"{type(err).__name__}: {err}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self.exporter.export(span, self.resource)
+
+    def record(self, name, kind, attributes, start_time, end_time, error):
+        parent = _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent else os.urandom(16).hex(),
+            parent.span_id if parent else None,
+            kind,
+            attributes,
+            start_time,
+        )
+        if error:
+            span.set_error(error)
+        span.end(end_time)
+        self.exporter.export(span, self.resource)
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+
+class _OpenTelemetryTracer(object):
+    # passes spans to the OpenTelemetry API
+
+    def __init__(self, service_name):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("Please install the following package: opentelemetry-api")
+        self._trace = trace
+        self._tracer = trace.get_tracer(service_name)
+
+    @contextmanager
+    def span(self, name, kind, attributes):
+        with self._tracer.start_as_current_span(
+            name, kind=getattr(self._trace.SpanKind, kind), attributes=attributes
+        ) as span:
+            yield span
+
+    def record(self, name, kind, attributes, start_time, end_time, error):
+        span = self._tracer.start_span(
+            name, kind=getattr(self._trace.SpanKind, kind), attributes=attributes, start_time=start_time
+        )
+        if error:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, error))
+        span.end(end_time=end_time)
+
+    def shutdown(self):
+        pass
+
+
+def configure(exporter="console", service_name="ebrains_validation_framework"):
+    """
+    Enable (or disable) tracing.
+
+    Parameters
+    ----------
+    exporter : string or object, optional
+        Where spans are sent: "console" (the default) to print them to standard error, the path of a file
+        to which they are appended as JSON lines (see :class:`FileSpanExporter`), "opentelemetry"
+        to pass them to the OpenTelemetry API, an object with `export(span, resource)` and `shutdown()`
+        methods, or None to disable tracing.
+    service_name : string, optional
+        Name of the service recorded with the spans; default "ebrains_validation_framework".
+    """
+    global _tracer
+    if _tracer is not None:
+        _tracer.shutdown()
+    if exporter is None:
+        _tracer = None
+    elif exporter == "opentelemetry":
+        _tracer = _OpenTelemetryTracer(service_name)
+    else:
+        if exporter == "console":
+            exporter = ConsoleSpanExporter()
+        elif isinstance(exporter, (str, os.PathLike)):
+            exporter = FileSpanExporter(exporter)
+        _tracer = _Tracer(exporter, service_name)
+
+
+def enabled():
+    """Return True if tracing has been enabled with :func:`configure`."""
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, kind="INTERNAL", **attributes):
+    """
+    Context manager recording a span for the code it encloses, as a child of the current span.
+    Attributes whose value is None are omitted. If tracing is disabled, does nothing and returns None.
+
+    Example
+    -------
+    >>> with tracing.span("judge", test=test.name) as judge_span:
+    ...     score = test.judge(model)
+    """
+    if _tracer is None:
+        yield None
+        return
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    with _tracer.span(name, kind, attributes) as current:
+        yield current
+
+
+def traced(func):
+    """Decorator recording a span, named after the function, for each call of the decorated function."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return func(*args, **kwargs)
+        with _tracer.span(func.__name__, "INTERNAL", {"code.function": func.__qualname__}):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def record_request(event):
+    """
+    Record a request to the validation service (a
+    :class:`~ebrains_validation_framework.instrumentation.RequestEvent`)
+    as a finished client span, child of the current span.
+    """
+    if _tracer is None:
+        return
+    end_time = time.time_ns()
+    attributes = {
+        "http.request.method": event.method,
+        "url.full": event.url,
+        "http.route": event.endpoint,
+        "http.request.body.size": event.bytes_sent,
+        "http.response.body.size": event.bytes_received,
+        "http.resend_count": event.retries,
+    }
+    if event.status_code is not None:
+        attributes["http.response.status_code"] = event.status_code
+    if event.cache is not None:
+        attributes["vf.cache"] = event.cache
+    if event.status_code is None:
+        error = "no response"
+    elif event.status_code >= 400:
+        error = f"status {event.status_code}"
+    else:
+        error = None
+    _tracer.record(
+        f"{event.method} {event.endpoint}",
+        "CLIENT",
+        attributes,
+        end_time - int(event.latency * 1e9),
+        end_time,
+        error,
+    )
+
+
+def propagate(func):
+    """
+    Return a function which calls `func` in a copy of the current context, so that the spans
+    it records in a worker thread are children of the current span.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def summarize(path):
+    """
+    Total and mean duration, in seconds, of the spans of each name in a file written by :class:`FileSpanExporter`.
+
+    Returns
+    -------
+    dict
+        For each span name, a dict with the number of spans ("count"), "total_time", "mean_time"
+        and number of spans ending with an error ("errors"), the names taking the most time first.
+    """
+    summary = {}
+    with open(path) as span_file:
+        for line in span_file:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            entry = summary.setdefault(data["name"], {"count": 0, "total_time": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["total_time"] += (data["end_time_unix_nano"] - data["start_time_unix_nano"]) / 1e9
+            entry["errors"] += data["status"]["code"] == "ERROR"
+    for entry in summary.values():
+        entry["mean_time"] = entry["total_time"] / entry["count"]
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["total_time"]))
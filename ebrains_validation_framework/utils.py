@@ -29,16 +29,32 @@ import mimetypes
 import pickle
 import webbrowser
 import collections
-import pkg_resources
 from datetime import datetime
 from importlib import import_module
 from pathlib import Path
 from urllib.parse import urlparse
 
-import sciunit
+from . import ModelCatalog, TestLibrary, tracing
 
-from . import ModelCatalog, TestLibrary
-from .datastores import URI_SCHEME_MAP, CollabDriveDataStore, CollabBucketDataStore
+# `sciunit` and the data store modules are imported within the functions that need them,
+# as they are slow to import
+
+
+def _read_template(name):
+    # Return the contents of a template file distributed with this package
+    try:
+        from importlib.resources import files
+    except ImportError:  # Python 3.8
+        with open(os.path.join(os.path.dirname(__file__), "templates", name)) as fp:
+            return fp.read()
+    return files(__package__).joinpath("templates", name).read_text()
+
+
+def _get_parents(get_entities, instances, key):
+    # Return the models or tests of model or test `instances`, using the batch getter `get_entities`,
+    # in the same order, with None for instances which were not found
+    parents = iter(get_entities([instance[key] for instance in instances if instance is not None]))
+    return [None if instance is None else next(parents) for instance in instances]
 
 
 def view_json_tree(data):
@@ -87,6 +103,7 @@ def _make_js_file(data):
         outfile.write("'")
 
 
+@tracing.traced
 def prepare_run_test_offline(
     username="",
     password=None,
@@ -154,25 +171,30 @@ def prepare_run_test_offline(
     >>> test_config_file = utils.prepare_run_test_offline(username="shailesh", test_alias="CDT-5", test_version="5.0")
     """
 
-    if client_obj:
-        test_library = TestLibrary.from_existing(client_obj)
-    else:
-        test_library = TestLibrary(username, password, environment=environment)
+    from .datastores import URI_SCHEME_MAP
+
+    with tracing.span("auth"):
+        if client_obj:
+            test_library = TestLibrary.from_existing(client_obj)
+        else:
+            test_library = TestLibrary(username, password, environment=environment)
 
     if test_instance_id == "" and test_id == "" and test_alias == "":
         raise Exception("test_instance_id or test_id or test_alias needs to be provided for finding test.")
 
     # Gather specified test info
-    test_instance_json = test_library.get_test_instance(
-        instance_id=test_instance_id,
-        test_id=test_id,
-        alias=test_alias,
-        version=test_version,
-    )
-    test_id = test_instance_json["test_id"]
-    test_instance_id = test_instance_json["id"]
-    test_instance_path = test_instance_json["path"]
-    test_instance_parameters = test_instance_json["parameters"]
+    with tracing.span("resolve_test"):
+        test_instance_json = test_library.get_test_instance(
+            instance_id=test_instance_id,
+            test_id=test_id,
+            alias=test_alias,
+            version=test_version,
+        )
+        test_id = test_instance_json["test_id"]
+        test_instance_id = test_instance_json["id"]
+        test_instance_path = test_instance_json["path"]
+        test_instance_parameters = test_instance_json["parameters"]
+        test_observation_paths = test_library.get_test_definition(test_id=test_id)["data_location"]
 
     # Download test observation to local storage
     base_folder = os.path.join(
@@ -181,13 +203,13 @@ def prepare_run_test_offline(
         test_id,
         datetime.now().strftime("%Y%m%d-%H%M%S"),
     )
-    test_observation_paths = test_library.get_test_definition(test_id=test_id)["data_location"]
     if len(test_observation_paths) == 0:
         raise Exception("No observation data found for test with id: {}".format(test_id))
-    for test_observation_path in test_observation_paths:
-        parse_result = urlparse(test_observation_path)
-        datastore = URI_SCHEME_MAP[parse_result.scheme](auth=test_library.auth)
-        test_observation_file = datastore.download_data([test_observation_path], local_directory=base_folder)[0]
+    with tracing.span("download_observation"):
+        for test_observation_path in test_observation_paths:
+            parse_result = urlparse(test_observation_path)
+            datastore = URI_SCHEME_MAP[parse_result.scheme](auth=test_library.auth)
+            test_observation_file = datastore.download_data([test_observation_path], local_directory=base_folder)[0]
 
     # Create test config required for offline execution
     test_info = {}
@@ -205,6 +227,7 @@ def prepare_run_test_offline(
     return test_config_file
 
 
+@tracing.traced
 def run_test_offline(model="", test_config_file=""):
     """Run the validation test
 
@@ -235,6 +258,8 @@ def run_test_offline(model="", test_config_file=""):
     >>> test_result_file = utils.run_test_offline(model=model, test_config_file=test_config_file)
     """
 
+    import sciunit
+
     if not os.path.isfile(test_config_file):
         raise Exception("'test_config_file' should direct to file describing the test configuration.")
     base_folder = os.path.dirname(os.path.realpath(test_config_file))
@@ -283,7 +308,8 @@ def run_test_offline(model="", test_config_file=""):
 
     # Run the test
     t_start = datetime.utcnow()
-    score = test.judge(model, deep_error=True)
+    with tracing.span("judge", test=test.name, model=model.name):
+        score = test.judge(model, deep_error=True)
     t_end = datetime.utcnow()
     score.dont_hide = ["related_data"]
 
@@ -330,6 +356,7 @@ def run_test_offline(model="", test_config_file=""):
     return test_result_file
 
 
+@tracing.traced
 def upload_test_result(
     username="",
     password=None,
@@ -387,6 +414,8 @@ def upload_test_result(
     >>> result, score = utils.upload_test_result(username="shailesh", test_result_file=test_result_file)
     """
 
+    from .datastores import CollabDriveDataStore, CollabBucketDataStore
+
     if not os.path.isfile(test_result_file):
         raise Exception("'test_result_file' should direct to file containg the test result data.")
 
@@ -398,13 +427,15 @@ def upload_test_result(
         return None, score.score
 
     # Register the result with the EBRAINS validation framework
-    if client_obj:
-        model_catalog = ModelCatalog.from_existing(client_obj)
-    else:
-        model_catalog = ModelCatalog(username, password, environment=environment)
-    model_instance_uuid = model_catalog.find_model_instance_else_add(score.model)["id"]
-    model_instance_json = model_catalog.get_model_instance(instance_id=model_instance_uuid)
-    model_json = model_catalog.get_model(model_id=model_instance_json["model_id"])
+    with tracing.span("auth"):
+        if client_obj:
+            model_catalog = ModelCatalog.from_existing(client_obj)
+        else:
+            model_catalog = ModelCatalog(username, password, environment=environment)
+    with tracing.span("resolve_model"):
+        model_instance_uuid = model_catalog.find_model_instance_else_add(score.model)["id"]
+        model_instance_json = model_catalog.get_model_instance(instance_id=model_instance_uuid)
+        model_json = model_catalog.get_model(model_id=model_instance_json["model_id"])
     model_host_collab_id = model_json["collab_id"]
     model_name = model_json["name"]
 
@@ -448,6 +479,7 @@ def upload_test_result(
     return response, score.score
 
 
+@tracing.traced
 def run_test(
     username="",
     password=None,
@@ -546,6 +578,7 @@ def run_test(
     return result, score
 
 
+@tracing.traced
 def run_test_standalone(
     username="",
     password=None,
@@ -635,10 +668,14 @@ def run_test_standalone(
                                                   test_alias="CDT-5", test_version="5.0")
     """
 
-    if client_obj:
-        test_library = TestLibrary.from_existing(client_obj)
-    else:
-        test_library = TestLibrary(username, password, environment=environment)
+    import sciunit
+    from .datastores import CollabDriveDataStore, CollabBucketDataStore
+
+    with tracing.span("auth"):
+        if client_obj:
+            test_library = TestLibrary.from_existing(client_obj)
+        else:
+            test_library = TestLibrary(username, password, environment=environment)
 
     if test_instance_id == "" and test_id == "" and test_alias == "":
         raise Exception("test_instance_id or test_id or test_alias needs to be provided for finding test.")
@@ -711,7 +748,8 @@ def run_test_standalone(
 
     # Run the test
     t_start = datetime.utcnow()
-    score = test.judge(model, deep_error=True)
+    with tracing.span("judge", test=test.name, model=model.name):
+        score = test.judge(model, deep_error=True)
     t_end = datetime.utcnow()
 
     print("----------------------------------------------")
@@ -730,13 +768,15 @@ def run_test_standalone(
         return None, score
 
     # Register the result with the EBRAINS validation framework
-    if client_obj:
-        model_catalog = ModelCatalog.from_existing(client_obj)
-    else:
-        model_catalog = ModelCatalog(username, password, environment=environment)
-    model_instance_uuid = model_catalog.find_model_instance_else_add(score.model)["id"]
-    model_instance_json = model_catalog.get_model_instance(instance_id=model_instance_uuid)
-    model_json = model_catalog.get_model(model_id=model_instance_json["model_id"])
+    with tracing.span("auth"):
+        if client_obj:
+            model_catalog = ModelCatalog.from_existing(client_obj)
+        else:
+            model_catalog = ModelCatalog(username, password, environment=environment)
+    with tracing.span("resolve_model"):
+        model_instance_uuid = model_catalog.find_model_instance_else_add(score.model)["id"]
+        model_instance_json = model_catalog.get_model_instance(instance_id=model_instance_uuid)
+        model_json = model_catalog.get_model(model_id=model_instance_json["model_id"])
     model_host_collab_id = model_json["collab_id"]
     model_name = model_json["name"]
 
@@ -781,6 +821,7 @@ def run_test_standalone(
     return response, score
 
 
+@tracing.traced
 def generate_HTML_report(
     username="",
     password=None,
@@ -841,50 +882,52 @@ def generate_HTML_report(
     """
 
     try:
-        from jinja2 import Environment, FileSystemLoader
+        from jinja2 import Environment
     except ImportError:
         print("Please install the following package: Jinja2")
         return
 
-    if client_obj:
-        model_catalog = ModelCatalog.from_existing(client_obj)
-    else:
-        model_catalog = ModelCatalog(username, password, environment=environment)
-    test_library = TestLibrary.from_existing(model_catalog)
-
-    # retrieve all model instances from specified models
-    if model_list:
-        for entry in model_list:
-            try:
-                uuid.UUID(entry, version=4)
-                data = model_catalog.list_model_instances(model_id=entry)
-            except ValueError:
-                data = model_catalog.list_model_instances(alias=entry)
-            for item in data:
-                model_instance_list.append(item["id"])
-
-    # retrieve all test instances from specified tests
-    if test_list:
-        for entry in test_list:
-            try:
-                uuid.UUID(entry, version=4)
-                data = test_library.list_test_instances(test_id=entry)
-            except ValueError:
-                data = test_library.list_test_instances(alias=entry)
-            for item in data:
-                test_instance_list.append(item["id"])
-
-    # extend results list to include all results corresponding to above
-    # identified model instances and test instances
-    for item in model_instance_list:
-        results_json = test_library.list_results(model_instance_id=item)
-        result_list.extend([r["id"] for r in results_json])
-    for item in test_instance_list:
-        results_json = test_library.list_results(test_instance_id=item)
-        result_list.extend([r["id"] for r in results_json])
-
-    # remove duplicate result UUIDs
-    result_list = list(collections.OrderedDict.fromkeys(result_list).keys())
+    with tracing.span("auth"):
+        if client_obj:
+            model_catalog = ModelCatalog.from_existing(client_obj)
+        else:
+            model_catalog = ModelCatalog(username, password, environment=environment)
+        test_library = TestLibrary.from_existing(model_catalog)
+
+    with tracing.span("list_results"):
+        # retrieve all model instances from specified models
+        if model_list:
+            for entry in model_list:
+                try:
+                    uuid.UUID(entry, version=4)
+                    data = model_catalog.list_model_instances(model_id=entry)
+                except ValueError:
+                    data = model_catalog.list_model_instances(alias=entry)
+                for item in data:
+                    model_instance_list.append(item["id"])
+
+        # retrieve all test instances from specified tests
+        if test_list:
+            for entry in test_list:
+                try:
+                    uuid.UUID(entry, version=4)
+                    data = test_library.list_test_instances(test_id=entry)
+                except ValueError:
+                    data = test_library.list_test_instances(alias=entry)
+                for item in data:
+                    test_instance_list.append(item["id"])
+
+        # extend results list to include all results corresponding to above
+        # identified model instances and test instances
+        for item in model_instance_list:
+            results_json = test_library.list_results(model_instance_id=item)
+            result_list.extend([r["id"] for r in results_json])
+        for item in test_instance_list:
+            results_json = test_library.list_results(test_instance_id=item)
+            result_list.extend([r["id"] for r in results_json])
+
+        # remove duplicate result UUIDs
+        result_list = list(collections.OrderedDict.fromkeys(result_list).keys())
 
     # utilize each result entry
     result_summary_table = []  # list of dicts, each with 4 keys -> result_id, model_label, test_label, score
@@ -894,13 +937,22 @@ def generate_HTML_report(
     list_tests = []
     list_test_instances = []
     valid_result_uuids = []
-    for r_id in result_list:
-        result = test_library.get_result(result_id=r_id)
+    # retrieve the results, and the models and tests concerned, in batches
+    with tracing.span("fetch_results", results=len(result_list)):
+        results = [result for result in test_library.get_results(result_list) if result is not None]
+    with tracing.span("fetch_metadata"):
+        model_instances = model_catalog.get_model_instances([result["model_instance_id"] for result in results])
+        test_instances = test_library.get_test_instances([result["test_instance_id"] for result in results])
+        models = _get_parents(model_catalog.get_models, model_instances, "model_id")
+        tests = _get_parents(test_library.get_test_definitions, test_instances, "test_id")
+    for result, model_instance, test_instance, model, test in zip(
+        results, model_instances, test_instances, models, tests
+    ):
+        if model is None or test is None:
+            # the model or test (or the instance) has been deleted since the result was registered
+            continue
+        r_id = result["id"]
         valid_result_uuids.append(r_id)
-        model_instance = model_catalog.get_model_instance(instance_id=result["model_instance_id"])
-        test_instance = test_library.get_test_instance(instance_id=result["test_instance_id"])
-        model = model_catalog.get_model(model_id=model_instance["model_id"])
-        test = test_library.get_test_definition(test_id=test_instance["test_id"])
 
         list_results.append(result)
         list_models.append(model)
@@ -937,9 +989,8 @@ def generate_HTML_report(
     timestamp = datetime.now()
     report_name = str("EBRAINS_VF_Report_" + timestamp.strftime("%Y%m%d-%H%M%S") + ".html")
 
-    template_path = pkg_resources.resource_filename("ebrains_validation_framework", "templates/report_template.html")
-    env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-    template = env.get_template(os.path.basename(template_path))
+    env = Environment()
+    template = env.from_string(_read_template("report_template.html"))
 
     template_vars = {
         "report_name": report_name,
@@ -951,10 +1002,11 @@ def generate_HTML_report(
         "list_tests": list_tests,
         "list_test_instances": list_test_instances,
     }
-    html_out = template.render(template_vars)
+    with tracing.span("render"):
+        html_out = template.render(template_vars)
 
-    with open(report_name, "w") as outfile:
-        outfile.write(html_out)
+        with open(report_name, "w") as outfile:
+            outfile.write(html_out)
     return os.path.abspath(report_name), valid_result_uuids
 
 
@@ -1088,6 +1140,7 @@ def generate_PDF_report(
     return filepath, valid_result_uuids
 
 
+@tracing.traced
 def generate_score_matrix(
     username="",
     password=None,
@@ -1164,57 +1217,65 @@ def generate_score_matrix(
         print("Please install the following package: pandas")
         return
 
-    if client_obj:
-        model_catalog = ModelCatalog.from_existing(client_obj)
-    else:
-        model_catalog = ModelCatalog(username, password, environment=environment)
-
-    if client_obj:
-        test_library = TestLibrary.from_existing(client_obj)
-    else:
-        test_library = TestLibrary(username, password, environment=environment)
+    with tracing.span("auth"):
+        if client_obj:
+            model_catalog = ModelCatalog.from_existing(client_obj)
+        else:
+            model_catalog = ModelCatalog(username, password, environment=environment)
 
-    # retrieve all model instances from specified models
-    if model_list:
-        for entry in model_list:
-            try:
-                uuid.UUID(entry, version=4)
-                data = model_catalog.list_model_instances(model_id=entry)
-            except ValueError:
-                data = model_catalog.list_model_instances(alias=entry)
-            for item in data:
-                model_instance_list.append(item["id"])
-
-    # retrieve all test instances from specified tests
-    if test_list:
-        for entry in test_list:
-            try:
-                uuid.UUID(entry, version=4)
-                data = test_library.list_test_instances(test_id=entry)
-            except ValueError:
-                data = test_library.list_test_instances(alias=entry)
-            for item in data:
-                test_instance_list.append(item["id"])
-
-    # extend results list to include all results corresponding to above
-    # identified model instances and test instances
-    for item in model_instance_list:
-        results_json = test_library.list_results(model_instance_id=item)["results"]
-        result_list.extend([r["id"] for r in results_json])
-    for item in test_instance_list:
-        results_json = test_library.list_results(test_instance_id=item)["results"]
-        result_list.extend([r["id"] for r in results_json])
-
-    # remove duplicate result UUIDs
-    result_list = list(collections.OrderedDict.fromkeys(result_list).keys())
+        if client_obj:
+            test_library = TestLibrary.from_existing(client_obj)
+        else:
+            test_library = TestLibrary(username, password, environment=environment)
+
+    with tracing.span("list_results"):
+        # retrieve all model instances from specified models
+        if model_list:
+            for entry in model_list:
+                try:
+                    uuid.UUID(entry, version=4)
+                    data = model_catalog.list_model_instances(model_id=entry)
+                except ValueError:
+                    data = model_catalog.list_model_instances(alias=entry)
+                for item in data:
+                    model_instance_list.append(item["id"])
+
+        # retrieve all test instances from specified tests
+        if test_list:
+            for entry in test_list:
+                try:
+                    uuid.UUID(entry, version=4)
+                    data = test_library.list_test_instances(test_id=entry)
+                except ValueError:
+                    data = test_library.list_test_instances(alias=entry)
+                for item in data:
+                    test_instance_list.append(item["id"])
+
+        # extend results list to include all results corresponding to above
+        # identified model instances and test instances
+        for item in model_instance_list:
+            results_json = test_library.list_results(model_instance_id=item)["results"]
+            result_list.extend([r["id"] for r in results_json])
+        for item in test_instance_list:
+            results_json = test_library.list_results(test_instance_id=item)["results"]
+            result_list.extend([r["id"] for r in results_json])
+
+        # remove duplicate result UUIDs
+        result_list = list(collections.OrderedDict.fromkeys(result_list).keys())
 
     results_dict = collections.OrderedDict()
     model_instances_dict = collections.OrderedDict()
     test_instances_dict = collections.OrderedDict()
 
-    excluded_results = []  # not latest entry for a particular model instance and test instance combination
-    for r_id in result_list:
-        result = test_library.get_result(result_id=r_id)
+    # not latest entry for a particular model instance and test instance combination,
+    # or result, model or test not found
+    excluded_results = []
+    with tracing.span("fetch_results", results=len(result_list)):
+        results = test_library.get_results(result_list)
+    for r_id, result in zip(result_list, results):
+        if result is None:
+            excluded_results.append(r_id)
+            continue
         temp_score = round(float(result["score"]), round_places) if round_places else result["score"]
         # '#*#' is used as separator between score and result UUID (latter used for constructing hyperlink)
         if result["test_instance_id"] in results_dict.keys():
@@ -1252,19 +1313,31 @@ def generate_score_matrix(
             results_dict[key_test_inst][key_model_inst] = value[1]
 
     # form test labels: test_name(version_name)
-    for t_id in test_instances_dict.keys():
-        test = test_library.get_test_instance(instance_id=t_id)
-        test_version = test["version"]
-        test = test_library.get_test_definition(test_id=test["test_id"])
+    with tracing.span("fetch_metadata", entities="tests"):
+        test_instances = test_library.get_test_instances(list(test_instances_dict.keys()))
+        tests = _get_parents(test_library.get_test_definitions, test_instances, "test_id")
+    for t_id, test_instance, test in zip(list(test_instances_dict.keys()), test_instances, tests):
+        if test is None:  # test instance or test not found: its results are excluded
+            excluded_results.extend(value.split("#*#")[1] for value in results_dict.pop(t_id).values())
+            del test_instances_dict[t_id]
+            continue
+        test_version = test_instance["version"]
         test_name = test["alias"] if test["alias"] else test["name"]
         test_label = test_name + " (" + str(test_version) + ")"
         test_instances_dict[t_id] = test_label
 
     # form model labels: model_name(version_name)
-    for m_id in model_instances_dict.keys():
-        model = model_catalog.get_model_instance(instance_id=m_id)
-        model_version = model["version"]
-        model = model_catalog.get_model(model_id=model["model_id"])
+    with tracing.span("fetch_metadata", entities="models"):
+        model_instances = model_catalog.get_model_instances(list(model_instances_dict.keys()))
+        models = _get_parents(model_catalog.get_models, model_instances, "model_id")
+    for m_id, model_instance, model in zip(list(model_instances_dict.keys()), model_instances, models):
+        if model is None:  # model instance or model not found: its results are excluded
+            for scores in results_dict.values():
+                if m_id in scores:
+                    excluded_results.append(scores.pop(m_id).split("#*#")[1])
+            del model_instances_dict[m_id]
+            continue
+        model_version = model_instance["version"]
         model_name = model["alias"] if model["alias"] else model["name"]
         model_label = model_name + "(" + str(model_version) + ")"
         model_instances_dict[m_id] = model_label
@@ -0,0 +1,160 @@
+"""
+A cache of the controlled vocabularies of the validation service, and validation of filter values.
+
+The valid values of attributes such as "species", "brain_region" or "test_type" change rarely, so they are
+retrieved from the service with a single request (to the ``/vocab/`` endpoint, which returns all of them),
+and kept in memory and in a JSON file, for `ttl` seconds (a day by default). They are used to answer
+:meth:`ModelCatalog.get_attribute_options` and :meth:`TestLibrary.get_attribute_options`, and to check
+the values given as filters to :meth:`ModelCatalog.list_models`, :meth:`TestLibrary.list_tests` and
+related methods before any request is sent, so that a typing mistake raises an error suggesting the closest
+valid values, rather than returning an empty listing. Values differing from a valid value only in case,
+spacing, or the use of "_" or "-" for spaces are replaced by the valid value. If a value is not found
+in vocabularies retrieved more than `refresh_interval` seconds ago, they are retrieved again before the value
+is rejected, in case it was added in the meantime. If the service cannot be reached, e.g. when listings are
+answered from the local mirror offline, the vocabularies are used even if they have expired.
+
+Example
+-------
+
+>>> model_catalog.list_models(species="mus musculus", brain_region="hipocampus")
+ValueError: 'hipocampus' is not a valid value of brain_region. Did you mean 'hippocampus'?
+"""
+
+import difflib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ebrains_validation_framework", "vocab.json"
+)
+DEFAULT_TTL = 86400
+
+
+def _key(value):
+    # the form in which values are compared: ignoring case, spacing, and "_" or "-" used for spaces
+    return re.sub(r"[\s_-]+", " ", str(value)).strip().casefold()
+
+
+def normalize_filters(filters, terms, fields):
+    """
+    Return a copy of `filters` in which the values of `fields` are replaced by the valid values of
+    `terms` (a dictionary of the valid values of each field) which they match, or raise a ValueError
+    suggesting the closest valid values, and those containing the value. Fields which are not in `terms`
+    are not checked.
+    """
+    normalized = dict(filters)
+    for field in fields:
+        if field not in filters or not terms.get(field):
+            continue
+        valid_values = {_key(value): value for value in terms[field]}
+        values = filters[field]
+        is_list = isinstance(values, (list, tuple, set))
+        canonical = []
+        for value in values if is_list else [values]:
+            if value in terms[field]:
+                canonical.append(value)
+            elif _key(value) in valid_values:
+                canonical.append(valid_values[_key(value)])
+            else:
+                # valid values close to the value, then those containing it
+                matches = difflib.get_close_matches(_key(value), list(valid_values), n=3, cutoff=0.6)
+                matches += [key for key in valid_values if _key(value) in key and key not in matches]
+                matches = matches[:3]
+                suggestions = " or ".join(f"'{valid_values[match]}'" for match in matches)
+                raise ValueError(
+                    f"'{value}' is not a valid value of {field}. "
+                    + (f"Did you mean {suggestions}?" if matches else "See get_attribute_options().")
+                )
+        normalized[field] = canonical if is_list else canonical[0]
+    return normalized
+
+
+class Vocabulary(object):
+    """
+    The valid values of the attributes of models and tests, for each validation service,
+    cached in memory and in a JSON file shared by all processes.
+
+    Parameters
+    ----------
+    path : string, optional
+        Path of the JSON file; by default "ebrains_validation_framework/vocab.json" in the user's
+        cache directory. If None, the vocabularies are only kept in memory.
+    ttl : float, optional
+        Number of seconds for which the vocabularies are used before being retrieved again; default one day.
+    """
+
+    # vocabularies which do not contain a value given as a filter are retrieved again before it is rejected,
+    # unless retrieved within this many seconds
+    refresh_interval = 300
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}  # URL of the service: (time of retrieval, {attribute: list of values})
+        self._lock = threading.Lock()
+
+    def _read_file(self):
+        try:
+            with open(self.path) as vocab_file:
+                return json.load(vocab_file)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, url):
+        """
+        Return the valid values of each attribute, as a dictionary, for the validation service at `url`,
+        or None if they are not cached or have expired.
+        """
+        entry = self.entry(url)
+        if entry is None or entry[0] + self.ttl < time.time():
+            return None
+        return entry[1]
+
+    def entry(self, url):
+        """
+        Return the time of retrieval and the valid values of each attribute for the validation service
+        at `url`, even if they have expired, or None if they are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if (entry is None or entry[0] + self.ttl < time.time()) and self.path:
+                saved = self._read_file().get(url)
+                if saved and (entry is None or saved["retrieved_at"] > entry[0]):
+                    entry = self._entries[url] = (saved["retrieved_at"], saved["terms"])
+        return entry
+
+    def put(self, url, terms):
+        """Cache the valid values of each attribute for the validation service at `url`."""
+        retrieved_at = time.time()
+        with self._lock:
+            self._entries[url] = (retrieved_at, terms)
+            if self.path:
+                # the file is replaced atomically, so that other processes never read a partial file;
+                # if it cannot be written (e.g. a read-only home directory), the vocabularies are only
+                # kept in memory
+                saved = self._read_file()
+                saved[url] = {"retrieved_at": retrieved_at, "terms": terms}
+                tmp_path = None
+                try:
+                    directory = os.path.dirname(os.path.abspath(self.path))
+                    os.makedirs(directory, exist_ok=True)
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                    with os.fdopen(fd, "w") as vocab_file:
+                        json.dump(saved, vocab_file)
+                    os.replace(tmp_path, self.path)
+                except (OSError, TypeError, ValueError) as err:
+                    if tmp_path and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    print(f"Unable to save vocabularies to {self.path}: {err}")
+
+    def clear(self):
+        """Discard the cached vocabularies, so that they are retrieved again when next used."""
+        with self._lock:
+            self._entries.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,979 @@
+import asyncio
+import datetime
+import itertools
+import json
+import multiprocessing
+import platform
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ebrains_validation_framework import (
+    ModelCatalog,
+    TestLibrary,
+    TOKEN_EXPIRY_MARGIN,
+    aio,
+    get_platform_info,
+    make_session,
+    _decode_token_claims,
+)
+from ebrains_validation_framework.cassette import Cassette, RequestNotRecorded, mount_cassette, request_key
+from ebrains_validation_framework.instrumentation import (
+    CallBudget,
+    CallBudgetExceeded,
+    RequestEvent,
+    RequestStats,
+    endpoint_template,
+)
+from ebrains_validation_framework.jsoncodec import CODECS, get_codec
+from ebrains_validation_framework.jsonstream import iter_json_array
+from ebrains_validation_framework.metadatastore import MetadataStore
+from ebrains_validation_framework.mirror import CatalogMirror
+from ebrains_validation_framework.ratelimit import RateLimiter
+from ebrains_validation_framework import tracing
+from ebrains_validation_framework.tokencache import TokenCache
+from ebrains_validation_framework.vocabulary import Vocabulary, normalize_filters
+
+import pytest
+from .conftest import TESTING_COLLAB
+
+
+"""
+1] Connection pooling
+"""
+
+
+# 1.1) Clients created with from_existing() share the session of the original client
+def test_from_existing_shares_session(modelCatalog):
+    model_catalog = modelCatalog
+    test_library = TestLibrary.from_existing(model_catalog)
+    assert test_library.session is model_catalog.session
+    model_catalog2 = ModelCatalog.from_existing(test_library)
+    assert model_catalog2.session is model_catalog.session
+
+
+# 1.2) Connections are reused across calls
+def test_session_reuses_connections(modelCatalog):
+    model_catalog = modelCatalog
+    model_catalog.list_models(size=1)
+    adapter = model_catalog.session.get_adapter(model_catalog.url)
+    pools_before = len(adapter.poolmanager.pools)
+    for i in range(3):
+        model_catalog.list_models(size=1)
+    assert len(adapter.poolmanager.pools) == pools_before
+
+
+"""
+2] Asynchronous clients
+"""
+
+
+# 2.1) Retrieve several models concurrently
+def test_async_get_models(modelCatalog, myModelID):
+    pytest.importorskip("aiohttp")
+    model_id = myModelID
+
+    async def get_models():
+        async with aio.AsyncModelCatalog.from_existing(modelCatalog) as model_catalog:
+            return await aio.gather_limited(2, *(model_catalog.get_model(model_id=model_id) for i in range(3)))
+
+    models = asyncio.run(get_models())
+    assert [model["id"] for model in models] == [model_id] * 3
+    assert "collab_id" in models[0]
+
+
+# 2.2) Errors are reported as for the synchronous clients
+def test_async_get_model_invalid_id(modelCatalog):
+    pytest.importorskip("aiohttp")
+
+    async def get_model():
+        async with aio.AsyncModelCatalog.from_existing(modelCatalog) as model_catalog:
+            return await model_catalog.get_model(model_id=str(uuid.uuid4()))
+
+    with pytest.raises(Exception) as excinfo:
+        asyncio.run(get_model())
+    assert "Error in retrieving model." in str(excinfo.value)
+
+
+"""
+3] Local token validation
+"""
+
+
+# 3.1) Username and expiry are read from the token itself
+def test_token_info(modelCatalog):
+    model_catalog = modelCatalog
+    token_info = model_catalog._get_token_info()
+    assert token_info["username"] == model_catalog.username
+    assert token_info["expires_at"] > time.time()
+
+
+# 3.2) A client can be created from a valid token without contacting EBRAINS IAM
+def test_no_iam_request_for_valid_token(modelCatalog, monkeypatch):
+    model_catalog = modelCatalog
+    if model_catalog._get_token_info()["expires_at"] - time.time() < TOKEN_EXPIRY_MARGIN:
+        pytest.skip("token too close to expiry")
+    session = make_session()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected request to EBRAINS IAM")
+
+    monkeypatch.setattr(session, "get", fail)
+    client = ModelCatalog(token=model_catalog.token, environment=model_catalog.environment, session=session)
+    assert client.username == model_catalog.username
+
+
+# 3.3) Malformed tokens are detected
+def test_decode_token_claims_invalid():
+    assert _decode_token_claims("not-a-jwt") is None
+    assert _decode_token_claims("a.!!!.c") is None
+
+
+"""
+4] Token cache
+"""
+
+
+def _store_tokens(path, username):
+    token_cache = TokenCache(path)
+    for i in range(20):
+        token_cache.store(username, {"access_token": f"{username}-{i}"})
+
+
+# 4.1) Concurrent writes from many processes leave a valid token file
+def test_token_cache_concurrent_writes(tmp_path):
+    path = str(tmp_path / "ebrainstoken")
+    processes = [multiprocessing.Process(target=_store_tokens, args=(path, f"user{i}")) for i in range(8)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    with open(path) as fp:
+        token_data = json.load(fp)
+    assert token_data == {f"user{i}": {"access_token": f"user{i}-19"} for i in range(8)}
+
+
+# 4.2) The token file is only rewritten when the stored token changes
+def test_token_cache_write_if_changed(tmp_path):
+    token_cache = TokenCache(str(tmp_path / "ebrainstoken"))
+    assert token_cache.store("user", {"access_token": "abc"})
+    assert not token_cache.store("user", {"access_token": "abc"})
+    assert token_cache.store("user", {"access_token": "def"})
+    assert token_cache.get("user") == {"access_token": "def"}
+
+
+"""
+5] Platform information
+"""
+
+
+# 5.1) Platform information is collected once and reused
+def test_platform_info(testLibrary):
+    test_library = testLibrary
+    info = get_platform_info()
+    assert get_platform_info() is info
+    assert info.cpu_count >= 1
+    platform_dict = test_library._get_platform()
+    assert platform_dict["network_name"] == info.network_name
+    assert "memory_total" in platform_dict
+
+
+"""
+6] JSON codecs
+"""
+
+
+# 6.1) All installed codecs decode responses identically
+def test_json_codecs(modelCatalog):
+    model_catalog = modelCatalog
+    models = model_catalog.list_models(size=5)
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            continue
+        client = ModelCatalog.from_existing(model_catalog)
+        client.codec = codec
+        assert client.list_models(size=5) == models
+
+
+# 6.2) Dates and times are serialized in ISO 8601 format
+@pytest.mark.parametrize("name", list(CODECS))
+def test_json_codec_datetime(name):
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} not installed")
+    timestamp = datetime.datetime(2024, 5, 17, 9, 30, 15, 250)
+    data = codec.loads(codec.dumps({"timestamp": timestamp, "date": timestamp.date()}))
+    assert data == {"timestamp": timestamp.isoformat(), "date": "2024-05-17"}
+
+
+"""
+7] HTTP cache
+"""
+
+
+# 7.1) Repeated retrieval of a model is answered from the cache or revalidated
+def test_http_cache_get_model(modelCatalog, myModelID):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_id = myModelID
+    stats_before = dict(model_catalog.cache_stats)
+    model = model_catalog.get_model(model_id=model_id)
+    model_catalog.get_model(model_id=model_id, instances=False)
+    assert model_catalog.get_model(model_id=model_id) == model
+    stats = model_catalog.cache_stats
+    assert stats["hits"] + stats["revalidations"] >= stats_before["hits"] + stats_before["revalidations"] + 2
+
+
+# 7.2) Editing a model discards the cached copy
+def test_http_cache_invalidated_by_edit(modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_name = "Model_{}_{}_py{}_cache".format(
+        datetime.datetime.now().strftime("%Y%m%d-%H%M%S"),
+        model_catalog.environment,
+        platform.python_version(),
+    )
+    model_info = dict(
+        collab_id=TESTING_COLLAB,
+        name="IGNORE - Test Model - " + model_name,
+        alias=model_name,
+        author={"family_name": "Tester", "given_name": "Validation"},
+        cell_type="granule cell",
+        model_scope="single cell",
+        abstraction_level="spiking neurons",
+        brain_region="collection of basal ganglia",
+        species="Mus musculus",
+        owner={"family_name": "Tester", "given_name": "Validation"},
+        license="BSD 3-Clause",
+        description="This is a test entry! Please ignore.",
+    )
+    model = model_catalog.register_model(**model_info)
+    model_catalog.get_model(model_id=model["id"])
+    model_info["description"] = "This is a modified test entry! Please ignore."
+    model_catalog.edit_model(model_id=model["id"], **model_info)
+    assert model_catalog.get_model(model_id=model["id"])["description"] == model_info["description"]
+
+
+"""
+8] Metadata store
+"""
+
+
+# 8.1) Entities are retrieved from the store, by any client using the same database
+def test_metadata_store(modelCatalog, myModelID, tmp_path):
+    model_id = myModelID
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.metadata_store = MetadataStore(str(tmp_path / "metadata.db"))
+    model = model_catalog.get_model(model_id=model_id)
+    assert model_catalog.metadata_store.stats == {"hits": 0, "misses": 1}
+
+    other_model_catalog = ModelCatalog.from_existing(modelCatalog)
+    other_model_catalog.metadata_store = MetadataStore(str(tmp_path / "metadata.db"))
+    assert other_model_catalog.get_model(model_id=model_id) == model
+    assert other_model_catalog.metadata_store.stats == {"hits": 1, "misses": 0}
+
+
+# 8.2) Entries for a model are discarded when the model is changed
+def test_metadata_store_invalidation(tmp_path):
+    metadata_store = MetadataStore(str(tmp_path / "metadata.db"))
+    metadata_store.put("model", "/models/a", b"{}", tags=["model-a-id", "model-a-alias", "instance-a-id"])
+    metadata_store.put("model_instance", "/models/query/instances/a", b"[]", tags=["instance-a-id", "model-a-id"])
+    metadata_store.put("model", "/models/b", b"{}", tags=["model-b-id"])
+    metadata_store.invalidate("instance-a-id")
+    assert metadata_store.get("model", "/models/a") is None
+    assert metadata_store.get("model_instance", "/models/query/instances/a") is None
+    assert metadata_store.get("model", "/models/b") == b"{}"
+
+
+# 8.3) Lookups only write to the database when the time of last access is out of date
+def test_metadata_store_access_time(tmp_path):
+    metadata_store = MetadataStore(str(tmp_path / "metadata.db"))
+    metadata_store.put("model", "/models/a", b"{}")
+    connection = metadata_store._connect()
+    changes = connection.total_changes
+    assert metadata_store.get("model", "/models/a") == b"{}"
+    assert connection.total_changes == changes
+    metadata_store.access_resolution = 0
+    assert metadata_store.get("model", "/models/a") == b"{}"
+    assert connection.total_changes == changes + 1
+
+
+"""
+9] Coalescing of concurrent requests
+"""
+
+
+# 9.1) Concurrent identical requests all receive the model
+def test_coalesced_get_model(modelCatalog, myModelID):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_id = myModelID
+    stats_before = dict(model_catalog.coalescing_stats)
+    with ThreadPoolExecutor(8) as executor:
+        models = list(executor.map(lambda i: model_catalog.get_model(model_id=model_id), range(8)))
+    assert all(model == models[0] for model in models)
+    assert models[0]["id"] == model_id
+    stats = model_catalog.coalescing_stats
+    assert stats["calls"] + stats["coalesced"] >= stats_before["calls"] + stats_before["coalesced"] + 8
+
+
+"""
+10] Rate limiting
+"""
+
+
+class _Response(object):
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+# 10.1) Throttled requests are retried, and the concurrency limit is reduced
+def test_rate_limiter_retry():
+    rate_limiter = RateLimiter(initial_concurrency=8, backoff_base=0.01)
+    responses = [_Response(429, {"Retry-After": "0.1"}), _Response(503), _Response(200)]
+    start = time.monotonic()
+    response = rate_limiter.call("GET", lambda: responses.pop(0))
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 0.1
+    assert rate_limiter.stats["throttled_responses"] == 2
+    assert rate_limiter.stats["retries"] == 2
+    assert rate_limiter.stats["concurrency_limit"] < 8
+
+
+# 10.2) Non-idempotent requests are only retried if rejected with status 429
+def test_rate_limiter_no_retry_post():
+    rate_limiter = RateLimiter(backoff_base=0.01)
+    responses = [_Response(503), _Response(201)]
+    assert rate_limiter.call("POST", lambda: responses.pop(0)).status_code == 503
+    responses = [_Response(429), _Response(201)]
+    assert rate_limiter.call("POST", lambda: responses.pop(0)).status_code == 201
+
+
+# 10.3) The maximum request rate is respected
+def test_rate_limiter_rate():
+    rate_limiter = RateLimiter(requests_per_second=50, burst=1)
+    start = time.monotonic()
+    for i in range(6):
+        rate_limiter.call("GET", lambda: _Response(200))
+    assert time.monotonic() - start >= 0.1
+
+
+"""
+11] Paginated iteration
+"""
+
+
+# 11.1) Iterating over models page by page gives the same models as listing them
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_models(modelCatalog, prefetch):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    models = model_catalog.list_models(size=25)
+    iterated = list(itertools.islice(model_catalog.iter_models(page_size=10, prefetch=prefetch), 25))
+    assert [model["id"] for model in iterated] == [model["id"] for model in models]
+    assert all("collab_id" in model for model in iterated)
+
+
+# 11.2) Iterating over results with a filter
+def test_iter_results(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    result = test_library.list_results(size=1)[0]
+    results = list(test_library.iter_results(page_size=5, model_instance_id=result["model_instance_id"]))
+    assert result["id"] in [r["id"] for r in results]
+    assert all(r["model_instance_id"] == result["model_instance_id"] for r in results)
+
+
+# 11.3) Invalid page sizes and filters are rejected
+def test_iter_tests_invalid(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    with pytest.raises(ValueError):
+        test_library.iter_tests(foo="bar")
+    with pytest.raises(ValueError):
+        next(test_library.iter_tests(page_size=0))
+
+
+"""
+12] Parallel listing
+"""
+
+
+# 12.1) Retrieving pages in parallel gives the same models, in the same order
+def test_list_models_parallel(modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    models = model_catalog.list_models(size=35)
+    assert model_catalog.list_models(size=35, parallel=4, page_size=10) == models
+
+
+# 12.2) Retrieving pages in parallel gives the same results, starting from an offset
+def test_list_results_parallel(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    results = test_library.list_results(size=20, from_index=5)
+    assert test_library.list_results(size=20, from_index=5, parallel=3, page_size=4) == results
+
+
+"""
+13] Streaming of listings
+"""
+
+
+# 13.1) Arrays split into arbitrary chunks are parsed incrementally
+def test_iter_json_array():
+    records = [{"id": i, "name": "ç" * i, "score": i / 3, "passed": None} for i in range(50)]
+    content = json.dumps(records, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 7, 1000, len(content)):
+        chunks = [content[i : i + chunk_size] for i in range(0, len(content), chunk_size)]
+        assert list(iter_json_array(chunks)) == records
+    assert list(iter_json_array([b"[]"])) == []
+    assert list(iter_json_array([b'{"detail":', b' "not found"}'])) == [{"detail": "not found"}]
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"id": 1}, {"id"']))
+
+
+# 13.2) Streamed listings contain the same results as complete listings
+def test_list_results_stream(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    results = test_library.list_results(size=10)
+    assert list(test_library.list_results(size=10, stream=True)) == results
+
+
+"""
+14] Batch retrieval
+"""
+
+
+# 14.1) Results are returned in the order requested, with None for results which do not exist
+def test_get_results(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    result_ids = [result["id"] for result in test_library.list_results(size=5)]
+    missing_id = str(uuid.uuid4())
+    requested = result_ids[::-1] + [missing_id, result_ids[0]]
+    results = test_library.get_results(requested)
+    assert [result["id"] for result in results[:5]] == result_ids[::-1]
+    assert results[5] is None
+    assert results[6]["id"] == result_ids[0]
+    assert results[0] == test_library.get_result(result_id=result_ids[-1])
+
+
+# 14.2) Models and model instances of results are retrieved in batches
+def test_get_models_and_instances(modelCatalog, testLibrary):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    results = TestLibrary.from_existing(testLibrary).list_results(size=5)
+    model_instances = model_catalog.get_model_instances([result["model_instance_id"] for result in results])
+    assert [instance["id"] for instance in model_instances] == [result["model_instance_id"] for result in results]
+    models = model_catalog.get_models([instance["model_id"] for instance in model_instances], instances=False)
+    assert [model["id"] for model in models] == [instance["model_id"] for instance in model_instances]
+    assert all("instances" not in model for model in models)
+
+
+"""
+15] Instrumentation
+"""
+
+
+# 15.1) Identifiers and aliases in URLs are replaced in endpoint names, and query strings dropped
+def test_endpoint_template():
+    base_url = "https://model-validation-api.apps.ebrains.eu"
+    assert endpoint_template(base_url + "/models/abc-123", base_url) == "/models/{id}"
+    assert endpoint_template(base_url + "/tests/t%201/instances/latest", base_url) == "/tests/{id}/instances/latest"
+    assert endpoint_template(base_url + "/models/query/instances/abc", base_url) == "/models/query/instances/{id}"
+    assert endpoint_template(base_url + "/results/?test_id=abc&size=10", base_url) == "/results/"
+    assert endpoint_template("https://example.org/api/models/", "https://example.org/api") == "/models/"
+
+
+# 15.2) Events are aggregated by endpoint
+def test_request_stats():
+    stats = RequestStats(buckets=(0.1, 1.0))
+    url = "https://model-validation-api.apps.ebrains.eu/models/"
+    stats(RequestEvent("GET", url + "a", "/models/{id}", 200, 0, 1000, 0.05, 0, "miss"))
+    stats(RequestEvent("GET", url + "b", "/models/{id}", 200, 0, 0, 0.0, 0, "hit"))
+    stats(RequestEvent("GET", url + "c", "/models/{id}", 304, 0, 0, 0.5, 1, "revalidated"))
+    stats(RequestEvent("POST", url, "/models/", 201, 500, 700, 2.0, 0, None))
+    summary = stats.summary()
+    assert list(summary) == ["POST /models/", "GET /models/{id}"]  # most time first
+    models = summary["GET /models/{id}"]
+    assert models["calls"] == 3
+    assert models["statuses"] == {200: 2, 304: 1}
+    assert models["cache"] == {"miss": 1, "hit": 1, "revalidated": 1}
+    assert models["bytes_received"] == 1000
+    assert models["retries"] == 1
+    assert models["max_time"] == 0.5
+    assert models["p50"] == 0.1
+    assert models["histogram"] == [(0.1, 2), (1.0, 1), (float("inf"), 0)]
+    assert summary["POST /models/"]["p95"] is None
+    assert "GET /models/{id}" in stats.report()
+    stats.reset()
+    assert stats.summary() == {}
+
+
+# 15.3) Hooks receive an event for each request, and are shared with clients created with from_existing()
+def test_request_hooks(modelCatalog, myModelID):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.request_hooks = []
+    model_catalog.http_cache = model_catalog.metadata_store = None
+    events = []
+    model_catalog.add_request_hook(events.append)
+    test_library = TestLibrary.from_existing(model_catalog)
+    model_catalog.get_model(model_id=myModelID, instances=False, images=False)
+    test_library.list_tests(size=1)
+    assert [(event.method, event.endpoint) for event in events] == [("GET", "/models/{id}"), ("GET", "/tests/")]
+    assert events[0].status_code == 200 and events[0].bytes_received > 0 and events[0].latency > 0
+    model_catalog.remove_request_hook(events.append)
+    model_catalog.get_model(model_id=myModelID, instances=False, images=False)
+    assert len(events) == 2
+
+
+"""
+16] Tracing
+"""
+
+
+class _ListExporter(object):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span, resource):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def span_exporter():
+    exporter = _ListExporter()
+    tracing.configure(exporter)
+    yield exporter
+    tracing.configure(None)
+
+
+# 16.1) Spans are children of the enclosing span, and record errors
+def test_tracing_spans(span_exporter):
+    @tracing.traced
+    def workflow():
+        with tracing.span("phase", test="CDT-5", version=None):
+            with pytest.raises(ValueError):
+                with tracing.span("judge"):
+                    raise ValueError("failed")
+
+    workflow()
+    spans = {span.name: span for span in span_exporter.spans}
+    assert set(spans) == {"workflow", "phase", "judge"}
+    assert spans["workflow"].parent_span_id is None
+    assert spans["phase"].parent_span_id == spans["workflow"].span_id
+    assert spans["judge"].parent_span_id == spans["phase"].span_id
+    assert len({span.trace_id for span in span_exporter.spans}) == 1
+    assert spans["phase"].attributes == {"test": "CDT-5"}
+    assert spans["judge"].status == "ERROR"
+
+
+# 16.2) Worker threads started with propagate() record spans in the current trace
+def test_tracing_propagate(span_exporter):
+    def fetch(i):
+        with tracing.span("fetch", index=i):
+            pass
+
+    with tracing.span("batch"):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(tracing.propagate(fetch), range(4)))
+    batch = span_exporter.spans[-1]
+    fetches = [span for span in span_exporter.spans if span.name == "fetch"]
+    assert len(fetches) == 4
+    assert all(span.parent_span_id == batch.span_id for span in fetches)
+
+
+# 16.3) Spans written to a file can be summarized by name
+def test_tracing_file_exporter(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure(str(path))
+    try:
+        for i in range(3):
+            with tracing.span("run"):
+                with tracing.span("judge"):
+                    time.sleep(0.01)
+    finally:
+        tracing.configure(None)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 6
+    assert lines[0]["name"] == "judge" and lines[0]["parent_span_id"] == lines[1]["span_id"]
+    summary = tracing.summarize(str(path))
+    assert list(summary) == ["run", "judge"]
+    assert summary["judge"]["count"] == 3
+    assert summary["judge"]["mean_time"] >= 0.01
+
+
+"""
+17] Call budgets
+"""
+
+
+# 17.1) Requests beyond the budget raise an exception giving the number of requests to each endpoint
+def test_call_budget_raise():
+    budget = CallBudget(max_calls=2)
+    budget.count("GET", "/results/{id}")
+    budget.count("GET", "/results/{id}")
+    with pytest.raises(CallBudgetExceeded, match="GET /results/{id}"):
+        budget.count("GET", "/results/")
+    assert budget.by_endpoint == {"GET /results/{id}": 2, "GET /results/": 1}
+    with pytest.raises(CallBudgetExceeded):
+        budget.check()
+
+
+# 17.2) With on_exceed="report", requests continue and the breakdown is printed
+def test_call_budget_report(capsys):
+    budget = CallBudget(max_calls=1, on_exceed="report")
+    for i in range(3):
+        budget.count("GET", "/models/{id}")
+    assert budget.exceeded
+    budget.check()
+    assert "3  GET /models/{id}" in capsys.readouterr().out
+
+
+# 17.3) Batch retrieval of results stays within a small number of requests
+def test_call_budget_get_results(testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    result_ids = [result["id"] for result in test_library.list_results(size=20)]
+    test_library.http_cache = test_library.metadata_store = None
+    with test_library.call_budget(max_calls=2) as budget:
+        test_library.get_results(result_ids)
+    assert budget.calls <= 2
+    assert budget not in testLibrary.request_hooks
+
+
+"""
+18] Record and replay
+"""
+
+
+# 18.1) Requests are identified by their method and URL, whatever the order of the query parameters
+def test_request_key():
+    url = "https://model-validation-api.apps.ebrains.eu/results/"
+    assert request_key("get", url + "?size=10&id=b&id=a") == request_key("GET", url + "?id=a&id=b&size=10")
+    assert request_key("GET", url + "?size=10") != request_key("GET", url + "?size=20")
+    assert request_key("POST", url, b'{"score": 1}') != request_key("POST", url, b'{"score": 2}')
+
+
+# 18.2) Recorded responses are replayed in order, without network access, the last one being repeated
+def test_cassette_replay(tmp_path):
+    import requests
+
+    path = str(tmp_path / "session.cassette.gz")
+    url = "https://model-validation-api.apps.ebrains.eu/results/"
+    listing = requests.Request("GET", url + "?size=10").prepare()
+    cassette = Cassette(path)
+    assert cassette.mode == "record"
+    cassette.record(listing, 200, {"Content-Type": "application/json", "Date": "today"}, b"[]")
+    cassette.record(listing, 200, {"Content-Type": "application/json"}, b'[\n{"id": "a"}]')
+    cassette.close()
+
+    cassette = Cassette(path)
+    assert cassette.mode == "replay"
+    session = requests.Session()
+    mount_cassette(session, cassette)
+    assert session.get(url + "?size=10").content == b"[]"
+    response = session.get(url + "?size=10", stream=True)
+    assert b"".join(response.iter_content(4)) == b'[\n{"id": "a"}]'
+    assert session.get(url + "?size=10").json() == [{"id": "a"}]
+    assert "Date" not in response.headers
+    with pytest.raises(RequestNotRecorded):
+        session.get(url + "?size=20")
+
+
+# 18.3) A client replaying a cassette gives the same results as when it was recorded
+def test_cassette_client(tmp_path, testLibrary):
+    path = tmp_path / "session.cassette"
+    test_library = TestLibrary(token=testLibrary.token, environment=testLibrary.environment, cassette=path)
+    test_library.url = testLibrary.url
+    results = test_library.list_results(size=5)
+    test = test_library.get_test_definition(test_id=test_library.list_tests(size=1)[0]["id"])
+
+    replay = TestLibrary(token="not-checked", environment=testLibrary.environment, cassette=path)
+    replay.url = testLibrary.url
+    assert replay.cassette.mode == "replay"
+    assert replay.list_results(size=5) == results
+    assert replay.list_tests(size=1)[0]["id"] == test["id"]
+    assert replay.get_test_definition(test_id=test["id"]) == test
+
+
+"""
+19] Local mirror
+"""
+
+
+# 19.1) Filter queries match values ignoring case, any of a list of values, and people by family or full name
+def test_mirror_query(tmp_path):
+    mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    models = [
+        {
+            "id": f"model-{i}",
+            "species": ["Mus musculus", "Rattus norvegicus"][i % 2],
+            "brain_region": ["hippocampus", "cerebellum", "neocortex"][i % 3],
+            "author": [{"given_name": "Ada", "family_name": "Lovelace"}] if i < 5 else [],
+            "private": i == 0,
+            "instances": [{"code_format": "application/zip"}] if i % 4 == 0 else [],
+        }
+        for i in range(12)
+    ]
+    assert mirror.synced_at("model") is None
+    mirror.replace("model", models, ["species", "brain_region", "author", "private", "format"])
+    assert mirror.synced_at("model") is not None
+
+    def ids(filters, size=1000000, from_index=0):
+        return [json.loads(content)["id"] for content in mirror.query("model", filters, size, from_index)]
+
+    assert ids({}, size=2, from_index=3) == ["model-3", "model-4"]
+    assert ids({"species": "mus MUSCULUS", "brain_region": "hippocampus"}) == ["model-0", "model-6"]
+    assert ids({"brain_region": ["cerebellum", "neocortex"], "author": "Ada Lovelace"}) == [
+        "model-1",
+        "model-2",
+        "model-4",
+    ]
+    assert ids({"author": "lovelace"}, size=2, from_index=1) == ["model-1", "model-2"]
+    assert ids({"private": True}) == ["model-0"]
+    assert ids({"format": "application/zip", "species": "Rattus norvegicus"}) == []
+    assert ids({"brain_region": "thalamus"}) == []
+
+    mirror.replace("model", models[:3], ["species"])
+    assert ids({"species": "Mus musculus"}) == ["model-0", "model-2"]
+    mirror.invalidate("model")
+    assert mirror.synced_at("model") is None
+
+
+# 19.2) After synchronisation, listings are answered from the mirror without any request
+def test_sync_mirror(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    report = model_catalog.sync_mirror(results=False)
+    assert report["models"]["total"] > 0 and report["tests"]["total"] > 0
+    species = model_catalog.list_models(size=1)[0]["species"]
+    with model_catalog.call_budget(max_calls=0):
+        models = model_catalog.list_models(species=species, size=10)
+        tests = TestLibrary.from_existing(model_catalog).list_tests(size=10)
+    assert models and all(model["species"] == species for model in models)
+    assert len(tests) == min(10, report["tests"]["total"])
+
+
+"""
+20] Incremental synchronisation of the local mirror
+"""
+
+
+# 20.1) Only new or changed records are written, full synchronisations delete the records not retrieved,
+#       and a synchronisation in progress can be continued with another connection to the database
+def test_mirror_sync_state(tmp_path):
+    path = str(tmp_path / "mirror.db")
+    mirror = CatalogMirror(path)
+    results = [
+        {"id": f"result-{i}", "model_instance_id": f"mi-{i % 2}", "timestamp": f"2024-01-0{i + 1}"} for i in range(6)
+    ]
+    mirror.replace("result", results[:4], ["model_instance_id"])
+    assert mirror.high_water("result") is None  # no time given
+
+    mirror.begin_sync("result", "full")
+    stats = mirror.save_page(
+        "result", results[:2], ["model_instance_id"], 2, "2024-01-02", {"requests": 1, "bytes": 10}
+    )
+    assert stats["added"] == stats["updated"] == 0 and stats["bytes"] == 10
+    mirror.close()
+    mirror = CatalogMirror(path)
+    state = mirror.sync_state("result")
+    assert state["mode"] == "full" and state["cursor"] == 2 and state["high_water"] == "2024-01-02"
+    changed = dict(results[3], model_instance_id="mi-2")
+    mirror.save_page("result", [changed] + results[4:], ["model_instance_id"], 5, "2024-01-06")
+    stats = mirror.finish_sync("result")
+    assert (stats["added"], stats["updated"], stats["deleted"]) == (2, 1, 1)  # result-2 is deleted
+    assert mirror.sync_state("result") is None and mirror.high_water("result") == "2024-01-06"
+    assert mirror.count("result") == 5
+    assert [json.loads(content)["id"] for content in mirror.query("result", {"model_instance_id": "MI-2"})] == [
+        "result-3"
+    ]
+
+    mirror.begin_sync("result", "incremental")
+    mirror.save_page("result", [{"id": "result-6", "timestamp": "2024-01-07"}], ["model_instance_id"], 1, "2024-01-07")
+    stats = mirror.finish_sync("result")
+    assert (stats["added"], stats["deleted"]) == (1, 0)
+    assert mirror.count("result") == 6 and mirror.high_water("result") == "2024-01-07"
+    # results are listed most recent first, as by the server, including those added incrementally
+    assert [json.loads(content)["id"] for content in mirror.query("result", {}, size=2)] == ["result-6", "result-5"]
+    assert [json.loads(content)["id"] for content in mirror.query("result", {"model_instance_id": "mi-0"})] == [
+        "result-4",
+        "result-0",
+    ]
+
+
+# 20.2) After an incremental synchronisation, the newest results are listed first
+def test_list_results_after_incremental_sync(tmp_path, testLibrary):
+    test_library = TestLibrary.from_existing(testLibrary)
+    test_library.mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    fields = ["id", "model_instance_id", "test_instance_id"]
+    test_library.mirror.replace(
+        "result", [{"id": "b", "timestamp": "2024-02-01"}, {"id": "a", "timestamp": "2024-01-01"}], fields
+    )
+    test_library.mirror.begin_sync("result", "incremental")
+    test_library.mirror.save_page("result", [{"id": "c", "timestamp": "2024-03-01"}], fields, 1, "2024-03-01")
+    test_library.mirror.finish_sync("result")
+    with test_library.call_budget(max_calls=0):
+        assert [result["id"] for result in test_library.list_results(size=2)] == ["c", "b"]
+        assert [result["id"] for result in test_library.list_results(size=2, from_index=1)] == ["b", "a"]
+
+
+# 20.3) A second synchronisation transfers the collections again, but writes nothing to the mirror
+def test_sync_mirror_unchanged(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    model_catalog.sync_mirror(results=False)
+    report = model_catalog.sync_mirror(results=False)
+    assert set(report) == {"models", "tests"}
+    for stats in report.values():
+        assert stats["mode"] == "full" and not stats["resumed"]
+        assert stats["records"] == stats["total"] and stats["bytes"] > 0
+        assert stats["added"] == stats["updated"] == stats["deleted"] == 0
+
+
+"""
+21] Full-text search of the local mirror
+"""
+
+
+# 21.1) Searches rank matches in names above matches in descriptions, and follow changes to the records
+def test_mirror_search(tmp_path):
+    mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    models = [
+        {
+            "id": "m1",
+            "name": "Cerebellar granule cell",
+            "description": "A model of Purkinje cell input.",
+            "species": "Mus musculus",
+        },
+        {
+            "id": "m2",
+            "name": "Purkinje cell",
+            "description": "Detailed Purkinje cell morphology.",
+            "species": "Mus musculus",
+        },
+        {"id": "m3", "name": "Place cells", "description": "Hippocampal network.", "species": "Rattus norvegicus"},
+    ]
+    mirror.replace("model", models, ["species"])
+
+    def ids(text, size=10, filters=None):
+        return [json.loads(content)["id"] for content in mirror.search("model", text, size, filters)]
+
+    assert ids("purkinje") == ["m2", "m1"]
+    assert ids("PURKINJE cell", size=1) == ["m2"]
+    assert ids("hippocamp*") == ["m3"]
+    assert ids("purkinje", filters={"species": "rattus norvegicus"}) == []
+    assert ids("cell*", filters={"species": ["Rattus norvegicus"]}) == ["m3"]
+    assert ids("thalamus") == ids("") == ids("*") == []
+
+    mirror.replace("model", [dict(models[0], name="Golgi cell")] + models[2:], ["species"])
+    assert ids("granule") == []
+    assert ids("golgi") == ["m1"]
+    assert ids("detailed") == []
+    with pytest.raises(ValueError):
+        mirror.search("result", "purkinje")
+
+
+# 21.2) Models are found by the words of their names, from the mirror
+def test_search_models(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    with pytest.raises(Exception):
+        model_catalog.search_models("cell")  # not synchronised
+    model_catalog.sync_mirror(results=False)
+    model = model_catalog.list_models(size=1)[0]
+    with model_catalog.call_budget(max_calls=0):
+        models = model_catalog.search_models(model["name"], size=100)
+        tests = TestLibrary.from_existing(model_catalog).search_tests("test", size=5)
+    assert model["id"] in [found["id"] for found in models]
+    assert len(tests) <= 5
+
+
+"""
+22] Vocabulary and checking of filter values
+"""
+
+
+# 22.1) Values are replaced by the valid values they match, and invalid values raise an error with suggestions
+def test_normalize_filters():
+    terms = {"species": ["Mus musculus", "Rattus norvegicus"], "brain_region": ["hippocampus", "basal ganglia"]}
+    fields = ["species", "brain_region", "cell_type"]
+    filters = {"species": " mus  MUSCULUS", "brain_region": ["Basal_Ganglia", "hippocampus"], "cell_type": "any"}
+    assert normalize_filters(filters, terms, fields) == {
+        "species": "Mus musculus",
+        "brain_region": ["basal ganglia", "hippocampus"],
+        "cell_type": "any",
+    }
+    assert normalize_filters({"alias": "x"}, terms, fields) == {"alias": "x"}
+    with pytest.raises(ValueError) as excinfo:
+        normalize_filters({"brain_region": "hipocampus"}, terms, fields)
+    assert "Did you mean 'hippocampus'?" in str(excinfo.value)
+    with pytest.raises(ValueError) as excinfo:
+        normalize_filters({"species": ["Mus musculus", "rattus"]}, terms, fields)
+    assert "'Rattus norvegicus'" in str(excinfo.value)
+
+
+# 22.2) Vocabularies are shared through the file until they expire
+def test_vocabulary_cache(tmp_path):
+    path = str(tmp_path / "vocab.json")
+    vocabulary = Vocabulary(path)
+    assert vocabulary.get("https://example.org") is None
+    vocabulary.put("https://example.org", {"species": ["Mus musculus"]})
+    assert Vocabulary(path).get("https://example.org") == {"species": ["Mus musculus"]}
+    assert Vocabulary(path).get("https://other.example.org") is None
+    assert Vocabulary(path, ttl=-1).get("https://example.org") is None
+    vocabulary.clear()
+    assert Vocabulary(path).get("https://example.org") is None
+
+
+# 22.2b) If the file cannot be written, the vocabularies are kept in memory
+def test_vocabulary_cache_unwritable(tmp_path):
+    (tmp_path / "not_a_directory").write_text("")
+    vocabulary = Vocabulary(str(tmp_path / "not_a_directory" / "vocab.json"))
+    vocabulary.put("https://example.org", {"species": ["Mus musculus"]})
+    assert vocabulary.get("https://example.org") == {"species": ["Mus musculus"]}
+    assert [path.name for path in tmp_path.iterdir()] == ["not_a_directory"]
+
+
+# 22.3) The vocabulary is retrieved once, and invalid filter values are rejected without any request
+def test_filter_values_checked(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.vocabulary = Vocabulary(str(tmp_path / "vocab.json"))
+    species = model_catalog.get_attribute_options("species")
+    with model_catalog.call_budget(max_calls=0):
+        assert model_catalog.get_attribute_options()["species"] == species
+        with pytest.raises(ValueError):
+            model_catalog.list_models(species=species[0] + "xyz")
+    models = model_catalog.list_models(species=species[0].upper(), size=5)
+    assert all(model["species"] == species[0] for model in models)
+
+
+# 22.4) A value missing from a cached vocabulary is checked against the vocabulary retrieved again
+def test_filter_values_vocabulary_refreshed(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.vocabulary = Vocabulary(str(tmp_path / "vocab.json"))
+    terms = model_catalog.get_attribute_options()
+    species = terms["species"][0]
+    model_catalog.vocabulary.put(model_catalog.url, dict(terms, species=terms["species"][1:]))
+    with model_catalog.call_budget(max_calls=0):  # retrieved recently, so not retrieved again
+        with pytest.raises(ValueError):
+            model_catalog.list_models(species=species, size=1)
+    model_catalog.vocabulary.refresh_interval = 0
+    with model_catalog.call_budget(max_calls=2) as budget:
+        model_catalog.list_models(species=species, size=1)
+    assert budget.by_endpoint["GET /vocab/"] == 1
+    assert species in model_catalog.vocabulary.get(model_catalog.url)["species"]
+
+
+# 22.5) If the service cannot be reached, listings from the mirror use the expired vocabulary
+def test_filter_values_offline(tmp_path, modelCatalog):
+    model_catalog = ModelCatalog.from_existing(modelCatalog)
+    model_catalog.url = "http://127.0.0.1:1"  # nothing listening
+    model_catalog.vocabulary = Vocabulary(str(tmp_path / "vocab.json"), ttl=-1)
+    model_catalog.vocabulary.put(model_catalog.url, {"species": ["Mus musculus"]})
+    model_catalog.mirror = CatalogMirror(str(tmp_path / "mirror.db"))
+    model_catalog.mirror.replace("model", [{"id": "m1", "species": "Mus musculus"}], ["species"])
+    assert [model["id"] for model in model_catalog.list_models(species="mus musculus")] == ["m1"]
+    with pytest.raises(ValueError):
+        model_catalog.list_models(species="mus muscul")